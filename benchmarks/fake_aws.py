@@ -0,0 +1,152 @@
+"""
+Offline AWS fakes for the Digitalworks2020 DevOps CLI benchmarks.
+EC2 pages are generated on demand from a botocore before-call hook (so the fixture does not inflate
+the measured memory); Cost Explorer responses are queued on a botocore Stubber.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict
+
+from botocore.awsrequest import AWSResponse
+from botocore.stub import Stubber
+
+
+BENCH_PROFILE = "bench"
+BENCH_ACCOUNT_ID = "111111111111"
+INSTANCE_STATES = ("running", "stopped", "pending", "terminated")
+
+
+def write_aws_config(directory: str) -> None:
+    """Write an AWS config with a static-credential bench profile and point the SDK at it."""
+    config_path = os.path.join(directory, "aws_config")
+    credentials_path = os.path.join(directory, "aws_credentials")
+    with open(config_path, "w") as f:
+        f.write(f"[profile {BENCH_PROFILE}]\nregion = us-east-1\n")
+    with open(credentials_path, "w") as f:
+        f.write(f"[{BENCH_PROFILE}]\naws_access_key_id = AKIABENCHMARK\naws_secret_access_key = benchmark\n")
+    os.environ["AWS_CONFIG_FILE"] = config_path
+    os.environ["AWS_SHARED_CREDENTIALS_FILE"] = credentials_path
+    os.environ["AWS_EC2_METADATA_DISABLED"] = "true"
+
+
+class PagedInstances:
+    """
+    Answer DescribeInstances calls of a client with generated pages, honoring MaxResults,
+    NextToken and instance-state-name filters.
+    """
+    def __init__(self, ec2: Any, total: int, reservation_size: int = 5) -> None:
+        self.total = total
+        self.reservation_size = reservation_size
+        self.calls = 0
+        ec2.meta.events.register("before-parameter-build.ec2.DescribeInstances", self._remember_params)
+        ec2.meta.events.register_first("before-call.ec2.DescribeInstances", self)
+
+    @staticmethod
+    def _remember_params(params: Dict[str, Any], context: Dict[str, Any], **kwargs: Any) -> None:
+        # before-call only sees the serialized request, so keep the API parameters in the call context
+        context["bench_params"] = dict(params)
+
+    def _instance(self, i: int) -> Dict[str, Any]:
+        return {
+            "InstanceId": f"i-{i:017x}",
+            "State": {"Name": INSTANCE_STATES[i % len(INSTANCE_STATES)]},
+            "Tags": [{"Key": "Name", "Value": f"bench-{i}"}, {"Key": "env", "Value": "prod" if i % 2 else "dev"}]
+        }
+
+    def __call__(self, context: Dict[str, Any], **kwargs: Any) -> Any:
+        self.calls += 1
+        params = context.get("bench_params", {})
+        start = int(params.get("NextToken") or 0)
+        end = min(self.total, start + int(params.get("MaxResults") or 1000))
+        states = set()
+        for f in params.get("Filters") or []:
+            if f["Name"] == "instance-state-name":
+                states.update(f["Values"])
+        instances = [self._instance(i) for i in range(start, end)]
+        if states:
+            instances = [i for i in instances if i["State"]["Name"] in states]
+        reservations = [
+            {"ReservationId": f"r-{start + n:017x}", "Instances": instances[n:n + self.reservation_size]}
+            for n in range(0, len(instances), self.reservation_size)
+        ]
+        parsed: Dict[str, Any] = {"Reservations": reservations}
+        if end < self.total:
+            parsed["NextToken"] = str(end)
+        return AWSResponse(None, 200, {}, None), parsed
+
+
+class DailyCosts:
+    """
+    Answer DAILY GetCostAndUsage calls of a Cost Explorer client with generated per-service (and per linked
+    account) costs for the requested days, paged with NextPageToken every page_days days.
+    """
+    def __init__(self, ce: Any, services: int = 40, accounts: int = 3, page_days: int = 14) -> None:
+        self.services = services
+        self.accounts = accounts
+        self.page_days = page_days
+        self.calls = 0
+        ce.meta.events.register("before-parameter-build.ce.GetCostAndUsage", PagedInstances._remember_params)
+        ce.meta.events.register_first("before-call.ce.GetCostAndUsage", self)
+
+    def __call__(self, context: Dict[str, Any], **kwargs: Any) -> Any:
+        self.calls += 1
+        params = context.get("bench_params", {})
+        first = date.fromisoformat(params["TimePeriod"]["Start"])
+        end = date.fromisoformat(params["TimePeriod"]["End"])
+        keys = [group["Key"] for group in params.get("GroupBy", [])]
+        offset = int(params.get("NextPageToken") or 0)
+        days = [first + timedelta(days=n) for n in range(offset, min(offset + self.page_days, (end - first).days))]
+        results = []
+        for day in days:
+            groups = []
+            for s in range(self.services):
+                for a in range(self.accounts if "LINKED_ACCOUNT" in keys else 1):
+                    group_keys = [f"Service {s}"] + ([f"{100000000000 + a}"] if "LINKED_ACCOUNT" in keys else [])
+                    amount = (s + 1) * (1 + a) + day.toordinal() % 7 * 0.5
+                    groups.append({"Keys": group_keys, "Metrics": {"UnblendedCost": {"Amount": f"{amount:.4f}", "Unit": "USD"}}})
+            results.append({
+                "TimePeriod": {"Start": day.isoformat(), "End": (day + timedelta(days=1)).isoformat()},
+                "Total": {}, "Groups": groups, "Estimated": True
+            })
+        parsed: Dict[str, Any] = {"ResultsByTime": results}
+        if offset + self.page_days < (end - first).days:
+            parsed["NextPageToken"] = str(offset + self.page_days)
+        return AWSResponse(None, 200, {}, None), parsed
+
+
+def stub_caller_identity(sts: Any) -> Stubber:
+    """Queue one STS GetCallerIdentity answer naming the bench account."""
+    stubber = Stubber(sts)
+    stubber.add_response("get_caller_identity", {
+        "UserId": "AKIABENCHMARK", "Account": BENCH_ACCOUNT_ID, "Arn": f"arn:aws:iam::{BENCH_ACCOUNT_ID}:user/bench"
+    })
+    stubber.activate()
+    return stubber
+
+
+def stub_monthly_costs(ce: Any, months: int, page_size: int = 12) -> Stubber:
+    """
+    Queue Cost Explorer MONTHLY results for the last `months` months (ending with the current one),
+    split into NextPageToken pages of page_size months.
+    """
+    now = datetime.utcnow()
+    index = now.year * 12 + now.month - 1 - (months - 1)
+    results = []
+    for n in range(months):
+        year, month = divmod(index + n, 12)
+        results.append({
+            "TimePeriod": {"Start": f"{year}-{month + 1:02d}-01", "End": f"{year}-{month + 1:02d}-28"},
+            "Total": {"UnblendedCost": {"Amount": f"{1000 + n * 10.5:.2f}", "Unit": "USD"}},
+            "Groups": [],
+            "Estimated": n == months - 1
+        })
+    stubber = Stubber(ce)
+    for start in range(0, months, page_size):
+        response: Dict[str, Any] = {"ResultsByTime": results[start:start + page_size]}
+        if start + page_size < months:
+            response["NextPageToken"] = str(start + page_size)
+        stubber.add_response("get_cost_and_usage", response)
+    stubber.activate()
+    return stubber
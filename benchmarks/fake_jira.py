@@ -0,0 +1,204 @@
+"""
+Local stand-in Jira server for the Digitalworks2020 DevOps CLI benchmarks.
+Serves N boards, M sprints per board and K issues for the REST endpoints the CLI calls,
+counts requests and can add a fixed per-request latency.
+Follows PEP8 and Codacy standards.
+"""
+
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+CURRENT_USER = "bench"
+SPRINT_FIELD_ID = "customfield_10020"
+ISSUE_TYPES = ("Story", "Bug", "Task")
+STATUSES = ("To Do", "In Progress", "Done")
+
+
+class FakeJiraServer:
+    """
+    FakeJiraServer runs a threaded HTTP server on 127.0.0.1 with generated data.
+    Every issue belongs to the active sprint of the last board ("Board N"), which the benchmarks target,
+    so board lookups have to page through every board and issue searches through every issue.
+    """
+    def __init__(self, boards: int = 100, sprints: int = 50, issues: int = 1000, latency_ms: float = 0.0) -> None:
+        """
+        Generate the data set and start serving.
+        Args:
+            boards (int): Number of boards (N).
+            sprints (int): Sprints per board (M); the last one is active, the rest closed.
+            issues (int): Issues in the target sprint (K).
+            latency_ms (float): Delay added to every response.
+        """
+        self.boards = boards
+        self.sprints = sprints
+        self.latency = latency_ms / 1000.0
+        self.target_board = f"Board {boards}"
+        self.active_sprint_id = boards * 1000 + sprints
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        self._issues = [self._issue(i) for i in range(issues)]
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-jira", daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def reset_count(self) -> None:
+        """Reset the request counter."""
+        with self._count_lock:
+            self.requests = 0
+
+    def close(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _issue(self, i: int) -> Dict[str, Any]:
+        assignee = None if i % 7 == 0 else {
+            "name": CURRENT_USER if i % 5 == 0 else f"user{i % 5}",
+            "displayName": "Bench User" if i % 5 == 0 else f"User {i % 5}"
+        }
+        return {
+            "id": str(10000 + i),
+            "key": f"BENCH-{i + 1}",
+            "fields": {
+                "summary": f"Generated issue {i + 1}",
+                "status": {"name": STATUSES[i % len(STATUSES)]},
+                "assignee": assignee,
+                "issuetype": {"name": ISSUE_TYPES[i % len(ISSUE_TYPES)]},
+                "updated": f"2024-01-{1 + i % 28:02d}T10:00:00.000+0000",
+                SPRINT_FIELD_ID: [f"com.atlassian.greenhopper.service.sprint.Sprint@1[id={self.active_sprint_id},state=ACTIVE]"]
+            }
+        }
+
+    def _sprints(self, board_id: int) -> list[Dict[str, Any]]:
+        return [
+            {"id": board_id * 1000 + j, "name": f"Sprint {j}", "state": "active" if j == self.sprints else "closed"}
+            for j in range(1, self.sprints + 1)
+        ]
+
+    def _search(self, query: Dict[str, str]) -> Dict[str, Any]:
+        jql = query.get("jql", "")
+        issues = self._issues
+        sprint = re.search(r"sprint\s*=\s*(\d+)", jql)
+        if sprint and int(sprint.group(1)) != self.active_sprint_id:
+            issues = []
+        if "currentUser()" in jql:
+            issues = [i for i in issues if (i["fields"]["assignee"] or {}).get("name") == CURRENT_USER]
+        updated = re.search(r'updated\s*>=\s*"([^"]+)"', jql)
+        if updated:
+            since = updated.group(1)[:10].replace("/", "-")
+            issues = [i for i in issues if i["fields"]["updated"][:10] >= since]
+        after_key = re.search(r'key\s*>\s*"?[A-Z]+-(\d+)', jql)
+        if after_key:
+            issues = [i for i in issues if int(i["key"].split("-")[1]) > int(after_key.group(1))]
+        start_at = int(query.get("startAt", 0))
+        max_results = min(int(query.get("maxResults", 50)), 100)
+        page = issues[start_at:start_at + max_results]
+        fields = query.get("fields")
+        if fields and fields != "*all":
+            wanted = set(fields.split(","))
+            page = [
+                {"id": i["id"], "key": i["key"], "fields": {k: v for k, v in i["fields"].items() if k in wanted}}
+                for i in page
+            ]
+        return {"startAt": start_at, "maxResults": max_results, "total": len(issues), "issues": page}
+
+    def _search_jql(self, query: Dict[str, str]) -> Dict[str, Any]:
+        """Jira Cloud enhanced search: same filters, paged with an opaque nextPageToken instead of startAt."""
+        result = self._search({**query, "startAt": query.get("nextPageToken") or "0"})
+        end = result["startAt"] + len(result["issues"])
+        body: Dict[str, Any] = {"issues": result["issues"], "isLast": end >= result["total"]}
+        if not body["isLast"]:
+            body["nextPageToken"] = str(end)
+        return body
+
+    def _velocity(self, board_id: int) -> Dict[str, Any]:
+        closed = [s for s in self._sprints(board_id) if s["state"] == "closed"]
+        sprints = [
+            {**s, "state": "CLOSED", "completeDate": f"{1 + n % 28:02d}/Jan/{20 + n // 28 % 10} 10:00 AM"}
+            for n, s in enumerate(closed)
+        ]
+        entries = {
+            str(s["id"]): {"estimated": {"value": 20.0 + n % 7}, "completed": {"value": 15.0 + n % 9}}
+            for n, s in enumerate(closed)
+        }
+        return {"sprints": sprints, "velocityStatEntries": entries}
+
+    def route(self, path: str, query: Dict[str, str]) -> Optional[Any]:
+        """Build the JSON body for a request, or None for unknown paths."""
+        start_at = int(query.get("startAt", 0))
+        max_results = int(query.get("maxResults", 50))
+        if path.endswith("/serverInfo"):
+            return {"versionNumbers": [9, 12, 0], "deploymentType": "Server", "baseUrl": self.url,
+                    "serverTime": time.strftime("%Y-%m-%dT%H:%M:%S.000+0000", time.gmtime())}
+        if path.endswith("/myself") or path.endswith("/auth/1/session"):
+            return {"name": CURRENT_USER, "key": CURRENT_USER, "timeZone": "UTC", "self": f"{self.url}/rest/api/2/user"}
+        if path.endswith("/field"):
+            return [
+                {"id": "summary", "name": "Summary", "custom": False, "clauseNames": ["summary"]},
+                {"id": SPRINT_FIELD_ID, "name": "Sprint", "custom": True, "clauseNames": ["sprint"],
+                 "schema": {"custom": "com.pyxis.greenhopper.jira:gh-sprint"}}
+            ]
+        sprint_path = re.search(r"/agile/1\.0/board/(\d+)/sprint$", path)
+        if sprint_path:
+            sprints = self._sprints(int(sprint_path.group(1)))
+            if "state" in query:
+                sprints = [s for s in sprints if s["state"] in query["state"].split(",")]
+            return {"startAt": start_at, "maxResults": max_results, "isLast": start_at + max_results >= len(sprints),
+                    "values": sprints[start_at:start_at + max_results]}
+        if path.endswith("/agile/1.0/board"):
+            boards = [{"id": b, "name": f"Board {b}", "type": "scrum"} for b in range(1, self.boards + 1)]
+            if "name" in query:
+                boards = [b for b in boards if query["name"].lower() in b["name"].lower()]
+            return {"startAt": start_at, "maxResults": max_results, "total": len(boards),
+                    "isLast": start_at + max_results >= len(boards), "values": boards[start_at:start_at + max_results]}
+        if path.endswith("/search/jql"):
+            return self._search_jql(query)
+        if re.search(r"/api/\d/search", path):
+            return self._search(query)
+        if path.endswith("/rapid/charts/velocity"):
+            return self._velocity(int(query.get("rapidViewId", 0)))
+        return None
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with server._count_lock:
+                    server.requests += 1
+                parsed = urlparse(self.path)
+                query = {key: ",".join(values) for key, values in parse_qs(parsed.query).items()}
+                if self.command == "POST":
+                    length = int(self.headers.get("Content-Length", 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    query.update({k: ",".join(map(str, v)) if isinstance(v, list) else str(v) for k, v in body.items()})
+                if server.latency:
+                    time.sleep(server.latency)
+                payload = server.route(parsed.path, query)
+                status = 200 if payload is not None else 404
+                data = json.dumps(payload if payload is not None else {"errorMessages": [parsed.path]}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_POST = do_GET
+
+        return Handler
@@ -0,0 +1,380 @@
+"""
+Offline benchmark runner for Digitalworks2020 DevOps CLI.
+Drives the Jira and AWS hot paths against a local fake Jira server and stubbed botocore clients,
+plus the import-time startup check, and reports wall time, request count, peak RSS and throughput.
+Each benchmark runs in its own process so peak RSS is its own.
+
+    python -m benchmarks.run                      # small scale, print results
+    python -m benchmarks.run --scale large --save # record a baseline
+    python -m benchmarks.run --compare            # exit 1 on regressions against the baseline
+
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(REPO_ROOT, "benchmarks", "baselines")
+SCALES: Dict[str, Dict[str, int]] = {
+    "small": {"boards": 200, "sprints": 60, "issues": 2000, "instances": 5000, "cost_months": 36, "cost_services": 40},
+    "large": {"boards": 2000, "sprints": 300, "issues": 50000, "instances": 100000, "cost_months": 120, "cost_services": 200},
+}
+DEFAULT_LATENCY_MS = 2.0
+DEFAULT_TOLERANCE = 0.25
+# Wall time differences below this are treated as noise
+MIN_WALL_DELTA_SECONDS = 0.05
+# The CLI entry point must not pull these in at startup (see devops_cli/registry.py)
+SDK_MODULES = ("jira", "boto3", "botocore", "requests", "aiohttp")
+
+
+# Benchmarks. Each runs in a child process, times only the measured call and returns
+# {"items": ..., "wall_s": ...} plus "requests" when it counts its own (AWS) calls.
+
+def _jira_client(ctx: Dict[str, Any]) -> Any:
+    from devops_cli.issue_store import IssueStore
+    from devops_cli.jira_cache import JiraMetadataCache
+    from devops_cli.jira_server import JiraServerClient
+    from devops_cli.velocity_store import VelocityStore
+    workdir = ctx["workdir"]
+    return JiraServerClient(
+        ctx["jira_url"], "benchmark-token",
+        async_transport=ctx.get("async_transport", False),
+        cache=JiraMetadataCache(os.path.join(workdir, "jira_cache.json")),
+        velocity_store=VelocityStore(os.path.join(workdir, "velocity.json")),
+        issue_store=IssueStore(os.path.join(workdir, "issues.sqlite3"))
+    )
+
+
+def _jira_cloud_client(ctx: Dict[str, Any]) -> Any:
+    from devops_cli.jira_cache import JiraMetadataCache
+    from devops_cli.jira_cloud import JiraCloudClient
+    from devops_cli.velocity_store import VelocityStore
+    workdir = ctx["workdir"]
+    return JiraCloudClient(
+        ctx["jira_url"], "bench", "benchmark-token",
+        async_transport=ctx.get("async_transport", False),
+        cache=JiraMetadataCache(os.path.join(workdir, "jira_cache.json")),
+        velocity_store=VelocityStore(os.path.join(workdir, "velocity.json"))
+    )
+
+
+def _with_async_transport(bench: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Run a Jira benchmark with the client's asyncio (aiohttp) transport instead of the jira library."""
+    def run(ctx: Dict[str, Any]) -> Dict[str, Any]:
+        return bench(dict(ctx, async_transport=True))
+    return run
+
+
+def _timed(call: Callable[[], Any]) -> tuple:
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def bench_jira_get_board_id(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    client = _jira_client(ctx)
+    board_id, wall = _timed(lambda: client.get_board_id(f"Board {ctx['scale']['boards']}"))
+    assert board_id == ctx["scale"]["boards"], board_id
+    return {"items": ctx["scale"]["boards"], "wall_s": wall}
+
+
+def bench_jira_get_active_sprint(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    client = _jira_client(ctx)
+    sprint, wall = _timed(lambda: client.get_active_sprint(ctx["scale"]["boards"]))
+    assert sprint is not None
+    return {"items": ctx["scale"]["sprints"], "wall_s": wall}
+
+
+def bench_jira_current_sprint_summary(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    client = _jira_client(ctx)
+    summary, wall = _timed(lambda: client.get_current_sprint_summary(f"Board {ctx['scale']['boards']}"))
+    assert summary, "no sprint summary"
+    return {"items": sum(sum(counts.values()) for counts in summary.values()), "wall_s": wall}
+
+
+def bench_jira_cloud_current_sprint_summary(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    client = _jira_cloud_client(ctx)
+    summary, wall = _timed(lambda: client.get_current_sprint_summary(f"Board {ctx['scale']['boards']}"))
+    assert summary, "no sprint summary"
+    return {"items": sum(sum(counts.values()) for counts in summary.values()), "wall_s": wall}
+
+
+def bench_jira_my_issues_in_current_sprint(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    client = _jira_client(ctx)
+    issues, wall = _timed(lambda: client.get_my_issues_in_current_sprint(f"Board {ctx['scale']['boards']}"))
+    assert issues, "no issues"
+    return {"items": len(issues), "wall_s": wall}
+
+
+def bench_jira_sprint_story_points_stats(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    client = _jira_client(ctx)
+    sprints = ctx["scale"]["sprints"] - 1
+    result, wall = _timed(
+        lambda: client.get_sprint_story_points_stats(f"Board {ctx['scale']['boards']}", num_sprints=sprints)
+    )
+    assert result and result[0], "no velocity stats"
+    return {"items": len(result[0]), "wall_s": wall}
+
+
+def _aws_client(ctx: Dict[str, Any]) -> Any:
+    from benchmarks.fake_aws import BENCH_PROFILE, write_aws_config
+    write_aws_config(ctx["workdir"])
+    from devops_cli.aws_client import AWSClient
+    from devops_cli.aws_pool import ClientPool
+    from devops_cli.cost_cache import CostCache
+    return AWSClient(BENCH_PROFILE, cost_cache=CostCache(os.path.join(ctx["workdir"], "cost.json")), pool=ClientPool())
+
+
+def bench_aws_list_instances_by_state(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    from benchmarks.fake_aws import PagedInstances
+    client = _aws_client(ctx)
+    fake = PagedInstances(client.client("ec2", "us-east-1"), ctx["scale"]["instances"])
+    grouped, wall = _timed(lambda: client.list_instances_by_state("us-east-1"))
+    assert grouped, "no instances"
+    return {"items": sum(len(v) for v in grouped.values()), "wall_s": wall, "requests": fake.calls}
+
+
+def bench_aws_get_month_cost(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    from benchmarks.fake_aws import stub_caller_identity, stub_monthly_costs
+    from devops_cli.aws_client import STS_CONFIG
+    client = _aws_client(ctx)
+    sts = stub_caller_identity(client.client("sts", config=STS_CONFIG))
+    stubber = stub_monthly_costs(client.ce, 1)
+    now = datetime.utcnow()
+    cost, wall = _timed(lambda: client.get_month_cost(now.year, now.month))
+    assert cost is not None
+    stubber.assert_no_pending_responses()
+    sts.assert_no_pending_responses()
+    return {"items": 1, "wall_s": wall, "requests": 2}
+
+
+def bench_aws_monthly_costs(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    from benchmarks.fake_aws import stub_caller_identity, stub_monthly_costs
+    from devops_cli.aws_client import STS_CONFIG
+    client = _aws_client(ctx)
+    sts = stub_caller_identity(client.client("sts", config=STS_CONFIG))
+    months = ctx["scale"]["cost_months"]
+    page_size = 12
+    stubber = stub_monthly_costs(client.ce, months, page_size=page_size)
+    now = datetime.utcnow()
+    start_year, start_month = divmod(now.year * 12 + now.month - 1 - (months - 1), 12)
+    costs, wall = _timed(lambda: client.get_monthly_costs(start_year, start_month + 1, months))
+    assert costs and len(costs) == months, costs
+    stubber.assert_no_pending_responses()
+    sts.assert_no_pending_responses()
+    return {"items": len(costs), "wall_s": wall, "requests": 1 + -(-months // page_size)}
+
+
+def bench_aws_daily_cost_report(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Sync the daily cost ledger from scratch, then report again from the (fresh) ledger alone."""
+    from benchmarks.fake_aws import DailyCosts
+    from devops_cli.cost_ledger import CostLedger
+    client = _aws_client(ctx)
+    client.cost_ledger = CostLedger(os.path.join(ctx["workdir"], "cost_ledger.sqlite3"))
+    fake = DailyCosts(client.ce, services=ctx["scale"]["cost_services"])
+    first, _ = _timed(lambda: client.get_daily_cost_report(by_account=True))
+    assert first and first["services"], first
+    report, wall = _timed(lambda: client.get_daily_cost_report(by_account=True))
+    assert report["sync"]["requests"] == 0
+    return {"items": len(report["services"]), "wall_s": wall, "requests": fake.calls}
+
+
+def bench_startup_import(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Import devops_cli.main under -X importtime: cumulative import time, and no SDK may be loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import devops_cli.main"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    wall = 0.0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)", line)
+        if not match:
+            continue
+        module = match.group(4)
+        loaded.add(module.split(".")[0])
+        if module == "devops_cli.main":
+            wall = int(match.group(2)) / 1_000_000
+    return {"items": 0, "wall_s": wall, "requests": 0, "sdk_imports": sorted(loaded.intersection(SDK_MODULES))}
+
+
+BENCHMARKS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "startup_import": bench_startup_import,
+    "jira_get_board_id": bench_jira_get_board_id,
+    "jira_get_active_sprint": bench_jira_get_active_sprint,
+    "jira_current_sprint_summary": bench_jira_current_sprint_summary,
+    "jira_cloud_current_sprint_summary": bench_jira_cloud_current_sprint_summary,
+    "jira_my_issues_in_current_sprint": bench_jira_my_issues_in_current_sprint,
+    "jira_sprint_story_points_stats": bench_jira_sprint_story_points_stats,
+    "jira_async_get_board_id": _with_async_transport(bench_jira_get_board_id),
+    "jira_async_get_active_sprint": _with_async_transport(bench_jira_get_active_sprint),
+    "jira_async_current_sprint_summary": _with_async_transport(bench_jira_current_sprint_summary),
+    "jira_async_cloud_sprint_summary": _with_async_transport(bench_jira_cloud_current_sprint_summary),
+    "jira_async_story_points_stats": _with_async_transport(bench_jira_sprint_story_points_stats),
+    "aws_list_instances_by_state": bench_aws_list_instances_by_state,
+    "aws_get_month_cost": bench_aws_get_month_cost,
+    "aws_monthly_costs": bench_aws_monthly_costs,
+    "aws_daily_cost_report": bench_aws_daily_cost_report,
+}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where it cannot be read."""
+    # On Linux ru_maxrss carries over the parent's peak across fork/exec; VmHWM is this process's own
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(name: str, ctx: Dict[str, Any]) -> int:
+    """Run one benchmark in this process and print its result as JSON."""
+    result = BENCHMARKS[name](ctx)
+    result["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(result))
+    return 0
+
+
+def run_benchmark(name: str, scale: str, workdir: str, jira_server: Any, repeat: int) -> Dict[str, Any]:
+    """
+    Run a benchmark in child processes and keep the fastest of `repeat` runs.
+    Returns:
+        Dict with wall_s, requests, peak_rss_mb, items and items_per_s (plus sdk_imports for startup).
+    """
+    best: Optional[Dict[str, Any]] = None
+    for attempt in range(repeat):
+        run_dir = tempfile.mkdtemp(prefix=f"{name}-{attempt}-", dir=workdir)
+        cmd = [sys.executable, "-m", "benchmarks.run", "--child", name, "--scale", scale, "--workdir", run_dir]
+        if jira_server is not None:
+            cmd += ["--jira-url", jira_server.url]
+            jira_server.reset_count()
+        env = dict(os.environ, HOME=run_dir)
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{name} failed:\n{proc.stdout}{proc.stderr}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if name.startswith("jira_"):
+            result["requests"] = jira_server.requests
+        if best is None or result["wall_s"] < best["wall_s"]:
+            best = result
+    best["items_per_s"] = best["items"] / best["wall_s"] if best["wall_s"] and best["items"] else 0.0
+    return best
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> list[str]:
+    """
+    Compare results with a baseline.
+    Returns:
+        Regression messages; empty when everything is within tolerance.
+    """
+    problems = []
+    for name, result in results.items():
+        if result.get("sdk_imports"):
+            problems.append(f"{name}: SDK modules imported at startup: {', '.join(result['sdk_imports'])}")
+        base = baseline.get(name)
+        if not base:
+            continue
+        if (result["wall_s"] > base["wall_s"] * (1 + tolerance)
+                and result["wall_s"] - base["wall_s"] > MIN_WALL_DELTA_SECONDS):
+            problems.append(f"{name}: wall time {result['wall_s']:.3f}s vs baseline {base['wall_s']:.3f}s")
+        if result["requests"] > base["requests"]:
+            problems.append(f"{name}: {result['requests']} requests vs baseline {base['requests']}")
+        if result.get("peak_rss_mb") and base.get("peak_rss_mb") and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{name}: peak RSS {result['peak_rss_mb']:.1f} MB vs baseline {base['peak_rss_mb']:.1f} MB")
+    return problems
+
+
+def print_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    """Print results, with the change against the baseline when one is given."""
+    print(f"{'Benchmark':<34} {'Wall (s)':>9} {'Requests':>9} {'Peak RSS (MB)':>14} {'Items':>8} {'Items/s':>11}  vs baseline")
+    for name, r in results.items():
+        rss = f"{r['peak_rss_mb']:.1f}" if r.get("peak_rss_mb") is not None else "-"
+        change = ""
+        base = (baseline or {}).get(name)
+        if base and base["wall_s"]:
+            change = f"{(r['wall_s'] / base['wall_s'] - 1) * 100:+.0f}% time, {r['requests'] - base['requests']:+d} req"
+        print(f"{name:<34} {r['wall_s']:>9.3f} {r['requests']:>9} {rss:>14} {r['items']:>8} {r['items_per_s']:>11,.0f}  {change}")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Offline DevOps CLI benchmarks.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Data set size.")
+    parser.add_argument("--only", help="Comma-separated benchmark names (default: all).")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help="Fake Jira latency per request.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark; the fastest is kept.")
+    parser.add_argument("--baseline", help="Baseline file (default: benchmarks/baselines/<scale>.json).")
+    parser.add_argument("--save", action="store_true", help="Save the results as the new baseline.")
+    parser.add_argument("--compare", action="store_true", help="Exit 1 when results regress against the baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--jira-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.child, {"scale": SCALES[args.scale], "workdir": args.workdir, "jira_url": args.jira_url})
+
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmarks: {', '.join(unknown)}. Available: {', '.join(BENCHMARKS)}", file=sys.stderr)
+        return 2
+    scale = SCALES[args.scale]
+    jira_server = None
+    if any(n.startswith("jira_") for n in names):
+        from benchmarks.fake_jira import FakeJiraServer
+        jira_server = FakeJiraServer(scale["boards"], scale["sprints"], scale["issues"], latency_ms=args.latency_ms)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="devops-cli-bench-") as workdir:
+            for name in names:
+                results[name] = run_benchmark(name, args.scale, workdir, jira_server, max(1, args.repeat))
+    finally:
+        if jira_server is not None:
+            jira_server.close()
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.scale}.json")
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    print(f"Scale: {args.scale} {scale}, fake Jira latency {args.latency_ms} ms")
+    print_table(results, baseline)
+    if args.save:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+    if args.compare:
+        problems = compare(results, baseline or {}, args.tolerance)
+        if baseline is None:
+            print(f"No baseline at {baseline_path}; run with --save first.", file=sys.stderr)
+            return 2
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,521 @@
+"""
+Background agent for Digitalworks2020 DevOps CLI.
+A long-lived process that keeps SDKs imported and Jira/AWS clients, sessions and caches warm, listening on
+a Unix socket readable only by its owner. Non-interactive CLI runs hand their arguments to the agent and
+stream its output back, and run in-process as usual when no agent is listening.
+Standard library only, so forwarding a command does not import any SDK.
+Follows PEP8 and Codacy standards.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import select
+import signal
+import socket
+import struct
+import argparse
+import threading
+import contextlib
+import socketserver
+import subprocess
+from typing import Any, Callable, Dict, Optional
+
+
+AGENT_SOCKET_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_agent.sock")
+AGENT_LOG_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_agent.log")
+# Set to any value to always run commands in-process
+AGENT_DISABLE_ENV = "DEVOPS_CLI_NO_AGENT"
+PROTOCOL_VERSION = 1
+# Besides AWS_*, variables read by the clients (proxies, CA bundles, timezone); proxy variables are
+# matched in either case, as requests reads both
+AGENT_ENVIRONMENT_VARIABLES = frozenset({
+    "HOME", "TZ", "HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY",
+    "REQUESTS_CA_BUNDLE", "CURL_CA_BUNDLE", "SSL_CERT_FILE", "SSL_CERT_DIR"
+})
+DEFAULT_IDLE_TIMEOUT_SECONDS: int = 8 * 60 * 60
+# A successful AWS credential check is trusted for this long before STS is asked again
+CREDENTIAL_CHECK_TTL_SECONDS: int = 5 * 60
+CONNECT_TIMEOUT_SECONDS: float = 1.0
+START_TIMEOUT_SECONDS: float = 15.0
+STOP_TIMEOUT_SECONDS: float = 5.0
+# A command that waits this long for the one running before it is run in-process by the caller instead
+BUSY_TIMEOUT_SECONDS: float = 2.0
+# How often a running command's connection is checked for the caller having gone away
+DISCONNECT_POLL_SECONDS: float = 0.2
+# Captured stdout is sent in chunks of about this many characters (or when the command flushes)
+STREAM_CHUNK_CHARS = 64 * 1024
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+
+class WarmClients:
+    """
+    WarmClients keeps clients (and caches) between agent requests, keyed by everything they were built from,
+    and remembers which credentials were recently verified.
+    """
+    def __init__(self, credential_ttl: int = CREDENTIAL_CHECK_TTL_SECONDS) -> None:
+        self.credential_ttl = credential_ttl
+        self._clients: Dict[Any, Any] = {}
+        self._verified: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, factory: Callable[[], Any]) -> Any:
+        """
+        Get the client stored under key, building it with factory on first use.
+        Raises whatever factory raises; failed builds are not stored.
+        """
+        with self._lock:
+            client = self._clients.get(key)
+        if client is None:
+            client = factory()
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    def verified(self, key: Any, check: Callable[[], bool]) -> bool:
+        """
+        Tell whether the credentials of a client work, calling check only when the last success is older
+        than the TTL. A failed check drops the stored client, so the next request builds a fresh one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            checked_at = self._verified.get(key)
+        if checked_at is not None and now - checked_at < self.credential_ttl:
+            return True
+        ok = check()
+        with self._lock:
+            if ok:
+                self._verified[key] = now
+            else:
+                self._verified.pop(key, None)
+                self._clients.pop(key, None)
+        return ok
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+
+def _environment() -> Dict[str, str]:
+    """Environment that changes what a command does; requests are only forwarded when it matches the agent's."""
+    return {
+        key: value for key, value in os.environ.items()
+        if key.startswith("AWS_") or key.upper() in AGENT_ENVIRONMENT_VARIABLES
+    }
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+class _SocketStream(io.TextIOBase):
+    """
+    Text stream that sends what is written to the client as {channel: text} messages.
+    Once the client is gone (disconnected is set), every write raises BrokenPipeError, so the command stops
+    at its next output as it would under `| head`.
+    """
+    def __init__(self, send: Callable[[Dict[str, Any]], None], channel: str, line_buffered: bool,
+                 disconnected: threading.Event) -> None:
+        super().__init__()
+        self._send = send
+        self._channel = channel
+        self._line_buffered = line_buffered
+        self._disconnected = disconnected
+        self._parts: list[str] = []
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if self._disconnected.is_set():
+            raise BrokenPipeError("the client disconnected")
+        with self._lock:
+            self._parts.append(text)
+            self._size += len(text)
+            due = self._size >= STREAM_CHUNK_CHARS or (self._line_buffered and "\n" in text)
+        if due:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            data, self._parts, self._size = "".join(self._parts), [], 0
+        if data:
+            self._send({self._channel: data})
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles one client connection: a single JSON request line, answered with JSON message lines."""
+    server: "AgentServer"
+
+    def setup(self) -> None:
+        super().setup()
+        self._send_lock = threading.Lock()
+        self._disconnected = threading.Event()
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        if self._disconnected.is_set():
+            raise BrokenPipeError("the client disconnected")
+        with self._send_lock:
+            try:
+                self.wfile.write(_encode(message))
+            except ConnectionError as exc:
+                # The client went away (e.g. its output was piped into head)
+                raise BrokenPipeError(str(exc)) from exc
+
+    def _peer_is_owner(self) -> bool:
+        if not hasattr(socket, "SO_PEERCRED"):
+            # The socket file's 0600 mode is the only check on platforms without peer credentials
+            return True
+        creds = self.request.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", creds)
+        return uid == os.getuid()
+
+    def handle(self) -> None:
+        if not self._peer_is_owner():
+            return
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return
+        self.server.touch()
+        op = request.get("op")
+        try:
+            if op == "status":
+                self._send(self.server.status())
+            elif op == "stop":
+                self._send({"stopping": True})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            elif op == "run":
+                self._run(request)
+        except BrokenPipeError:
+            pass
+        finally:
+            self.server.touch()
+
+    def _watch_disconnect(self, done: threading.Event) -> None:
+        """Set _disconnected when the client closes its end while a command runs (it sends nothing after the request)."""
+        while not done.wait(DISCONNECT_POLL_SECONDS):
+            try:
+                readable, _, _ = select.select([self.request], [], [], 0)
+            except (OSError, ValueError):
+                readable = True
+            if readable:
+                self._disconnected.set()
+                return
+
+    def _run(self, request: Dict[str, Any]) -> None:
+        if request.get("version") != PROTOCOL_VERSION:
+            self._send({"fallback": "agent runs a different version"})
+            return
+        if request.get("env") != self.server.environment:
+            self._send({"fallback": "environment differs from the agent's"})
+            return
+        # One command at a time: commands swap the process-wide sys.stdout/sys.stderr. A command whose caller
+        # went away stops at its next output; callers arriving before then run in-process rather than wait
+        if not self.server.run_lock.acquire(timeout=BUSY_TIMEOUT_SECONDS):
+            self._send({"fallback": "agent is busy with another command"})
+            return
+        done = threading.Event()
+        threading.Thread(target=self._watch_disconnect, args=(done,), name="agent-watch", daemon=True).start()
+        try:
+            out = _SocketStream(self._send, "out", line_buffered=False, disconnected=self._disconnected)
+            err = _SocketStream(self._send, "err", line_buffered=True, disconnected=self._disconnected)
+            saved = sys.stdout, sys.stderr
+            sys.stdout, sys.stderr = out, err
+            try:
+                status = self.server.run_command(request.get("argv") or [])
+            except SystemExit as exc:
+                status = exc.code if isinstance(exc.code, int) else EXIT_USAGE
+            except BrokenPipeError:
+                raise
+            except Exception as exc:
+                print(f"Error: {exc}", file=err)
+                status = EXIT_FAILURE
+            finally:
+                sys.stdout, sys.stderr = saved
+            self.server.requests += 1
+            out.flush()
+            err.flush()
+        finally:
+            done.set()
+            self.server.run_lock.release()
+        self._send({"exit": status})
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    AgentServer accepts CLI requests on a Unix socket and runs them against warm clients.
+    The socket file is created with mode 0600.
+    """
+    daemon_threads = True
+
+    def __init__(self, path: str, idle_timeout: int = DEFAULT_IDLE_TIMEOUT_SECONDS) -> None:
+        """
+        Bind the socket; call serve_forever() to start answering.
+        Args:
+            path (str): Socket path.
+            idle_timeout (int): Seconds without requests after which the agent exits (0: never).
+        """
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        os.chmod(path, 0o600)
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.environment = _environment()
+        self.clients = WarmClients()
+        self.run_lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self._last_activity = time.monotonic()
+
+    def touch(self) -> None:
+        """Record activity, postponing the idle shutdown."""
+        self._last_activity = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the running agent."""
+        return {
+            "pid": os.getpid(), "socket": self.path, "started": self.started,
+            "requests": self.requests, "clients": len(self.clients), "idle_timeout": self.idle_timeout
+        }
+
+    def run_command(self, argv: list) -> int:
+        """Parse and run one non-interactive CLI command with this agent's warm clients."""
+        from devops_cli.main import build_parser, run_command
+        from devops_cli.registry import registered_tools
+        args = build_parser().parse_args(argv)
+        if args.tool not in registered_tools():
+            print("The agent only runs tool operations.", file=sys.stderr)
+            return EXIT_USAGE
+        args.clients = self.clients
+        return run_command(args)
+
+    def watch_idle(self) -> None:
+        """Shut the agent down once it has been idle for idle_timeout seconds."""
+        while True:
+            time.sleep(max(1.0, min(60.0, self.idle_timeout / 4)))
+            idle = time.monotonic() - self._last_activity
+            if idle >= self.idle_timeout and not self.run_lock.locked():
+                self.shutdown()
+                return
+
+
+def _request(message: Dict[str, Any], path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Send a control request and return the agent's single reply, or None when no agent answers."""
+    path = path or AGENT_SOCKET_PATH
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT_SECONDS)
+            sock.connect(path)
+            sock.sendall(_encode(message))
+            with sock.makefile("rb") as replies:
+                line = replies.readline()
+        return json.loads(line) if line else None
+    except (OSError, ValueError):
+        return None
+
+
+def agent_status(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Ask the agent for its status.
+    Returns:
+        Dict with pid, socket, started, requests, clients and idle_timeout, or None when no agent is running.
+    """
+    return _request({"op": "status"}, path)
+
+
+def forward_to_agent(argv: list, path: Optional[str] = None) -> Optional[int]:
+    """
+    Run a CLI command in the agent when one is listening, streaming its output to this process's stdout/stderr.
+    Args:
+        argv (list): Command line arguments (without the program name).
+        path (str, optional): Socket path (default: AGENT_SOCKET_PATH).
+    Returns:
+        The command's exit status, or None when it should run in-process (no agent, agent disabled with
+        DEVOPS_CLI_NO_AGENT, or the agent declined it before producing output).
+    """
+    path = path or AGENT_SOCKET_PATH
+    if os.environ.get(AGENT_DISABLE_ENV) or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT_SECONDS)
+        sock.connect(path)
+        sock.settimeout(None)
+        sock.sendall(_encode({"op": "run", "argv": list(argv), "env": _environment(), "version": PROTOCOL_VERSION}))
+    except OSError:
+        sock.close()
+        return None
+    with sock, sock.makefile("rb") as replies:
+        try:
+            for line in replies:
+                message = json.loads(line)
+                if "out" in message:
+                    sys.stdout.write(message["out"])
+                    sys.stdout.flush()
+                elif "err" in message:
+                    sys.stderr.write(message["err"])
+                    sys.stderr.flush()
+                elif "exit" in message:
+                    return message["exit"]
+                elif "fallback" in message:
+                    return None
+        except BrokenPipeError:
+            # Our reader stopped early; closing the socket stops the command in the agent as well
+            with contextlib.suppress(OSError, ValueError):
+                fd = sys.stdout.fileno()
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, fd)
+                os.close(devnull)
+            return EXIT_OK
+        except KeyboardInterrupt:
+            # Closing the socket stops the command in the agent at its next output
+            return EXIT_INTERRUPTED
+        except (OSError, ValueError):
+            pass
+    print("Lost the connection to the devops-cli agent.", file=sys.stderr)
+    return EXIT_FAILURE
+
+
+def serve(path: Optional[str] = None, idle_timeout: int = DEFAULT_IDLE_TIMEOUT_SECONDS) -> int:
+    """
+    Run the agent in this process until it is stopped, receives SIGTERM/SIGINT or stays idle too long.
+    Args:
+        path (str, optional): Socket path (default: AGENT_SOCKET_PATH).
+        idle_timeout (int): Seconds without requests after which the agent exits (0: never).
+    Returns:
+        int: Exit status.
+    """
+    path = path or AGENT_SOCKET_PATH
+    if agent_status(path) is not None:
+        print(f"An agent is already listening on {path}.", file=sys.stderr)
+        return EXIT_FAILURE
+    # A socket file nobody answers on is left over from an agent that died
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    # Pay for SDK imports once, up front
+    from devops_cli.registry import load_client_class, registered_tools
+    for tool in registered_tools():
+        try:
+            load_client_class(tool)
+        except ImportError as exc:
+            print(f"Not preloading {tool}: {exc}", file=sys.stderr)
+    server = AgentServer(path, idle_timeout=idle_timeout)
+
+    def stop(signum: int, frame: Any) -> None:
+        # shutdown() waits for serve_forever(), which runs in this thread, so call it from another one
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    if idle_timeout > 0:
+        threading.Thread(target=server.watch_idle, name="agent-idle", daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+    return EXIT_OK
+
+
+def start_agent(idle_timeout: int = DEFAULT_IDLE_TIMEOUT_SECONDS, path: Optional[str] = None) -> Optional[int]:
+    """
+    Start the agent as a detached background process and wait until it answers.
+    Returns:
+        The agent's PID, or None if it did not come up (see AGENT_LOG_PATH).
+    """
+    path = path or AGENT_SOCKET_PATH
+    cmd = [sys.executable, "-m", "devops_cli.agent", "--idle-timeout", str(idle_timeout), "--socket", path]
+    with open(AGENT_LOG_PATH, "ab") as log:
+        process = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True, close_fds=True
+        )
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        status = agent_status(path)
+        if status is not None:
+            return status["pid"]
+        if process.poll() is not None:
+            return None
+        time.sleep(0.05)
+    return None
+
+
+def stop_agent(path: Optional[str] = None) -> bool:
+    """
+    Ask the agent to exit and wait until its socket is gone.
+    Returns:
+        True if an agent was stopped, False if none was running.
+    """
+    path = path or AGENT_SOCKET_PATH
+    if _request({"op": "stop"}, path) is None:
+        return False
+    deadline = time.monotonic() + STOP_TIMEOUT_SECONDS
+    while os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+
+def agent_command(args: argparse.Namespace) -> int:
+    """
+    Run `devops-cli agent start|stop|status`.
+    Args:
+        args (argparse.Namespace): Parsed arguments with operation set (and idle_timeout/foreground for start).
+    Returns:
+        int: Exit status (status: 0 when an agent is running, 1 when not).
+    """
+    if args.operation == "start":
+        status = agent_status()
+        if status is not None:
+            print(f"Agent already running (pid {status['pid']}) on {status['socket']}.")
+            return EXIT_OK
+        if args.foreground:
+            return serve(idle_timeout=args.idle_timeout)
+        pid = start_agent(idle_timeout=args.idle_timeout)
+        if pid is None:
+            print(f"The agent did not start; see {AGENT_LOG_PATH}.", file=sys.stderr)
+            return EXIT_FAILURE
+        print(f"Agent started (pid {pid}) on {AGENT_SOCKET_PATH}.")
+        return EXIT_OK
+    if args.operation == "stop":
+        if stop_agent():
+            print("Agent stopped.")
+        else:
+            print("No agent is running.")
+        return EXIT_OK
+    status = agent_status()
+    if status is None:
+        print("No agent is running.")
+        return EXIT_FAILURE
+    uptime = int(time.time() - status["started"])
+    print(f"Agent running (pid {status['pid']}) on {status['socket']}")
+    print(f"  Uptime: {uptime // 3600}h {uptime // 60 % 60}m {uptime % 60}s")
+    print(f"  Requests served: {status['requests']}")
+    print(f"  Warm clients: {status['clients']}")
+    if status["idle_timeout"]:
+        print(f"  Exits after {status['idle_timeout']} seconds without requests")
+    return EXIT_OK
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m devops_cli.agent", description="Run the devops-cli agent in the foreground.")
+    parser.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT_SECONDS, help="Exit after this many idle seconds (0: never).")
+    parser.add_argument("--socket", default=AGENT_SOCKET_PATH, help="Socket path.")
+    args = parser.parse_args(argv)
+    return serve(args.socket, idle_timeout=args.idle_timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,70 +3,296 @@ AWSClient: OOP client for AWS SSO cost operations.
 Follows PEP8 and Codacy standards.
 """
 
-import boto3
+import queue
+import threading
 import botocore
-from datetime import datetime, timedelta
-from typing import Optional, Dict
+import botocore.config
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Optional, Dict, Iterable, Iterator, Tuple
 import subprocess
-import os
+from devops_cli.aws_pool import ClientPool, get_default_pool
+from devops_cli.aws_profiles import get_profile_index
+from devops_cli.cost_cache import CostCache
+from devops_cli.cost_ledger import SERVICE_ACCOUNT_GROUPING, SERVICE_GROUPING, CostLedger
+
+DEFAULT_REGION = 'us-east-1'
+DEFAULT_REGION_WORKERS = 8
+DEFAULT_PROFILE_WORKERS = 8
+EC2_PAGE_SIZE = 1000
+# Pages of instance records waiting for the consumer when regions are streamed concurrently
+EC2_STREAM_QUEUE_PAGES = 8
+# Recent days Cost Explorer may still revise; they are fetched again on every ledger sync
+COST_RESETTLE_DAYS = 3
+# A new ledger starts at the first day of the previous month, so month-to-date has a comparison
+COST_BACKFILL_MONTHS = 1
+# Fail fast on profiles whose credentials cannot be used instead of retrying for minutes
+STS_CONFIG = botocore.config.Config(connect_timeout=5, read_timeout=10, retries={'max_attempts': 2})
+
+class InstanceRecord:
+    """Compact view of one EC2 instance."""
+    __slots__ = ("instance_id", "state", "name", "region")
+
+    def __init__(self, instance_id: str, state: str, name: Optional[str] = None,
+                 region: Optional[str] = None) -> None:
+        self.instance_id = instance_id
+        self.state = state
+        self.name = name
+        self.region = region
+
+    def __repr__(self) -> str:
+        return f"InstanceRecord({self.instance_id!r}, {self.state!r})"
+
+
+def _instance_filters(states: Optional[list] = None, tag_filters: Optional[Dict[str, Any]] = None) -> list:
+    """Build describe_instances Filters from instance states and tag key -> value(s)."""
+    filters = []
+    if states:
+        filters.append({'Name': 'instance-state-name', 'Values': list(states)})
+    for key, values in (tag_filters or {}).items():
+        filters.append({'Name': f'tag:{key}', 'Values': [values] if isinstance(values, str) else list(values)})
+    return filters
+
 
 class AWSClient:
     """OOP client for AWS SSO operations."""
-    def __init__(self, profile: str) -> None:
+    def __init__(self, profile: str, cost_cache: Optional[CostCache] = None,
+                 pool: Optional[ClientPool] = None, cost_ledger: Optional[CostLedger] = None) -> None:
         self.profile = profile
-        self.session = boto3.Session(profile_name=profile)
-        self.ce = self.session.client('ce')
+        # Account ID reported by STS, remembered once asked
+        self._account_id: Optional[str] = None
+        self.cost_cache = cost_cache if cost_cache is not None else CostCache()
+        self.cost_ledger = cost_ledger if cost_ledger is not None else CostLedger()
+        # Sessions and clients come from a process-wide pool so repeated use of a profile stays warm
+        self.pool = pool if pool is not None else get_default_pool()
+        self.session = self.pool.get_session(profile)
+        self.ce = self.pool.get_client(profile, 'ce')
 
-    def list_instances_by_state(self, region_name: str) -> Dict[str, list]:
-        """List EC2 instances grouped by their state (e.g., running, stopped) in the specified region."""
-        ec2 = self.session.client('ec2', region_name=region_name)
+    def client(self, service: str, region_name: Optional[str] = None, config: Optional[Any] = None) -> Any:
+        """Get a pooled client of this profile for a service and region."""
+        return self.pool.get_client(self.profile, service, region_name=region_name, config=config)
+
+    def list_instances_by_state(self, region_name: str, states: Optional[list] = None,
+                                tag_filters: Optional[Dict[str, Any]] = None) -> Dict[str, list]:
+        """List EC2 instances (as InstanceRecords) grouped by their state (e.g., running, stopped) in the specified region."""
         try:
-            paginator = ec2.get_paginator('describe_instances')
-            state_map = {}
-            for page in paginator.paginate():
-                for reservation in page.get('Reservations', []):
-                    for instance in reservation.get('Instances', []):
-                        state = instance.get('State', {}).get('Name', 'unknown')
-                        instance_id = instance.get('InstanceId')
-                        # Try to get Name tag
-                        name = None
-                        for tag in instance.get('Tags', []):
-                            if tag.get('Key') == 'Name':
-                                name = tag.get('Value')
-                                break
-                        entry = {'InstanceId': instance_id}
-                        if name:
-                            entry['Name'] = name
-                        state_map.setdefault(state, []).append(entry)
-            return state_map
+            return self._group_by_state(self.iter_instances(region_name, states=states, tag_filters=tag_filters))
         except Exception as exc:
             print(f"Error listing EC2 instances: {exc}")
             return {}
 
+    def iter_instances(self, region_name: str, states: Optional[list] = None,
+                       tag_filters: Optional[Dict[str, Any]] = None) -> Iterator[InstanceRecord]:
+        """
+        Stream EC2 instances of one region as compact records, one page at a time.
+        State and tag filters are applied by EC2, not in Python.
+        Args:
+            region_name (str): AWS region.
+            states (list, optional): Instance states to include (e.g., ["running"]).
+            tag_filters (dict, optional): Tag key -> value or list of values to match.
+        Returns:
+            Iterator of InstanceRecord. Raises on request errors while iterating.
+        """
+        ec2 = self.client('ec2', region_name=region_name)
+        return self._iter_instances(ec2, _instance_filters(states, tag_filters), region_name)
+
+    def count_instances_by_state(self, region_name: str, states: Optional[list] = None,
+                                 tag_filters: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        Count EC2 instances by state in one region without keeping any per-instance objects.
+        Args:
+            region_name (str): AWS region.
+            states (list, optional): Instance states to include.
+            tag_filters (dict, optional): Tag key -> value or list of values to match.
+        Returns:
+            Dict mapping state to instance count, or {} if error.
+        """
+        ec2 = self.client('ec2', region_name=region_name)
+        try:
+            return self._count_by_state(ec2, _instance_filters(states, tag_filters))
+        except Exception as exc:
+            print(f"Error counting EC2 instances: {exc}")
+            return {}
+
+    def list_enabled_regions(self) -> list:
+        """List the EC2 regions enabled for the account (opted-in or not requiring opt-in)."""
+        ec2 = self.client('ec2', region_name=self.session.region_name or DEFAULT_REGION)
+        resp = ec2.describe_regions(AllRegions=False)
+        return sorted(region['RegionName'] for region in resp.get('Regions', []))
+
+    def list_instances_by_region(self, regions: Optional[list] = None,
+                                 max_workers: int = DEFAULT_REGION_WORKERS,
+                                 states: Optional[list] = None,
+                                 tag_filters: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, list]]:
+        """
+        List EC2 instances grouped by region and state, querying regions concurrently.
+        Args:
+            regions (list, optional): Regions to query. Defaults to every enabled region.
+            max_workers (int): Maximum number of regions queried at once.
+            states (list, optional): Instance states to include.
+            tag_filters (dict, optional): Tag key -> value or list of values to match.
+        Returns:
+            Dict mapping region to {state: [InstanceRecord]}. Regions that fail are reported and left out.
+        """
+        filters = _instance_filters(states, tag_filters)
+        return self._query_regions(
+            regions, lambda ec2, region: self._group_by_state(self._iter_instances(ec2, filters, region)), max_workers
+        )
+
+    def count_instances_by_region(self, regions: Optional[list] = None,
+                                  max_workers: int = DEFAULT_REGION_WORKERS,
+                                  states: Optional[list] = None,
+                                  tag_filters: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Count EC2 instances by region and state, querying regions concurrently.
+        Args:
+            regions (list, optional): Regions to query. Defaults to every enabled region.
+            max_workers (int): Maximum number of regions queried at once.
+            states (list, optional): Instance states to include.
+            tag_filters (dict, optional): Tag key -> value or list of values to match.
+        Returns:
+            Dict mapping region to {state: count}. Regions that fail are reported and left out.
+        """
+        filters = _instance_filters(states, tag_filters)
+        return self._query_regions(regions, lambda ec2, region: self._count_by_state(ec2, filters), max_workers)
+
+    def iter_instances_by_region(self, regions: Optional[list] = None,
+                                 max_workers: int = DEFAULT_REGION_WORKERS,
+                                 states: Optional[list] = None,
+                                 tag_filters: Optional[Dict[str, Any]] = None) -> Iterator[InstanceRecord]:
+        """
+        Stream EC2 instances of many regions as their pages arrive, querying regions concurrently.
+        Only a few pages are held at a time: regions wait while the consumer is behind.
+        Args:
+            regions (list, optional): Regions to query. Defaults to every enabled region.
+            max_workers (int): Maximum number of regions queried at once.
+            states (list, optional): Instance states to include.
+            tag_filters (dict, optional): Tag key -> value or list of values to match.
+        Returns:
+            Iterator of InstanceRecord (with region set), regions interleaved. Regions that fail are reported and skipped.
+        """
+        if not regions:
+            try:
+                regions = self.list_enabled_regions()
+            except Exception as exc:
+                print(f"Error listing enabled regions: {exc}")
+                return
+        filters = _instance_filters(states, tag_filters)
+        clients = {region: self.client('ec2', region_name=region) for region in regions}
+        pages: queue.Queue = queue.Queue(maxsize=EC2_STREAM_QUEUE_PAGES)
+        stopped = threading.Event()
+        region_done = object()
+
+        def put(item: Any) -> bool:
+            # Give up when the consumer has stopped, instead of blocking on a full queue forever
+            while not stopped.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(ec2: Any, region: str) -> None:
+            try:
+                for page in self._iter_instance_pages(ec2, filters, region):
+                    if page and not put(page):
+                        return
+            except Exception as exc:
+                print(f"Error listing EC2 instances in {region}: {exc}")
+            finally:
+                put(region_done)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(clients))), thread_name_prefix="ec2-stream")
+        try:
+            for region, ec2 in clients.items():
+                pool.submit(produce, ec2, region)
+            remaining = len(clients)
+            while remaining:
+                page = pages.get()
+                if page is region_done:
+                    remaining -= 1
+                    continue
+                yield from page
+        finally:
+            stopped.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _query_regions(self, regions: Optional[list], query: Any, max_workers: int) -> Dict[str, Any]:
+        """Run query(ec2_client, region) for every region concurrently; failing regions are reported and skipped."""
+        if not regions:
+            try:
+                regions = self.list_enabled_regions()
+            except Exception as exc:
+                print(f"Error listing enabled regions: {exc}")
+                return {}
+        clients = {region: self.client('ec2', region_name=region) for region in regions}
+        inventory: Dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(clients)))) as pool:
+            futures = {region: pool.submit(query, ec2, region) for region, ec2 in clients.items()}
+            for region, future in futures.items():
+                try:
+                    inventory[region] = future.result()
+                except Exception as exc:
+                    print(f"Error listing EC2 instances in {region}: {exc}")
+        return inventory
+
+    @classmethod
+    def _iter_instances(cls, ec2: Any, filters: list, region_name: Optional[str] = None) -> Iterator[InstanceRecord]:
+        """Page describe_instances on one regional client, yielding compact records. Raises on errors."""
+        for page in cls._iter_instance_pages(ec2, filters, region_name):
+            yield from page
+
+    @staticmethod
+    def _iter_instance_pages(ec2: Any, filters: list, region_name: Optional[str] = None) -> Iterator[list]:
+        """Page describe_instances on one regional client, yielding each page as a list of compact records. Raises on errors."""
+        paginator = ec2.get_paginator('describe_instances')
+        for page in paginator.paginate(Filters=filters, PaginationConfig={'PageSize': EC2_PAGE_SIZE}):
+            records = []
+            for reservation in page.get('Reservations', []):
+                for instance in reservation.get('Instances', []):
+                    # Try to get Name tag
+                    name = None
+                    for tag in instance.get('Tags', []):
+                        if tag.get('Key') == 'Name':
+                            name = tag.get('Value')
+                            break
+                    records.append(InstanceRecord(
+                        instance.get('InstanceId'),
+                        instance.get('State', {}).get('Name', 'unknown'),
+                        name,
+                        region_name
+                    ))
+            yield records
+
+    @staticmethod
+    def _count_by_state(ec2: Any, filters: list) -> Dict[str, int]:
+        """Page describe_instances on one regional client and count instances per state. Raises on errors."""
+        paginator = ec2.get_paginator('describe_instances')
+        counts: Dict[str, int] = {}
+        for page in paginator.paginate(Filters=filters, PaginationConfig={'PageSize': EC2_PAGE_SIZE}):
+            for reservation in page.get('Reservations', []):
+                for instance in reservation.get('Instances', []):
+                    state = instance.get('State', {}).get('Name', 'unknown')
+                    counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    @staticmethod
+    def _group_by_state(instances: Iterable[InstanceRecord]) -> Dict[str, list]:
+        state_map: Dict[str, list] = {}
+        for instance in instances:
+            state_map.setdefault(instance.state, []).append(instance)
+        return state_map
+
     @staticmethod
     def list_profiles() -> list:
-        """List available AWS CLI profiles."""
-        import configparser
-        profiles = []
-        aws_config = os.path.expanduser('~/.aws/config')
-        aws_creds = os.path.expanduser('~/.aws/credentials')
-        parser = configparser.ConfigParser()
-        if os.path.exists(aws_config):
-            parser.read(aws_config)
-            for section in parser.sections():
-                if section.startswith('profile '):
-                    profiles.append(section.replace('profile ', ''))
-        if os.path.exists(aws_creds):
-            parser.read(aws_creds)
-            for section in parser.sections():
-                if section not in profiles:
-                    profiles.append(section)
-        return sorted(set(profiles))
+        """List available AWS CLI profiles (from the cached profile index, see aws_profiles.py)."""
+        return get_profile_index().names()
 
     def check_credentials(self) -> bool:
         """Check if the current profile's credentials are valid and not expired."""
         try:
-            sts = self.session.client('sts')
+            sts = self.client('sts', config=STS_CONFIG)
             sts.get_caller_identity()
             return True
         except botocore.exceptions.ClientError as exc:
@@ -76,31 +302,312 @@ class AWSClient:
         except Exception:
             return False
 
+    def get_account_id(self) -> str:
+        """Return the AWS account ID the profile resolves to. Raises when credentials are missing or expired."""
+        sts = self.client('sts', config=STS_CONFIG)
+        self._account_id = sts.get_caller_identity()['Account']
+        return self._account_id
+
+    def _cost_account_id(self) -> str:
+        """
+        Account ID the cost cache is keyed by: the one STS already reported, else the one the profile's config
+        names (sso_account_id or role_arn), else one asked from STS. Raises when STS cannot be reached.
+        """
+        if self._account_id is not None:
+            return self._account_id
+        entry = get_profile_index().get(self.profile)
+        if entry is not None and entry.account_id:
+            return entry.account_id
+        return self.get_account_id()
+
+    @classmethod
+    def get_month_cost_all_profiles(cls, year: int, month: int, profiles: Optional[list] = None,
+                                    max_workers: int = DEFAULT_PROFILE_WORKERS) -> Dict[str, Any]:
+        """
+        Get AWS cost for a given year and month across many profiles at once.
+        Profiles resolving to the same account ID are queried and counted once. Profiles whose config names
+        their account (sso_account_id or role_arn) are grouped from the profile index, and only one of them
+        per account is checked with STS; the others are not contacted.
+        Args:
+            year (int): Year.
+            month (int): Month.
+            profiles (list, optional): Profiles to query. Defaults to every profile from list_profiles().
+            max_workers (int): Maximum number of profiles queried at once.
+        Returns:
+            Dict with "accounts" (list of {"account_id", "profiles", "cost"} sorted by cost, descending),
+            "total" (float) and "skipped" ({profile: reason}).
+        """
+        if profiles is None:
+            profiles = cls.list_profiles()
+        skipped: Dict[str, str] = {}
+        known, unknown = get_profile_index().profiles_by_account(profiles)
+
+        def resolve(profile: str):
+            client = cls(profile)
+            return client, client.get_account_id()
+
+        def resolve_known(candidates: list):
+            # Profiles of one account share its cost: the first one with working credentials is enough
+            failed = {}
+            for position, profile in enumerate(candidates):
+                try:
+                    client, account_id = resolve(profile)
+                except Exception as exc:
+                    failed[profile] = f"credentials expired or unavailable ({exc.__class__.__name__})"
+                    continue
+                return client, account_id, candidates[position:], failed
+            return None, None, [], failed
+
+        clients_by_account: Dict[str, Any] = {}
+        profiles_by_account: Dict[str, list] = {}
+        workers = max(1, min(max_workers, len(known) + len(unknown) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            known_futures = [pool.submit(resolve_known, candidates) for candidates in known.values()]
+            futures = {profile: pool.submit(resolve, profile) for profile in unknown}
+            for future in known_futures:
+                client, account_id, covered, failed = future.result()
+                skipped.update(failed)
+                if client is not None:
+                    clients_by_account.setdefault(account_id, client)
+                    profiles_by_account.setdefault(account_id, []).extend(covered)
+            for profile, future in futures.items():
+                try:
+                    client, account_id = future.result()
+                except Exception as exc:
+                    skipped[profile] = f"credentials expired or unavailable ({exc.__class__.__name__})"
+                    continue
+                clients_by_account.setdefault(account_id, client)
+                profiles_by_account.setdefault(account_id, []).append(profile)
+            cost_futures = {
+                account_id: pool.submit(client.get_month_cost, year, month)
+                for account_id, client in clients_by_account.items()
+            }
+            accounts = []
+            for account_id, future in cost_futures.items():
+                cost = future.result()
+                if cost is None:
+                    for profile in profiles_by_account[account_id]:
+                        skipped[profile] = "cost query failed"
+                    continue
+                accounts.append({
+                    "account_id": account_id,
+                    "profiles": profiles_by_account[account_id],
+                    "cost": cost
+                })
+        accounts.sort(key=lambda row: row["cost"], reverse=True)
+        return {
+            "accounts": accounts,
+            "total": sum(row["cost"] for row in accounts),
+            "skipped": skipped
+        }
+
     @staticmethod
     def sso_login(profile: str) -> None:
         """Prompt user to run aws sso login for the given profile."""
         print(f"AWS credentials for profile '{profile}' are expired or missing.")
         print(f"Please run: aws sso login --profile {profile}")
         subprocess.run(["aws", "sso", "login", "--profile", profile], check=True)
+        # Drop pooled sessions/clients that may hold the expired credentials
+        get_default_pool().invalidate(profile)
 
     def get_month_cost(self, year: int, month: int) -> Optional[float]:
-        """Get AWS cost for a given year and month."""
-        start = datetime(year, month, 1)
-        if month == 12:
-            end = datetime(year + 1, 1, 1)
-        else:
-            end = datetime(year, month + 1, 1)
+        """Get AWS cost for a given year and month (closed months are served from the local cost cache)."""
+        costs = self.get_monthly_costs(year, month, 1)
+        if costs is None:
+            return None
+        return costs.get(_month_key(year, month))
+
+    def get_monthly_costs(self, start_year: int, start_month: int, months: int) -> Optional[Dict[str, float]]:
+        """
+        Get AWS cost for a range of months with at most one Cost Explorer query.
+        Closed months are served from the local cost cache once fetched; the open month is always re-queried.
+        Cached months are keyed by the account the profile resolves to, so repointing a profile refetches them.
+        Args:
+            start_year (int): Year of the first month.
+            start_month (int): First month.
+            months (int): Number of months, including the first.
+        Returns:
+            Dict mapping "YYYY-MM" to cost in month order (months in the future are left out), or None if error.
+        """
+        now = datetime.utcnow()
+        open_key = _month_key(now.year, now.month)
+        keys = [_month_key(*_add_months(start_year, start_month, offset)) for offset in range(months)]
+        keys = [key for key in keys if key <= open_key]
         try:
-            resp = self.ce.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start.strftime('%Y-%m-%d'),
-                    'End': end.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost']
-            )
-            amount = resp['ResultsByTime'][0]['Total']['UnblendedCost']['Amount']
-            return float(amount)
+            account_id = self._cost_account_id()
         except Exception as exc:
             print(f"Error fetching AWS cost: {exc}")
             return None
+        cached = self.cost_cache.get_months(account_id, self.profile)
+        missing = [key for key in keys if key == open_key or key not in cached]
+        costs = {key: cached[key] for key in keys if key not in missing}
+        if missing:
+            try:
+                fetched = self._fetch_monthly_costs(missing[0], missing[-1])
+            except Exception as exc:
+                print(f"Error fetching AWS cost: {exc}")
+                return None
+            self.cost_cache.set_months(account_id, self.profile, {
+                key: amount for key, (amount, estimated) in fetched.items()
+                if key < open_key and not estimated
+            })
+            costs.update({key: amount for key, (amount, _) in fetched.items() if key in keys})
+        return {key: costs[key] for key in keys if key in costs}
+
+    def _fetch_monthly_costs(self, first_key: str, last_key: str) -> Dict[str, Tuple[float, bool]]:
+        """Query Cost Explorer once (following NextPageToken) for every month from first_key to last_key."""
+        first_year, first_month = (int(part) for part in first_key.split('-'))
+        last_year, last_month = (int(part) for part in last_key.split('-'))
+        end_year, end_month = _add_months(last_year, last_month, 1)
+        params = {
+            'TimePeriod': {
+                'Start': datetime(first_year, first_month, 1).strftime('%Y-%m-%d'),
+                'End': datetime(end_year, end_month, 1).strftime('%Y-%m-%d')
+            },
+            'Granularity': 'MONTHLY',
+            'Metrics': ['UnblendedCost']
+        }
+        results: Dict[str, Tuple[float, bool]] = {}
+        while True:
+            resp = self.ce.get_cost_and_usage(**params)
+            for item in resp.get('ResultsByTime', []):
+                key = item['TimePeriod']['Start'][:7]
+                amount = float(item['Total']['UnblendedCost']['Amount'])
+                results[key] = (amount, bool(item.get('Estimated', False)))
+            token = resp.get('NextPageToken')
+            if not token:
+                return results
+            params['NextPageToken'] = token
+
+    def sync_daily_costs(self, by_account: bool = False, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Bring the profile's daily cost ledger up to date with one Cost Explorer query (following NextPageToken).
+        Only days after the last stored one are fetched, plus the last COST_RESETTLE_DAYS stored days, which
+        Cost Explorer may still revise. A ledger synced within its TTL is not queried again unless refresh is set.
+        Args:
+            by_account (bool): Also group by linked account (kept apart from the service-only ledger).
+            refresh (bool): Query Cost Explorer even when the ledger is fresh.
+        Returns:
+            Dict with "first_day"/"last_day" fetched (None when nothing was fetched), "days" and "requests"
+            (paid Cost Explorer calls made), or None if error.
+        """
+        grouping = SERVICE_ACCOUNT_GROUPING if by_account else SERVICE_GROUPING
+        if not refresh and self.cost_ledger.is_fresh(self.profile, grouping):
+            return {"first_day": None, "last_day": None, "days": 0, "requests": 0}
+        today = datetime.utcnow().date()
+        backfill_start = date(*_add_months(today.year, today.month, -COST_BACKFILL_MONTHS), 1)
+        state = self.cost_ledger.get_sync_state(self.profile, grouping)
+        first = backfill_start
+        if state is not None and state[0]:
+            resettle_from = date.fromisoformat(state[0]) - timedelta(days=COST_RESETTLE_DAYS - 1)
+            first = max(min(resettle_from, today), backfill_start)
+        try:
+            rows, requests = self._fetch_daily_costs(first, today, grouping)
+        except Exception as exc:
+            print(f"Error fetching daily AWS cost: {exc}")
+            return None
+        self.cost_ledger.replace_days(self.profile, grouping, first.isoformat(), today.isoformat(), rows)
+        return {
+            "first_day": first.isoformat(), "last_day": today.isoformat(),
+            "days": (today - first).days + 1, "requests": requests
+        }
+
+    def _fetch_daily_costs(self, first: date, last: date, grouping: str) -> Tuple[list, int]:
+        """Query Cost Explorer for daily cost per group from first to last (inclusive); returns (rows, calls made)."""
+        params = {
+            'TimePeriod': {'Start': first.isoformat(), 'End': (last + timedelta(days=1)).isoformat()},
+            'Granularity': 'DAILY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': [{'Type': 'DIMENSION', 'Key': key} for key in grouping.split(',')]
+        }
+        rows = []
+        requests = 0
+        while True:
+            resp = self.ce.get_cost_and_usage(**params)
+            requests += 1
+            for item in resp.get('ResultsByTime', []):
+                day = item['TimePeriod']['Start'][:10]
+                estimated = bool(item.get('Estimated', False))
+                for group in item.get('Groups', []):
+                    keys = group.get('Keys', [])
+                    amount = float(group['Metrics']['UnblendedCost']['Amount'])
+                    rows.append((day, keys[0], keys[1] if len(keys) > 1 else '', amount, estimated))
+            token = resp.get('NextPageToken')
+            if not token:
+                return rows, requests
+            params['NextPageToken'] = token
+
+    def get_daily_cost_report(self, by_account: bool = False, days: int = 7, top: int = 5,
+                              refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Sync the daily cost ledger, then report from it: month-to-date cost by service, daily totals with
+        day-over-day changes, and the services whose cost moved most on the last complete day.
+        Args:
+            by_account (bool): Group by service and linked account.
+            days (int): Number of complete days (ending yesterday, UTC) in the daily totals.
+            top (int): Number of top movers.
+            refresh (bool): Query Cost Explorer even when the ledger is fresh.
+        Returns:
+            Dict with "sync" (see sync_daily_costs), "month_start", "today", "month_to_date" (total),
+            "services" ([{"service", "linked_account", "cost"}], largest first), "daily" ([{"day", "cost", "change"}]),
+            "movers_day", "movers_previous_day" and "movers" ([{"service", "linked_account", "cost", "previous", "change"}]),
+            or None if the ledger could not be synced.
+        """
+        sync = self.sync_daily_costs(by_account=by_account, refresh=refresh)
+        if sync is None:
+            return None
+        grouping = SERVICE_ACCOUNT_GROUPING if by_account else SERVICE_GROUPING
+        today = datetime.utcnow().date()
+        month_start = today.replace(day=1)
+        last_complete = today - timedelta(days=1)
+        previous = last_complete - timedelta(days=1)
+        services = self.cost_ledger.totals_by_service(self.profile, grouping, month_start.isoformat(), today.isoformat())
+        # One extra day so the first listed day has a change too
+        totals = self.cost_ledger.daily_totals(
+            self.profile, grouping, (last_complete - timedelta(days=max(1, days))).isoformat(), last_complete.isoformat()
+        )
+        daily = []
+        for idx, (day, cost) in enumerate(totals):
+            before = totals[idx - 1] if idx else None
+            change = cost - before[1] if before and before[0] == _previous_day(day) else None
+            daily.append({"day": day, "cost": cost, "change": change})
+        daily = daily[-max(1, days):]
+        movers = self.cost_ledger.movers(self.profile, grouping, last_complete.isoformat(), previous.isoformat(), top)
+        return {
+            "sync": sync,
+            "month_start": month_start.isoformat(),
+            "today": today.isoformat(),
+            "month_to_date": sum(cost for _, _, cost in services),
+            "services": [{"service": service, "linked_account": account or None, "cost": cost} for service, account, cost in services],
+            "daily": daily,
+            "movers_day": last_complete.isoformat(),
+            "movers_previous_day": previous.isoformat(),
+            "movers": [
+                {"service": service, "linked_account": account or None, "cost": cost, "previous": before, "change": cost - before}
+                for service, account, cost, before in movers
+            ]
+        }
+
+    def iter_daily_costs(self, first_day: str, last_day: str, by_account: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the ledger's daily rows (see CostLedger.iter_days) for a range of days; no Cost Explorer call is made.
+        Args:
+            first_day (str): First day, "YYYY-MM-DD".
+            last_day (str): Last day, "YYYY-MM-DD".
+            by_account (bool): Read the service and linked account ledger.
+        """
+        grouping = SERVICE_ACCOUNT_GROUPING if by_account else SERVICE_GROUPING
+        return self.cost_ledger.iter_days(self.profile, grouping, first_day, last_day)
+
+
+def _previous_day(day: str) -> str:
+    return (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+
+
+def _month_key(year: int, month: int) -> str:
+    return f"{year}-{month:02d}"
+
+
+def _add_months(year: int, month: int, offset: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + offset
+    return index // 12, index % 12 + 1
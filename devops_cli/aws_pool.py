@@ -0,0 +1,150 @@
+"""
+Process-wide boto3 session and client pool for Digitalworks2020 DevOps CLI.
+Sessions are kept per profile and clients per (profile, service, region, client config) with LRU eviction,
+so switching back to a profile or repeating an operation reuses warm clients and their connections.
+Follows PEP8 and Codacy standards.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import boto3
+import botocore.config
+
+from devops_cli import tracing
+
+
+DEFAULT_MAX_CLIENTS: int = 64
+DEFAULT_MAX_POOL_CONNECTIONS: int = 20
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def config_key(config: Optional[botocore.config.Config]) -> Hashable:
+    """Hashable form of a botocore client config (every option, nested dicts included); None stays None."""
+    if config is None:
+        return None
+    return tuple((name, _freeze(getattr(config, name, None))) for name in botocore.config.Config.OPTION_DEFAULTS)
+
+
+class ClientPool:
+    """
+    ClientPool hands out shared boto3 sessions and clients.
+    Client creation is serialized because boto3 sessions are not thread-safe; the clients themselves are.
+    """
+    def __init__(self, max_clients: int = DEFAULT_MAX_CLIENTS,
+                 max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS) -> None:
+        """
+        Initialize an empty pool.
+        Args:
+            max_clients (int): Number of clients kept before the least recently used one is evicted.
+            max_pool_connections (int): HTTP connections each client keeps open (botocore default is 10).
+        """
+        self.max_clients = max_clients
+        self.max_pool_connections = max_pool_connections
+        self._sessions: Dict[str, boto3.Session] = {}
+        self._clients: "OrderedDict[Tuple[str, str, Optional[str], Hashable], Any]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get_session(self, profile: str) -> boto3.Session:
+        """
+        Get the shared session of a profile, creating it on first use.
+        Args:
+            profile (str): AWS CLI profile name.
+        Returns:
+            boto3.Session
+        """
+        with self._lock:
+            session = self._sessions.get(profile)
+            if session is None:
+                session = boto3.Session(profile_name=profile)
+                self._sessions[profile] = session
+            return session
+
+    def get_client(self, profile: str, service: str, region_name: Optional[str] = None,
+                   config: Optional[botocore.config.Config] = None) -> Any:
+        """
+        Get a shared client, creating it on first use.
+        Args:
+            profile (str): AWS CLI profile name.
+            service (str): Service name (e.g., "ec2").
+            region_name (str, optional): Region. Defaults to the profile's region.
+            config (botocore.config.Config, optional): Extra client config; clients with different configs are kept apart.
+        Returns:
+            A boto3 client.
+        """
+        with self._lock:
+            session = self.get_session(profile)
+            key = (profile, service, region_name or session.region_name, config_key(config))
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            client_config = botocore.config.Config(max_pool_connections=self.max_pool_connections)
+            if config is not None:
+                # botocore rewrites the retries dict of the config it is given; a copy keeps the caller's
+                # config (and so its pool key) unchanged
+                client_config = client_config.merge(copy.deepcopy(config))
+            client = session.client(service, region_name=region_name, config=client_config)
+            if tracing.active():
+                tracing.instrument_botocore(client)
+            self._clients[key] = client
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+            return client
+
+    def invalidate(self, profile: Optional[str] = None) -> None:
+        """
+        Drop pooled sessions and clients, e.g. after new credentials were issued.
+        Args:
+            profile (str, optional): Profile to drop. Drops everything when omitted.
+        """
+        with self._lock:
+            if profile is None:
+                self._sessions.clear()
+                self._clients.clear()
+                return
+            self._sessions.pop(profile, None)
+            for key in [key for key in self._clients if key[0] == profile]:
+                del self._clients[key]
+
+
+_default_pool: Optional[ClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> ClientPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool()
+        return _default_pool
+
+
+def configure_default_pool(max_clients: int = DEFAULT_MAX_CLIENTS,
+                           max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS) -> ClientPool:
+    """
+    Replace the process-wide pool with one using the given limits.
+    Args:
+        max_clients (int): Number of clients kept before LRU eviction.
+        max_pool_connections (int): HTTP connections per client.
+    Returns:
+        ClientPool: The new default pool.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        _default_pool = ClientPool(max_clients=max_clients, max_pool_connections=max_pool_connections)
+        return _default_pool
@@ -0,0 +1,219 @@
+"""
+AWS CLI profile index for Digitalworks2020 DevOps CLI.
+Parses the AWS config and credentials files (each with its own parser) into one entry per profile
+with its account ID, role, region, SSO session and source file, and re-parses only when either
+file's mtime or size changes. Lookups by account, role or SSO session use prebuilt indexes.
+Standard library only, so it can be used without importing boto3.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+import configparser
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+
+DEFAULT_CONFIG_FILE = "~/.aws/config"
+DEFAULT_CREDENTIALS_FILE = "~/.aws/credentials"
+PROFILE_PREFIX = "profile "
+
+
+class ProfileEntry:
+    """One AWS CLI profile."""
+    __slots__ = ("name", "account_id", "role", "region", "sso_session", "source_file")
+
+    def __init__(self, name: str, account_id: Optional[str] = None, role: Optional[str] = None,
+                 region: Optional[str] = None, sso_session: Optional[str] = None,
+                 source_file: Optional[str] = None) -> None:
+        self.name = name
+        self.account_id = account_id
+        self.role = role
+        self.region = region
+        self.sso_session = sso_session
+        self.source_file = source_file
+
+    def __repr__(self) -> str:
+        return f"ProfileEntry({self.name!r}, account_id={self.account_id!r}, role={self.role!r})"
+
+
+def _parse_role_arn(role_arn: str) -> Tuple[Optional[str], Optional[str]]:
+    """Split arn:aws:iam::<account>:role/<path/name> into (account ID, role name)."""
+    parts = role_arn.split(":", 5)
+    if len(parts) != 6 or not parts[5].startswith("role/"):
+        return None, None
+    return parts[4] or None, parts[5].rsplit("/", 1)[-1]
+
+
+def _read_ini(path: str) -> Optional[configparser.ConfigParser]:
+    """Parse one INI file with a parser of its own; None when the file is missing or unreadable."""
+    if not os.path.exists(path):
+        return None
+    # No interpolation: values such as URLs may contain '%'
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(path)
+    except (OSError, configparser.Error) as exc:
+        print(f"Error reading AWS profiles from {path}: {exc}")
+        return None
+    return parser
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ProfileIndex:
+    """
+    ProfileIndex lists AWS CLI profiles with their account, role and SSO details.
+    The files are parsed on first use and again only after one of them changes on disk.
+    """
+    def __init__(self, config_file: Optional[str] = None, credentials_file: Optional[str] = None) -> None:
+        """
+        Initialize the index; nothing is read until the first lookup.
+        Args:
+            config_file (str, optional): AWS config path (default: $AWS_CONFIG_FILE or ~/.aws/config).
+            credentials_file (str, optional): Credentials path (default: $AWS_SHARED_CREDENTIALS_FILE or ~/.aws/credentials).
+        """
+        self.config_file = os.path.expanduser(config_file or os.environ.get("AWS_CONFIG_FILE") or DEFAULT_CONFIG_FILE)
+        self.credentials_file = os.path.expanduser(
+            credentials_file or os.environ.get("AWS_SHARED_CREDENTIALS_FILE") or DEFAULT_CREDENTIALS_FILE
+        )
+        self._stamps: Optional[Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]] = None
+        self._entries: Dict[str, ProfileEntry] = {}
+        self._by_account: Dict[str, list[str]] = {}
+        self._by_role: Dict[str, list[str]] = {}
+        self._by_sso_session: Dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def _build(self) -> None:
+        entries: Dict[str, ProfileEntry] = {}
+        config = _read_ini(self.config_file)
+        if config is not None:
+            for section in config.sections():
+                # The config file names profiles "profile <name>", except for "default"; skips sso-session sections
+                if section.startswith(PROFILE_PREFIX):
+                    name = section[len(PROFILE_PREFIX):].strip()
+                elif section == "default":
+                    name = section
+                else:
+                    continue
+                values = config[section]
+                account_id, role = values.get("sso_account_id"), values.get("sso_role_name")
+                if values.get("role_arn"):
+                    arn_account, arn_role = _parse_role_arn(values["role_arn"])
+                    account_id, role = account_id or arn_account, role or arn_role
+                entries[name] = ProfileEntry(
+                    name, account_id, role, values.get("region"), values.get("sso_session"), self.config_file
+                )
+        credentials = _read_ini(self.credentials_file)
+        if credentials is not None:
+            for name in credentials.sections():
+                # Profiles also defined in the config file keep their config entry
+                entries.setdefault(name, ProfileEntry(name, source_file=self.credentials_file))
+        by_account: Dict[str, list[str]] = {}
+        by_role: Dict[str, list[str]] = {}
+        by_sso_session: Dict[str, list[str]] = {}
+        for name in sorted(entries):
+            entry = entries[name]
+            if entry.account_id:
+                by_account.setdefault(entry.account_id, []).append(name)
+            if entry.role:
+                by_role.setdefault(entry.role.lower(), []).append(name)
+            if entry.sso_session:
+                by_sso_session.setdefault(entry.sso_session, []).append(name)
+        self._entries = {name: entries[name] for name in sorted(entries)}
+        self._by_account, self._by_role, self._by_sso_session = by_account, by_role, by_sso_session
+
+    def _refresh(self) -> None:
+        stamps = self.stamps()
+        with self._lock:
+            if stamps != self._stamps:
+                self._build()
+                self._stamps = stamps
+
+    def stamps(self) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+        """Get the (mtime, size) of the config and credentials files; the result changes whenever either is edited."""
+        return _file_stamp(self.config_file), _file_stamp(self.credentials_file)
+
+    def names(self) -> list[str]:
+        """
+        List profile names.
+        Returns:
+            Sorted profile names from both files.
+        """
+        self._refresh()
+        return list(self._entries)
+
+    def get(self, name: str) -> Optional[ProfileEntry]:
+        """Get the entry of a profile, or None if it is not defined."""
+        self._refresh()
+        return self._entries.get(name)
+
+    def entries(self) -> list[ProfileEntry]:
+        """Get every profile entry, sorted by name."""
+        self._refresh()
+        return list(self._entries.values())
+
+    def find(self, account_id: Optional[str] = None, role: Optional[str] = None,
+             sso_session: Optional[str] = None, region: Optional[str] = None) -> list[ProfileEntry]:
+        """
+        Find profiles matching every given criterion.
+        Args:
+            account_id (str, optional): AWS account ID.
+            role (str, optional): Role name (SSO role or the role part of role_arn), case-insensitive.
+            sso_session (str, optional): sso-session name.
+            region (str, optional): Profile region.
+        Returns:
+            Matching entries sorted by name.
+        """
+        self._refresh()
+        candidates: Optional[Iterable[str]] = None
+        for lookup, key in ((self._by_account, account_id), (self._by_sso_session, sso_session),
+                            (self._by_role, role.lower() if role else None)):
+            if key is None:
+                continue
+            names = lookup.get(key, [])
+            if candidates is None:
+                candidates = names
+            else:
+                wanted = set(names)
+                candidates = [name for name in candidates if name in wanted]
+        entries = [self._entries[name] for name in candidates] if candidates is not None else list(self._entries.values())
+        if region is not None:
+            entries = [entry for entry in entries if entry.region == region]
+        return entries
+
+    def profiles_by_account(self, names: Optional[Iterable[str]] = None) -> Tuple[Dict[str, list[str]], list[str]]:
+        """
+        Group profiles by the account ID their config names.
+        Args:
+            names (Iterable[str], optional): Profiles to group (default: every profile).
+        Returns:
+            ({account_id: [profile, ...]}, [profiles whose account is only known after an STS call])
+        """
+        self._refresh()
+        grouped: Dict[str, list[str]] = {}
+        unknown: list[str] = []
+        for name in (self._entries if names is None else names):
+            entry = self._entries.get(name)
+            if entry is not None and entry.account_id:
+                grouped.setdefault(entry.account_id, []).append(name)
+            else:
+                unknown.append(name)
+        return grouped, unknown
+
+
+_indexes: Dict[Tuple[str, str], ProfileIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_profile_index() -> ProfileIndex:
+    """Get the shared index for the current AWS config/credentials file locations."""
+    index = ProfileIndex()
+    key = (index.config_file, index.credentials_file)
+    with _indexes_lock:
+        return _indexes.setdefault(key, index)
@@ -7,22 +7,39 @@ Follows PEP8 and Codacy standards.
 
 
 import os
+import copy
 import json
 import getpass
 import tempfile
-import shutil
-from typing import Dict, Any, Callable, Optional, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks; writes are still atomic
+    fcntl = None
 
 
 TOOL_CONFIGS: Dict[str, Dict[str, Any]] = {
     "jira_cloud": {
+        "client": "devops_cli.jira_cloud:JiraCloudClient",
         "fields": [
             {"name": "url", "prompt": "Cloud URL", "secure": False},
             {"name": "username", "prompt": "Cloud username", "secure": False},
             {"name": "api_token", "prompt": "Cloud API token", "secure": True}
+        ],
+        "operations": [
+            {"key": "current_sprint_name", "label": "Display current sprint name"},
+            {"key": "my_issues_in_sprint", "label": "List my issues in current sprint"},
+            {"key": "sprint_sp_stats", "label": "Get SP stats for last N closed sprints (default 3)"},
+            {"key": "current_sprint_summary", "label": "Current Sprint - Group by Assignee & Issue Type"},
+            {"key": "velocity_trend", "label": "Velocity history - rolling average, median & trend"},
+            {"key": "sprint_dashboard", "label": "Sprint dashboard - every account's default board"}
         ]
     },
     "jira_server": {
+        "client": "devops_cli.jira_server:JiraServerClient",
         "fields": [
             {"name": "url", "prompt": "Server URL", "secure": False},
             {"name": "api_token", "prompt": "Server API Token", "secure": True}
@@ -30,17 +47,24 @@ TOOL_CONFIGS: Dict[str, Dict[str, Any]] = {
         "operations": [
             {"key": "current_sprint_name", "label": "Display current sprint name"},
             {"key": "my_issues_in_sprint", "label": "List my issues in current sprint"},
-            {"key": "sprint_sp_stats", "label": "Get SP for Last 3 Sprint Stats"},
-            {"key": "current_sprint_summary", "label": "Current Sprint - Group by Assignee & Issue Type"}
+            {"key": "sprint_sp_stats", "label": "Get SP stats for last N closed sprints (default 3)"},
+            {"key": "current_sprint_summary", "label": "Current Sprint - Group by Assignee & Issue Type"},
+            {"key": "velocity_trend", "label": "Velocity history - rolling average, median & trend"},
+            {"key": "sync_issue_snapshot", "label": "Sync local issue snapshot for project"},
+            {"key": "sprint_dashboard", "label": "Sprint dashboard - every account's default board"}
         ]
     },
     "aws_sso": {
+        "client": "devops_cli.aws_client:AWSClient",
         "fields": [],
         "info": "AWS SSO integration. No credentials required; uses AWS CLI profiles.",
         "operations": [
             {"key": "current_month_cost", "label": "Get current month AWS cost"},
             {"key": "prev_month_cost", "label": "Get previous month AWS cost (if exists)"},
-            {"key": "list_instances_by_state", "label": "List EC2 instances by state"}
+            {"key": "list_instances_by_state", "label": "List EC2 instances by state"},
+            {"key": "all_profiles_month_cost", "label": "Get current month AWS cost across all profiles"},
+            {"key": "monthly_cost_trend", "label": "Get monthly AWS cost trend (last N months)"},
+            {"key": "daily_cost_by_service", "label": "Daily cost by service - month to date, day-over-day & top movers"}
         ]
     },
     # Future: Add 'aws', etc.
@@ -49,16 +73,218 @@ TOOL_CONFIGS: Dict[str, Dict[str, Any]] = {
 CONFIG_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_config.json")
 SUPPORTED_TOOLS: list[str] = ["jira_cloud", "jira_server", "aws_sso"]  # Extendable for future tools
 
+LOCK_SUFFIX: str = ".lock"
+
+def atomic_write_json(path: str, data: Dict[str, Any]) -> None:
+    """
+    Atomically write a JSON document to disk.
+    The document is written and fsynced to a temp file in the destination directory, then renamed
+    over the destination with os.replace, so readers see either the old or the new file, never a partial one.
+    The file is created with owner-only permissions, like the temp file it starts as.
+    Args:
+        path (str): Destination file path.
+        data (dict): The dictionary to write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(temp_fd, 'w') as tmp_file:
+            json.dump(data, tmp_file, indent=2)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock for a file across processes (a sidecar `<path>.lock` file is locked,
+    since atomic writes replace the file itself). Does nothing where fcntl is unavailable.
+    Args:
+        path (str): The file to lock.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + LOCK_SUFFIX, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def _normalize_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    # Ensure all supported tools are present in config
+    for tool_name in SUPPORTED_TOOLS:
+        if tool_name not in config:
+            config[tool_name] = {"accounts": {}}
+    return config
+
+class ConfigRepository:
+    """
+    ConfigRepository reads and writes the CLI config file.
+    The parsed config is cached and only re-read when the file's mtime, size or inode changes.
+    Changes go through update(), which re-reads the file under a cross-process lock, applies the change
+    and writes atomically, so concurrent CLI runs (cron jobs, scripts) do not overwrite each other's accounts.
+    """
+    def __init__(self, path: str = CONFIG_PATH) -> None:
+        """
+        Initialize the repository; the file is read lazily on first access.
+        Args:
+            path (str): Config file path.
+        """
+        self.path = path
+        self._config: Optional[Dict[str, Any]] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read_file(self) -> Tuple[Dict[str, Any], Optional[Tuple[int, int, int]]]:
+        stamp = self._file_stamp()
+        config: Dict[str, Any] = {}
+        if stamp is not None:
+            with open(self.path) as f:
+                config = json.load(f)
+        return _normalize_config(config), stamp
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Get the current config, re-reading the file only if it changed on disk.
+        The returned dict is shared with other callers: read it, and make changes through update().
+        Returns:
+            dict: Config with an entry for every supported tool. Raises OSError/ValueError on unreadable files.
+        """
+        with self._lock:
+            if self._config is None or self._file_stamp() != self._stamp:
+                self._config, self._stamp = self._read_file()
+            return self._config
+
+    def save(self, config: Dict[str, Any]) -> None:
+        """
+        Replace the whole config file.
+        Args:
+            config (dict): The configuration dictionary to write.
+        """
+        with self._lock, file_lock(self.path):
+            atomic_write_json(self.path, config)
+            self._config = copy.deepcopy(config)
+            self._stamp = self._file_stamp()
+
+    def update(self, change: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """
+        Apply a change to the latest config on disk and write it back, holding the file lock throughout.
+        Args:
+            change (Callable): Function that modifies the config dict in place.
+        Returns:
+            dict: The updated config (shared, as with load()).
+        """
+        with self._lock, file_lock(self.path):
+            # Always re-read: another process may have written within the same mtime tick
+            config, _ = self._read_file()
+            change(config)
+            atomic_write_json(self.path, config)
+            self._config = config
+            self._stamp = self._file_stamp()
+            return config
+
+class JsonFileStore:
+    """
+    JsonFileStore is the base of the small JSON caches shared by concurrent CLI runs and the background agent.
+    Like ConfigRepository, the parsed file is re-read when its mtime, size or inode changes, and changes
+    re-read the file under the cross-process lock before writing, so one run does not drop another's entries.
+    Subclasses call _load() and _update() while holding self._lock.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the store; the file is read lazily on first access.
+        Args:
+            path (str): JSON file path.
+        """
+        self.path = path
+        self._data: Optional[Dict[str, Any]] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _read_file(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _load(self) -> Dict[str, Any]:
+        stamp = self._file_stamp()
+        if self._data is None or stamp != self._stamp:
+            self._data = self._read_file() if stamp is not None else {}
+            self._stamp = stamp
+        return self._data
+
+    def _update(self, change: Callable[[Dict[str, Any]], bool], error_label: str) -> None:
+        """
+        Apply a change to the latest file contents and write them back, holding the file lock throughout.
+        Args:
+            change (Callable): Function that modifies the dict in place and returns whether anything changed.
+            error_label (str): Name of the file in the error printed when it cannot be written.
+        """
+        try:
+            with file_lock(self.path):
+                # Always re-read: another process may have written within the same mtime tick
+                data = self._read_file()
+                self._data, self._stamp = data, None
+                if change(data):
+                    atomic_write_json(self.path, data)
+                self._stamp = self._file_stamp()
+        except OSError as exc:
+            print(f"Error writing {error_label}: {exc}")
+
+_repository: Optional[ConfigRepository] = None
+_repository_lock = threading.Lock()
+
+def get_config_repository() -> ConfigRepository:
+    """Get the process-wide repository for CONFIG_PATH."""
+    global _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = ConfigRepository()
+        return _repository
+
 def atomic_write_config(config: Dict[str, Any]) -> None:
     """
     Atomically write config to disk.
     Args:
         config (dict): The configuration dictionary to write.
     """
-    temp_fd, temp_path = tempfile.mkstemp()
-    with os.fdopen(temp_fd, 'w') as tmp_file:
-        json.dump(config, tmp_file, indent=2)
-    shutil.move(temp_path, CONFIG_PATH)
+    get_config_repository().save(config)
 
 def prompt_for_account(tool: str, account_name: str, prompt_input: Callable = input) -> Dict[str, str]:
     """
@@ -80,6 +306,24 @@ def prompt_for_account(tool: str, account_name: str, prompt_input: Callable = in
         creds[field["name"]] = value
     return creds
 
+def prompt_for_jira_tuning(creds: Dict[str, Any], prompt_input: Callable = input) -> Dict[str, Any]:
+    """
+    Prompt for the optional request-tuning settings shared by Jira Cloud and Jira Server accounts.
+    Blank or invalid answers leave the setting out, so the client default applies.
+    Args:
+        creds (dict): Credentials dictionary to add the settings to.
+        prompt_input (Callable): Input function (default: input).
+    Returns:
+        dict: The same credentials dictionary.
+    """
+    max_workers = prompt_input("Enter max concurrent Jira page requests (or leave blank for default): ").strip()
+    if max_workers.isdigit() and int(max_workers) > 0:
+        creds["max_workers"] = int(max_workers)
+    use_async = prompt_input("Use the async (aiohttp) transport for Jira requests? (y/N): ").strip().lower()
+    if use_async == "y":
+        creds["transport"] = "async"
+    return creds
+
 def select_tool(prompt_input: Callable = input) -> str:
     """
     Interactively select a supported tool.
@@ -98,6 +342,14 @@ def select_tool(prompt_input: Callable = input) -> str:
             return choice
         print("Invalid choice. Please try again.")
 
+def load_config() -> Dict[str, Any]:
+    """
+    Load configuration from disk without prompting.
+    Returns:
+        dict: Config with an entry for every supported tool.
+    """
+    return get_config_repository().load()
+
 def create_or_load_config(prompt_input: Callable = input) -> Tuple[Dict[str, Any], str, str]:
     """
     Create or load configuration, supporting multiple tools and accounts.
@@ -106,16 +358,7 @@ def create_or_load_config(prompt_input: Callable = input) -> Tuple[Dict[str, Any
     Returns:
         tuple: (config dict, selected tool, selected account name)
     """
-    config: Dict[str, Any] = {}
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH) as f:
-            config = json.load(f)
-        # Ensure all supported tools are present in config
-        for tool_name in SUPPORTED_TOOLS:
-            if tool_name not in config:
-                config[tool_name] = {"accounts": {}}
-    else:
-        config = {tool: {"accounts": {}} for tool in SUPPORTED_TOOLS}
+    config: Dict[str, Any] = load_config()
 
     tool: str = select_tool(prompt_input=prompt_input)
     # Normalize tool name to lowercase for AWS SSO check
@@ -132,7 +375,7 @@ def create_or_load_config(prompt_input: Callable = input) -> Tuple[Dict[str, Any
         default_board = prompt_input("Enter default Jira board name (or leave blank to skip): ").strip()
         if default_board:
             creds["default_board"] = default_board
-        return creds
+        return prompt_for_jira_tuning(creds, prompt_input=prompt_input)
 
     def handle_jira_server_account(account_name: str, creds: Dict[str, str]) -> Dict[str, str]:
         """Handle Jira Server-specific account setup."""
@@ -142,7 +385,7 @@ def create_or_load_config(prompt_input: Callable = input) -> Tuple[Dict[str, Any
         default_board = prompt_input("Enter default Jira board name (or leave blank to skip): ").strip()
         if default_board:
             creds["default_board"] = default_board
-        return creds
+        return prompt_for_jira_tuning(creds, prompt_input=prompt_input)
 
     TOOL_ACCOUNT_HANDLERS: Dict[str, Callable[[str, Dict[str, str]], Dict[str, str]]] = {
         "jira_cloud": handle_jira_cloud_account,
@@ -150,6 +393,12 @@ def create_or_load_config(prompt_input: Callable = input) -> Tuple[Dict[str, Any
         # Future: "aws": handle_aws_account, etc.
     }
 
+    def refresh(latest: Dict[str, Any]) -> None:
+        """Pick up the config as written, including accounts other runs added meanwhile."""
+        nonlocal config, accounts
+        config = latest
+        accounts = config[tool]["accounts"]
+
     def add_account() -> None:
         account_name = prompt_input(f"Enter a unique {tool} account name: ").strip()
         if account_name in accounts:
@@ -159,9 +408,9 @@ def create_or_load_config(prompt_input: Callable = input) -> Tuple[Dict[str, Any
         handler = TOOL_ACCOUNT_HANDLERS.get(tool)
         if handler:
             creds = handler(account_name, creds)
-        accounts[account_name] = creds
-        config[tool]["accounts"] = accounts
-        atomic_write_config(config)
+        def store(latest: Dict[str, Any]) -> None:
+            latest.setdefault(tool, {}).setdefault("accounts", {})[account_name] = creds
+        refresh(get_config_repository().update(store))
         print(f"Account '{account_name}' added.")
 
     def delete_account() -> None:
@@ -172,9 +421,9 @@ def create_or_load_config(prompt_input: Callable = input) -> Tuple[Dict[str, Any
         if del_name in accounts:
             confirm = prompt_input(f"Are you sure you want to delete account '{del_name}'? (y/n): ").strip().lower()
             if confirm == "y":
-                del accounts[del_name]
-                config[tool]["accounts"] = accounts
-                atomic_write_config(config)
+                def remove(latest: Dict[str, Any]) -> None:
+                    latest.get(tool, {}).get("accounts", {}).pop(del_name, None)
+                refresh(get_config_repository().update(remove))
                 print(f"Account '{del_name}' deleted.")
             else:
                 print("Deletion cancelled.")
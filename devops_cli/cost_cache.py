@@ -0,0 +1,84 @@
+"""
+Local cache of closed-month AWS costs for Digitalworks2020 DevOps CLI.
+Closed months never change, so once fetched they are served from disk; only the open month is re-queried.
+Months are stored per account ID and profile, so a profile pointed at another account does not reuse them.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from devops_cli.config import JsonFileStore
+
+
+COST_CACHE_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_cost_cache.json")
+# Months are kept under this key as {account_id: {profile: {"YYYY-MM": cost}}}; entries written before
+# costs were keyed by account (profile names at the top level) are dropped on the next write
+ACCOUNTS_KEY = "accounts"
+
+
+class CostCache(JsonFileStore):
+    """
+    CostCache stores monthly UnblendedCost totals per account ID and profile, keyed by "YYYY-MM".
+    Only closed months should be stored.
+    """
+    def __init__(self, path: str = COST_CACHE_PATH) -> None:
+        """Initialize the cache; the file is read lazily on first access."""
+        super().__init__(path)
+
+    def get_months(self, account_id: str, profile: str) -> Dict[str, float]:
+        """
+        Get cached monthly costs for a profile of an account.
+        Args:
+            account_id (str): AWS account ID the profile currently resolves to.
+            profile (str): AWS CLI profile name.
+        Returns:
+            dict: {"YYYY-MM": cost} for every cached month.
+        """
+        with self._lock:
+            accounts = self._load().get(ACCOUNTS_KEY)
+            if not isinstance(accounts, dict):
+                return {}
+            months = accounts.get(account_id, {}).get(profile, {})
+            return {key: value for key, value in months.items() if isinstance(value, (int, float))}
+
+    def set_months(self, account_id: str, profile: str, costs: Dict[str, float]) -> None:
+        """
+        Store closed-month costs for a profile of an account.
+        Months cached for the same profile under any other account are discarded.
+        Args:
+            account_id (str): AWS account ID the profile currently resolves to.
+            profile (str): AWS CLI profile name.
+            costs (dict): {"YYYY-MM": cost} of closed months.
+        """
+        if not costs:
+            return
+        def change(data: Dict[str, Any]) -> bool:
+            accounts = data.get(ACCOUNTS_KEY)
+            if not isinstance(accounts, dict):
+                accounts = {}
+            data.clear()
+            data[ACCOUNTS_KEY] = accounts
+            for other in [key for key in accounts if key != account_id]:
+                accounts[other].pop(profile, None)
+                if not accounts[other]:
+                    del accounts[other]
+            accounts.setdefault(account_id, {}).setdefault(profile, {}).update(costs)
+            return True
+        with self._lock:
+            self._update(change, "AWS cost cache")
+
+    def clear(self, profile: Optional[str] = None) -> None:
+        """Remove cached costs for one profile (of every account), or for every profile when omitted."""
+        def change(data: Dict[str, Any]) -> bool:
+            accounts = data.get(ACCOUNTS_KEY)
+            data.clear()
+            if profile is not None and isinstance(accounts, dict):
+                for account_id in list(accounts):
+                    accounts[account_id].pop(profile, None)
+                    if not accounts[account_id]:
+                        del accounts[account_id]
+                data[ACCOUNTS_KEY] = accounts
+            return True
+        with self._lock:
+            self._update(change, "AWS cost cache")
@@ -0,0 +1,202 @@
+"""
+Local SQLite ledger of daily AWS costs for Digitalworks2020 DevOps CLI.
+Holds Cost Explorer's daily UnblendedCost per profile, grouped by service (and optionally linked account),
+so month-to-date totals, day-over-day changes and top movers are answered from indexed local tables
+and only new or still-settling days are ever queried again.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+COST_LEDGER_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_cost_ledger.sqlite3")
+# A ledger synced within this many seconds is answered from without querying Cost Explorer,
+# which refreshes its data a few times a day
+LEDGER_TTL_SECONDS: int = 4 * 60 * 60
+SERVICE_GROUPING = "SERVICE"
+SERVICE_ACCOUNT_GROUPING = "SERVICE,LINKED_ACCOUNT"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_costs (
+    profile TEXT NOT NULL,
+    grouping TEXT NOT NULL,
+    day TEXT NOT NULL,
+    service TEXT NOT NULL,
+    linked_account TEXT NOT NULL DEFAULT '',
+    amount REAL NOT NULL,
+    estimated INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (profile, grouping, day, service, linked_account)
+);
+CREATE TABLE IF NOT EXISTS ledger_state (
+    profile TEXT NOT NULL,
+    grouping TEXT NOT NULL,
+    last_day TEXT,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (profile, grouping)
+);
+"""
+
+
+class CostLedger:
+    """
+    CostLedger keeps daily cost rows per AWS profile and grouping ("SERVICE" or "SERVICE,LINKED_ACCOUNT").
+    Days are "YYYY-MM-DD" in UTC, as Cost Explorer reports them. A sync replaces whole days, so re-settling
+    recent days is harmless.
+    """
+    def __init__(self, path: str = COST_LEDGER_PATH, ttl: int = LEDGER_TTL_SECONDS) -> None:
+        """Initialize the ledger; the database is opened lazily on first access."""
+        self.path = path
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def get_sync_state(self, profile: str, grouping: str) -> Optional[Tuple[Optional[str], float]]:
+        """
+        Get the sync state of a profile's ledger.
+        Args:
+            profile (str): AWS CLI profile name.
+            grouping (str): SERVICE_GROUPING or SERVICE_ACCOUNT_GROUPING.
+        Returns:
+            Tuple of (last stored day, time of last sync), or None if never synced.
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT last_day, synced_at FROM ledger_state WHERE profile = ? AND grouping = ?",
+                (profile, grouping)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def is_fresh(self, profile: str, grouping: str) -> bool:
+        """Tell whether a profile's ledger exists and was synced within the TTL."""
+        state = self.get_sync_state(profile, grouping)
+        return state is not None and time.time() - state[1] < self.ttl
+
+    def replace_days(self, profile: str, grouping: str, first_day: str, last_day: str,
+                     rows: list[Tuple[str, str, str, float, bool]]) -> None:
+        """
+        Replace every stored day from first_day to last_day with freshly fetched rows and record the sync,
+        in one transaction.
+        Args:
+            profile (str): AWS CLI profile name.
+            grouping (str): SERVICE_GROUPING or SERVICE_ACCOUNT_GROUPING.
+            first_day (str): First fetched day.
+            last_day (str): Last fetched day.
+            rows (list): (day, service, linked_account, amount, estimated) tuples.
+        """
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "DELETE FROM daily_costs WHERE profile = ? AND grouping = ? AND day BETWEEN ? AND ?",
+                    (profile, grouping, first_day, last_day)
+                )
+                db.executemany(
+                    "INSERT OR REPLACE INTO daily_costs (profile, grouping, day, service, linked_account, amount, estimated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(profile, grouping, day, service, account, amount, int(estimated))
+                     for day, service, account, amount, estimated in rows]
+                )
+                db.execute(
+                    "INSERT INTO ledger_state (profile, grouping, last_day, synced_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (profile, grouping) DO UPDATE SET synced_at = excluded.synced_at,"
+                    " last_day = MAX(COALESCE(ledger_state.last_day, ''), excluded.last_day)",
+                    (profile, grouping, last_day, time.time())
+                )
+
+    def totals_by_service(self, profile: str, grouping: str, first_day: str,
+                          last_day: str) -> list[Tuple[str, str, float]]:
+        """
+        Sum costs per service (and linked account) over a range of days.
+        Returns:
+            List of (service, linked_account, amount), largest first.
+        """
+        with self._lock:
+            return self._db().execute(
+                "SELECT service, linked_account, SUM(amount) FROM daily_costs"
+                " WHERE profile = ? AND grouping = ? AND day BETWEEN ? AND ?"
+                " GROUP BY service, linked_account ORDER BY 3 DESC",
+                (profile, grouping, first_day, last_day)
+            ).fetchall()
+
+    def daily_totals(self, profile: str, grouping: str, first_day: str, last_day: str) -> list[Tuple[str, float]]:
+        """
+        Sum costs per day over a range of days.
+        Returns:
+            List of (day, amount) in day order; days without stored rows are left out.
+        """
+        with self._lock:
+            return self._db().execute(
+                "SELECT day, SUM(amount) FROM daily_costs WHERE profile = ? AND grouping = ? AND day BETWEEN ? AND ?"
+                " GROUP BY day ORDER BY day",
+                (profile, grouping, first_day, last_day)
+            ).fetchall()
+
+    def movers(self, profile: str, grouping: str, day: str, previous_day: str,
+               limit: int) -> list[Tuple[str, str, float, float]]:
+        """
+        Compare two days per service (and linked account).
+        Returns:
+            Up to `limit` (service, linked_account, amount on day, amount on previous_day) tuples,
+            largest absolute change first.
+        """
+        with self._lock:
+            return self._db().execute(
+                "SELECT service, linked_account,"
+                " SUM(CASE WHEN day = ? THEN amount ELSE 0 END) AS current,"
+                " SUM(CASE WHEN day = ? THEN amount ELSE 0 END) AS previous"
+                " FROM daily_costs WHERE profile = ? AND grouping = ? AND day IN (?, ?)"
+                " GROUP BY service, linked_account ORDER BY ABS(current - previous) DESC LIMIT ?",
+                (day, previous_day, profile, grouping, day, previous_day, max(0, limit))
+            ).fetchall()
+
+    def iter_days(self, profile: str, grouping: str, first_day: str, last_day: str) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over stored rows in a range of days, with each row's change from the same service's
+        previous stored day in the range. The rows are read at the first step, in one query under the lock.
+        Returns:
+            Iterator of {"day", "service", "linked_account", "cost", "change", "estimated"} in day order
+            ("change" is None on a service's first day).
+        """
+        with self._lock:
+            # Read in full under the lock: the connection is shared with syncs running on other agent threads
+            rows = self._db().execute(
+                "SELECT day, service, linked_account, amount, estimated,"
+                " amount - LAG(amount) OVER (PARTITION BY service, linked_account ORDER BY day)"
+                " FROM daily_costs WHERE profile = ? AND grouping = ? AND day BETWEEN ? AND ?"
+                " ORDER BY day, amount DESC",
+                (profile, grouping, first_day, last_day)
+            ).fetchall()
+        for day, service, account, amount, estimated, change in rows:
+            yield {
+                "day": day, "service": service, "linked_account": account or None,
+                "cost": amount, "change": change, "estimated": bool(estimated)
+            }
+
+    def clear(self, profile: Optional[str] = None) -> None:
+        """Remove stored days for one profile, or for every profile when omitted."""
+        with self._lock:
+            db = self._db()
+            with db:
+                if profile is None:
+                    db.execute("DELETE FROM daily_costs")
+                    db.execute("DELETE FROM ledger_state")
+                else:
+                    db.execute("DELETE FROM daily_costs WHERE profile = ?", (profile,))
+                    db.execute("DELETE FROM ledger_state WHERE profile = ?", (profile,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
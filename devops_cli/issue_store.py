@@ -0,0 +1,259 @@
+"""
+Local SQLite issue snapshot for Digitalworks2020 DevOps CLI.
+Holds a per-project copy of the issue fields the CLI reports on, kept current with incremental
+`updated >=` syncs and periodic key reconciliation, so sprint queries can be answered from indexed local tables.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from devops_cli.jira_issues import IssueRecord
+
+
+ISSUE_STORE_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_issues.sqlite3")
+# A snapshot synced within this many seconds is answered from without syncing first
+SNAPSHOT_TTL_SECONDS: int = 5 * 60
+# Incremental syncs also compare the project's issue keys with the snapshot (dropping deleted or moved
+# issues) when the last comparison is older than this
+RECONCILE_INTERVAL_SECONDS: int = 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    account TEXT NOT NULL,
+    issue_key TEXT NOT NULL,
+    project TEXT NOT NULL,
+    summary TEXT,
+    status TEXT,
+    assignee TEXT,
+    assignee_id TEXT,
+    issuetype TEXT,
+    updated TEXT,
+    PRIMARY KEY (account, issue_key)
+);
+CREATE TABLE IF NOT EXISTS issue_sprints (
+    account TEXT NOT NULL,
+    issue_key TEXT NOT NULL,
+    sprint_id INTEGER NOT NULL,
+    PRIMARY KEY (account, issue_key, sprint_id)
+);
+CREATE INDEX IF NOT EXISTS idx_issue_sprints_sprint ON issue_sprints (account, sprint_id);
+CREATE INDEX IF NOT EXISTS idx_issues_assignee ON issues (account, assignee_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account TEXT NOT NULL,
+    project TEXT NOT NULL,
+    last_updated TEXT,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (account, project)
+);
+CREATE TABLE IF NOT EXISTS reconcile_state (
+    account TEXT NOT NULL,
+    project TEXT NOT NULL,
+    reconciled_at REAL NOT NULL,
+    PRIMARY KEY (account, project)
+);
+CREATE INDEX IF NOT EXISTS idx_issues_project ON issues (account, project);
+"""
+
+_SPRINT_ID_PATTERN = re.compile(r"\bid=(\d+)")
+
+
+def sprint_ids(value: Any) -> list[int]:
+    """
+    Extract sprint IDs from a sprint custom field value.
+    Jira Server returns serialized strings ("...Sprint@1a2b[id=12,...]"), Jira Cloud returns dicts.
+    """
+    ids = []
+    for sprint in value or []:
+        if isinstance(sprint, dict) and sprint.get("id") is not None:
+            ids.append(int(sprint["id"]))
+        elif isinstance(sprint, str):
+            match = _SPRINT_ID_PATTERN.search(sprint)
+            if match:
+                ids.append(int(match.group(1)))
+    return ids
+
+
+class IssueStore:
+    """
+    IssueStore keeps issue snapshots per account URL and project in SQLite.
+    Rows are upserted, so re-syncing overlapping windows is harmless.
+    """
+    def __init__(self, path: str = ISSUE_STORE_PATH, ttl: int = SNAPSHOT_TTL_SECONDS,
+                 reconcile_interval: int = RECONCILE_INTERVAL_SECONDS) -> None:
+        """Initialize the store; the database is opened lazily on first access."""
+        self.path = path
+        self.ttl = ttl
+        self.reconcile_interval = reconcile_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def get_sync_state(self, account: str, project: str) -> Optional[Tuple[Optional[str], float]]:
+        """
+        Get the sync state of a project snapshot.
+        Args:
+            account (str): Jira account URL.
+            project (str): Project key.
+        Returns:
+            Tuple of (Jira time the last completed sync started, time of last sync), or None if never synced.
+        """
+        with self._lock:
+            row = self._db().execute(
+                "SELECT last_updated, synced_at FROM sync_state WHERE account = ? AND project = ?",
+                (account.rstrip('/'), project)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def is_fresh(self, account: str, project: str) -> bool:
+        """Tell whether a project snapshot exists and was synced within the TTL."""
+        state = self.get_sync_state(account, project)
+        return state is not None and time.time() - state[1] < self.ttl
+
+    def needs_reconcile(self, account: str, project: str) -> bool:
+        """Tell whether the project's issue keys were not compared with the snapshot within the reconcile interval."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT reconciled_at FROM reconcile_state WHERE account = ? AND project = ?",
+                (account.rstrip('/'), project)
+            ).fetchone()
+        return row is None or time.time() - row[0] >= self.reconcile_interval
+
+    def remove_missing(self, account: str, project: str, keys: Iterable[str]) -> int:
+        """
+        Drop issues of a project that are no longer in it (deleted or moved), and record the reconciliation.
+        Args:
+            account (str): Jira account URL.
+            project (str): Project key.
+            keys (Iterable[str]): Every issue key currently in the project.
+        Returns:
+            Number of issues removed.
+        """
+        account = account.rstrip('/')
+        current = set(keys)
+        with self._lock:
+            db = self._db()
+            stored = [row[0] for row in db.execute(
+                "SELECT issue_key FROM issues WHERE account = ? AND project = ?", (account, project)
+            )]
+            missing = [(account, key) for key in stored if key not in current]
+            with db:
+                db.executemany("DELETE FROM issues WHERE account = ? AND issue_key = ?", missing)
+                db.executemany("DELETE FROM issue_sprints WHERE account = ? AND issue_key = ?", missing)
+                db.execute(
+                    "INSERT OR REPLACE INTO reconcile_state (account, project, reconciled_at) VALUES (?, ?, ?)",
+                    (account, project, time.time())
+                )
+        return len(missing)
+
+    def upsert_issues(self, account: str, project: str, issues: Iterable[Dict[str, Any]],
+                      sprint_field: Optional[str] = None) -> Tuple[int, Optional[str]]:
+        """
+        Insert or update issues from raw search JSON.
+        Args:
+            account (str): Jira account URL.
+            project (str): Project key.
+            issues (Iterable[dict]): Raw issue JSON entries.
+            sprint_field (str, optional): ID of the sprint custom field.
+        Returns:
+            Tuple of (number of issues written, latest "updated" value among them).
+        """
+        account = account.rstrip('/')
+        rows = []
+        sprint_rows = []
+        keys = []
+        latest = None
+        for raw in issues:
+            fields = raw.get("fields") or {}
+            record = IssueRecord.from_raw(raw)
+            assignee = fields.get("assignee") or {}
+            rows.append((
+                account, record.key, project, record.summary, record.status, record.assignee,
+                assignee.get("name") or assignee.get("accountId"), record.issuetype, record.updated
+            ))
+            keys.append((account, record.key))
+            if sprint_field:
+                sprint_rows.extend((account, record.key, sprint_id) for sprint_id in sprint_ids(fields.get(sprint_field)))
+            if record.updated and (latest is None or record.updated > latest):
+                latest = record.updated
+        if not rows:
+            return 0, None
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO issues (account, issue_key, project, summary, status, assignee,"
+                    " assignee_id, issuetype, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                db.executemany("DELETE FROM issue_sprints WHERE account = ? AND issue_key = ?", keys)
+                db.executemany("INSERT OR IGNORE INTO issue_sprints (account, issue_key, sprint_id) VALUES (?, ?, ?)", sprint_rows)
+        return len(rows), latest
+
+    def set_sync_state(self, account: str, project: str, last_updated: Optional[str]) -> None:
+        """
+        Record a completed sync.
+        Args:
+            account (str): Jira account URL.
+            project (str): Project key.
+            last_updated (str, optional): Jira time the sync started; the next sync fetches issues updated since then.
+        """
+        account = account.rstrip('/')
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "INSERT INTO sync_state (account, project, last_updated, synced_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (account, project) DO UPDATE SET synced_at = excluded.synced_at,"
+                    " last_updated = COALESCE(excluded.last_updated, sync_state.last_updated)",
+                    (account, project, last_updated, time.time())
+                )
+
+    def sprint_summary(self, account: str, sprint_id: int, project: str) -> Dict[str, Dict[str, int]]:
+        """
+        Count a project's issues in a sprint grouped by assignee and issue type.
+        Returns:
+            Dict mapping assignee to dict of issue type counts.
+        """
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT COALESCE(i.assignee, 'Unassigned'), COALESCE(i.issuetype, 'Unknown'), COUNT(*)"
+                " FROM issue_sprints s JOIN issues i ON i.account = s.account AND i.issue_key = s.issue_key"
+                " WHERE s.account = ? AND s.sprint_id = ? AND i.project = ? GROUP BY 1, 2",
+                (account.rstrip('/'), sprint_id, project)
+            ).fetchall()
+        grouped: Dict[str, Dict[str, int]] = {}
+        for assignee, issue_type, count in rows:
+            grouped.setdefault(assignee, {})[issue_type] = count
+        return grouped
+
+    def user_issues_in_sprint(self, account: str, sprint_id: int, project: str, assignee_id: str) -> list[IssueRecord]:
+        """
+        Get a user's issues of a project in a sprint.
+        Returns:
+            List of IssueRecords (key, summary, status).
+        """
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT i.issue_key, i.summary, i.status FROM issue_sprints s"
+                " JOIN issues i ON i.account = s.account AND i.issue_key = s.issue_key"
+                " WHERE s.account = ? AND s.sprint_id = ? AND i.project = ? AND i.assignee_id = ? ORDER BY i.issue_key",
+                (account.rstrip('/'), sprint_id, project, assignee_id)
+            ).fetchall()
+        return [IssueRecord(key, summary=summary, status=status) for key, summary, status in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
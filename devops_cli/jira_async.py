@@ -0,0 +1,346 @@
+"""
+Asyncio Jira REST transport for Digitalworks2020 DevOps CLI.
+Covers the calls the CLI makes (boards, sprints, issue search, greenhopper velocity) with async
+pagination and semaphore-limited concurrency, so one process can keep many requests in flight.
+The event loop runs in a background thread, so synchronous client methods can use it unchanged.
+aiohttp is imported only when a transport is first used.
+Follows PEP8 and Codacy standards.
+"""
+
+import json
+import time
+import atexit
+import asyncio
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, Iterator, Optional, Tuple
+
+from devops_cli import tracing
+from devops_cli.jira_paging import DEFAULT_PAGE_SIZE
+from devops_cli.jira_session import account_key
+from devops_cli.rate_limit import get_scheduler
+
+
+DEFAULT_ASYNC_CONCURRENCY: int = 32
+DEFAULT_TIMEOUT_SECONDS: int = 60
+SEARCH_PATH = "/rest/api/2/search"
+# Jira Cloud enhanced JQL search, paged with nextPageToken
+ENHANCED_SEARCH_PATH = "/rest/api/3/search/jql"
+
+_transports: Dict[Tuple[str, str, str], "AsyncJiraTransport"] = {}
+_lock = threading.Lock()
+
+
+def _import_aiohttp() -> Any:
+    try:
+        import aiohttp
+    except ImportError as exc:
+        raise ImportError("The async Jira transport needs aiohttp (pip install aiohttp).") from exc
+    return aiohttp
+
+
+def _query(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Drop unset parameters and turn the rest into query strings (lists become comma-separated)."""
+    query = {}
+    for key, value in (params or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = str(value).lower()
+        elif isinstance(value, (list, tuple)):
+            value = ",".join(str(v) for v in value)
+        query[key] = str(value)
+    return query
+
+
+class AsyncJiraTransport:
+    """
+    AsyncJiraTransport talks to the Jira REST API with aiohttp.
+    Coroutines are awaited on the transport's own loop; call run() from synchronous code.
+    """
+    def __init__(self, url: str, token_auth: Optional[str] = None, basic_auth: Optional[Tuple[str, str]] = None,
+                 concurrency: int = DEFAULT_ASYNC_CONCURRENCY, timeout: int = DEFAULT_TIMEOUT_SECONDS) -> None:
+        """
+        Initialize the transport; no connection is opened until the first request.
+        Args:
+            url (str): Jira base URL.
+            token_auth (str, optional): Personal access token (Jira Server).
+            basic_auth (tuple, optional): (username, api_token) (Jira Cloud).
+            concurrency (int): Maximum number of requests in flight.
+            timeout (int): Total timeout per request in seconds.
+        """
+        self.url = url.rstrip('/')
+        self.token_auth = token_auth
+        self.basic_auth = basic_auth
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="jira-async", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine of this transport from synchronous code (any thread) and return its result.
+        Raises whatever the coroutine raises.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def run_all(self, coros: Iterable[Awaitable[Any]]) -> list[Any]:
+        """
+        Run many coroutines concurrently (bounded by the transport's concurrency).
+        Returns:
+            Results in input order; failed calls are returned as their exception.
+        """
+        async def gather():
+            return await asyncio.gather(*coros, return_exceptions=True)
+        return self.run(gather())
+
+    def iter_sync(self, pages: AsyncIterator[Any]) -> Iterator[Any]:
+        """
+        Iterate an async generator of this transport (e.g. iter_pages) from synchronous code, one item at a time.
+        Closing the returned iterator early closes the async generator, which cancels its outstanding requests.
+        """
+        async def next_item():
+            return await pages.__anext__()
+
+        async def close():
+            await pages.aclose()
+
+        try:
+            while True:
+                try:
+                    item = self.run(next_item())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            self.run(close())
+
+    async def _get_session(self) -> Any:
+        if self._session is None:
+            aiohttp = _import_aiohttp()
+            headers = {"Accept": "application/json"}
+            auth = None
+            if self.basic_auth is not None:
+                auth = aiohttp.BasicAuth(*self.basic_auth)
+            elif self.token_auth:
+                headers["Authorization"] = f"Bearer {self.token_auth}"
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._session = aiohttp.ClientSession(
+                headers=headers, auth=auth,
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET a REST path relative to the base URL.
+        Returns:
+            The decoded JSON body. Raises aiohttp.ClientResponseError on HTTP errors.
+        """
+        session = await self._get_session()
+        # Same per-host pacing, AIMD limit and throttling retries as the requests-based clients
+        scheduler = get_scheduler(self.url)
+        attempt = 0
+        async with self._semaphore:
+            while True:
+                await scheduler.acquire_async()
+                started = time.perf_counter()
+                try:
+                    response = await session.get(f"{self.url}{path}", params=_query(params))
+                except Exception:
+                    scheduler.release(None)
+                    raise
+                async with response:
+                    scheduler.release(response.status)
+                    delay = None
+                    if scheduler.should_retry(response.status, attempt):
+                        # None when Retry-After exceeds the backoff cap: fail rather than wait that long
+                        delay = scheduler.retry_delay(attempt, response.headers.get("Retry-After"))
+                    if delay is None:
+                        response.raise_for_status()
+                        body = await response.read()
+                        if tracing.active():
+                            tracing.record_http("GET", str(response.url), started, response.status, len(body))
+                        return json.loads(body)
+                    tracing.record_retry("GET", str(response.url))
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def iter_pages(self, path: str, params: Optional[Dict[str, Any]] = None,
+                         items_key: str = "values", page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[list]:
+        """
+        Yield pages of a startAt/maxResults paged endpoint in order.
+        When the first page reports a total, the remaining pages are requested concurrently, keeping at most
+        `concurrency` pages in flight so memory stays flat on huge result sets; otherwise pages are followed
+        one by one until isLast.
+        Args:
+            path (str): REST path (e.g. "/rest/agile/1.0/board").
+            params (dict, optional): Extra query parameters.
+            items_key (str): Key holding the page's items ("values" for agile, "issues" for search).
+            page_size (int): Items requested per page.
+        """
+        params = dict(params or {})
+        first = await self.get_json(path, {**params, "startAt": 0, "maxResults": page_size})
+        items = first.get(items_key, [])
+        yield items
+        total = first.get("total")
+        # The server may cap the page size below what was asked for
+        step = len(items) or page_size
+        if total is not None:
+            offsets = iter(range(step, total, step))
+
+            def fetch(start: int) -> asyncio.Future:
+                return asyncio.ensure_future(self.get_json(path, {**params, "startAt": start, "maxResults": step}))
+
+            window = deque(fetch(start) for start in islice(offsets, self.concurrency))
+            try:
+                while window:
+                    page = await window.popleft()
+                    next_start = next(offsets, None)
+                    if next_start is not None:
+                        window.append(fetch(next_start))
+                    yield page.get(items_key, [])
+            finally:
+                # Stop outstanding requests when the caller stops early or a page failed
+                for task in window:
+                    task.cancel()
+            return
+        start_at = step
+        page = first
+        while items and not page.get("isLast", len(items) < step):
+            page = await self.get_json(path, {**params, "startAt": start_at, "maxResults": step})
+            items = page.get(items_key, [])
+            yield items
+            start_at += len(items)
+
+    async def find_board(self, board_name: str) -> Optional[Dict[str, Any]]:
+        """Find a board by exact (case-insensitive) name; the server filters by name first."""
+        wanted = board_name.lower()
+        pages = self.iter_pages("/rest/agile/1.0/board", {"name": board_name})
+        try:
+            async for page in pages:
+                for board in page:
+                    if board.get("name", "").lower() == wanted:
+                        return board
+        finally:
+            await pages.aclose()
+        return None
+
+    async def active_sprint(self, board_id: int) -> Optional[Dict[str, Any]]:
+        """Get the active sprint of a board, or None."""
+        pages = self.iter_pages(f"/rest/agile/1.0/board/{board_id}/sprint", {"state": "active"})
+        try:
+            async for page in pages:
+                for sprint in page:
+                    if sprint.get("state") == "active":
+                        return sprint
+        finally:
+            await pages.aclose()
+        return None
+
+    async def search(self, jql: str, fields: Iterable[str], page_size: int = DEFAULT_PAGE_SIZE,
+                     path: str = SEARCH_PATH) -> list[Dict[str, Any]]:
+        """
+        Run a JQL search and return raw issue JSON for every match, requesting pages concurrently.
+        Args:
+            jql (str): The JQL query.
+            fields (Iterable[str]): Field IDs to return.
+            page_size (int): Issues requested per page.
+            path (str): Search endpoint.
+        """
+        issues = []
+        async for page in self.iter_search(jql, fields, page_size, path):
+            issues.extend(page)
+        return issues
+
+    def iter_search(self, jql: str, fields: Iterable[str], page_size: int = DEFAULT_PAGE_SIZE,
+                    path: str = SEARCH_PATH) -> AsyncIterator[list]:
+        """Yield pages of raw issue JSON for a JQL search in order (see search)."""
+        return self.iter_pages(path, {"jql": jql, "fields": list(fields)}, "issues", page_size)
+
+    async def search_jql(self, jql: str, fields: Iterable[str], page_size: int = DEFAULT_PAGE_SIZE,
+                         path: str = ENHANCED_SEARCH_PATH) -> list[Dict[str, Any]]:
+        """
+        Run a JQL search on the Jira Cloud enhanced search endpoint and return raw issue JSON for every match.
+        Pages are chained through nextPageToken, so they are requested one after another.
+        Args:
+            jql (str): The JQL query.
+            fields (Iterable[str]): Field IDs to return.
+            page_size (int): Issues requested per page.
+            path (str): Search endpoint.
+        """
+        issues: list[Dict[str, Any]] = []
+        async for page in self.iter_search_jql(jql, fields, page_size, path):
+            issues.extend(page)
+        return issues
+
+    async def iter_search_jql(self, jql: str, fields: Iterable[str], page_size: int = DEFAULT_PAGE_SIZE,
+                              path: str = ENHANCED_SEARCH_PATH) -> AsyncIterator[list]:
+        """Yield pages of raw issue JSON from the enhanced search endpoint in order (see search_jql)."""
+        params: Dict[str, Any] = {"jql": jql, "fields": list(fields), "maxResults": page_size}
+        while True:
+            page = await self.get_json(path, params)
+            yield page.get("issues", [])
+            token = page.get("nextPageToken")
+            if not token or page.get("isLast"):
+                return
+            params["nextPageToken"] = token
+
+    async def velocity_report(self, board_id: int) -> Dict[str, Any]:
+        """Get the greenhopper velocity report of a board."""
+        return await self.get_json("/rest/greenhopper/1.0/rapid/charts/velocity", {"rapidViewId": board_id})
+
+    def close(self) -> None:
+        """Close the HTTP session and stop the background loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def get_shared_transport(url: str, token_auth: Optional[str] = None, basic_auth: Optional[Tuple[str, str]] = None,
+                         concurrency: int = DEFAULT_ASYNC_CONCURRENCY) -> AsyncJiraTransport:
+    """
+    Get the shared async transport of an account, creating it on first use.
+    Args:
+        url (str): Jira base URL.
+        token_auth (str, optional): Personal access token (Jira Server).
+        basic_auth (tuple, optional): (username, api_token) (Jira Cloud).
+        concurrency (int): Maximum number of requests in flight, used when the transport is created.
+    Returns:
+        AsyncJiraTransport
+    """
+    key = account_key(url, token_auth, basic_auth)
+    with _lock:
+        transport = _transports.get(key)
+        if transport is None:
+            if not _transports:
+                # Close sessions cleanly instead of leaving aiohttp to warn at interpreter shutdown
+                atexit.register(close_shared_transports)
+            transport = AsyncJiraTransport(url, token_auth=token_auth, basic_auth=basic_auth, concurrency=concurrency)
+            _transports[key] = transport
+        return transport
+
+
+def close_shared_transports() -> None:
+    """Close and forget every shared async transport."""
+    with _lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
@@ -0,0 +1,150 @@
+"""
+Board and active sprint lookups shared by the Jira Server and Jira Cloud clients.
+Lookups go through the metadata cache first, then ask Jira with server-side filters (board name,
+sprint state=active) and read ahead one page while the current page is scanned, stopping at the first match.
+Follows PEP8 and Codacy standards.
+"""
+
+from typing import Any, Optional
+
+from devops_cli.jira_cache import CachedSprint
+from devops_cli.jira_paging import DEFAULT_PAGE_SIZE, iter_pages_read_ahead
+
+
+class BoardLookupMixin:
+    """
+    BoardLookupMixin adds board ID, active sprint (ID) and current sprint name lookups to a Jira client.
+    The client provides url, cache (JiraMetadataCache), refresh, jira (python-jira JIRA) and transport
+    (AsyncJiraTransport or None).
+    """
+    def get_board_id(self, board_name: str) -> Optional[int]:
+        """
+        Get the board ID for a given board name.
+        Args:
+            board_name (str): The name of the Jira board.
+        Returns:
+            The board ID if found, else None.
+        """
+        if not self.refresh:
+            cached = self.cache.get_board_id(self.url, board_name)
+            if cached is not None:
+                return cached
+        board_name_lower = board_name.lower()
+        try:
+            if self.transport is not None:
+                board = self.transport.run(self.transport.find_board(board_name))
+                board_id = board["id"] if board is not None else None
+            else:
+                board_id = None
+                # Jira filters boards by name (substring match), so the exact match is usually on the first page
+                pages = iter_pages_read_ahead(
+                    lambda start_at, max_results: _page(
+                        self.jira.boards(startAt=start_at, maxResults=max_results, name=board_name)
+                    ),
+                    page_size=DEFAULT_PAGE_SIZE
+                )
+                try:
+                    for page in pages:
+                        board = next((b for b in page if getattr(b, 'name', '').lower() == board_name_lower), None)
+                        if board is not None:
+                            board_id = getattr(board, 'id', None)
+                            break
+                finally:
+                    pages.close()
+        except Exception as exc:
+            print(f"Error fetching boards: {exc}")
+            return None
+        if board_id is None:
+            self.cache.invalidate_board(self.url, board_name)
+            return None
+        self.cache.set_board_id(self.url, board_name, board_id)
+        return board_id
+
+    def get_active_sprint(self, board_id: int) -> Optional[Any]:
+        """
+        Get the current active sprint for a given board ID.
+        Args:
+            board_id (int): The ID of the Jira board.
+        Returns:
+            The active sprint object (or its cached stand-in) if found, else None.
+        """
+        if not self.refresh:
+            cached = self.cache.get_active_sprint(self.url, board_id)
+            if cached is not None:
+                return cached
+        sprint = None
+        try:
+            if self.transport is not None:
+                found = self.transport.run(self.transport.active_sprint(board_id))
+                if found is not None:
+                    sprint = CachedSprint(found["id"], found.get("name"), found.get("state"))
+            else:
+                # Only active sprints are listed, so this is normally a single request
+                pages = iter_pages_read_ahead(
+                    lambda start_at, max_results: _page(
+                        self.jira.sprints(board_id, startAt=start_at, maxResults=max_results, state="active")
+                    ),
+                    page_size=DEFAULT_PAGE_SIZE
+                )
+                try:
+                    for page in pages:
+                        sprint = next((s for s in page if getattr(s, 'state', None) == 'active'), None)
+                        if sprint is not None:
+                            break
+                finally:
+                    pages.close()
+        except Exception as exc:
+            print(f"Error fetching sprints: {exc}")
+            # The board may have been deleted or renamed since it was cached
+            self.cache.invalidate_board_id(self.url, board_id)
+            return None
+        if sprint is None:
+            self.cache.invalidate_sprint(self.url, board_id)
+            return None
+        self.cache.set_active_sprint(self.url, board_id, sprint)
+        return sprint
+
+    def get_active_sprint_id(self, board_name: str) -> Optional[int]:
+        """
+        Get the ID of a board's active sprint, printing why when there is none.
+        Args:
+            board_name (str): The name of the Jira board.
+        Returns:
+            The active sprint ID if found, else None.
+        """
+        board_id = self.get_board_id(board_name)
+        if board_id is None:
+            print(f"Board '{board_name}' not found.")
+            return None
+        sprint = self.get_active_sprint(board_id)
+        if sprint is None:
+            print(f"No active sprint found for board '{board_name}'.")
+            return None
+        sprint_id = getattr(sprint, 'id', None)
+        if sprint_id is None:
+            print("Sprint ID not found.")
+        return sprint_id
+
+    def get_current_sprint_name(self, project_key: str, board_name: str) -> Optional[str]:
+        """
+        Get the current active sprint name for a given project key and board name.
+        Args:
+            project_key (str): The Jira project key.
+            board_name (str): The name of the Jira board.
+        Returns:
+            The name of the current active sprint if found, else None.
+        """
+        board_id = self.get_board_id(board_name)
+        if board_id is None:
+            print(f"Board '{board_name}' not found.")
+            return None
+        sprint = self.get_active_sprint(board_id)
+        if sprint is None:
+            print(f"No active sprint found for board '{board_name}'.")
+            return None
+        return getattr(sprint, 'name', None)
+
+
+def _page(result: Any) -> tuple:
+    """Turn a python-jira ResultList into (items, is_last) for iter_pages_read_ahead."""
+    return result, getattr(result, 'isLast', None)
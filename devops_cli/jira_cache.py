@@ -0,0 +1,133 @@
+"""
+On-disk board/sprint metadata cache shared by the Jira clients.
+Maps board names to IDs (long TTL) and board IDs to their active sprint (short TTL), keyed by account URL.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from devops_cli.config import JsonFileStore
+
+
+CACHE_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_cache.json")
+BOARD_TTL_SECONDS: int = 7 * 24 * 60 * 60
+SPRINT_TTL_SECONDS: int = 5 * 60
+
+
+class CachedSprint:
+    """Lightweight stand-in for a jira Sprint resource restored from the cache."""
+    __slots__ = ("id", "name", "state")
+
+    def __init__(self, sprint_id: int, name: Optional[str], state: Optional[str] = "active") -> None:
+        self.id = sprint_id
+        self.name = name
+        self.state = state
+
+
+def _account(data: Dict[str, Any], url: str) -> Dict[str, Any]:
+    account = data.setdefault(url.rstrip('/'), {})
+    account.setdefault("boards", {})
+    account.setdefault("sprints", {})
+    return account
+
+
+class JiraMetadataCache(JsonFileStore):
+    """
+    JiraMetadataCache persists board and active sprint lookups between CLI runs.
+    Entries are grouped per account URL so Jira Server and Jira Cloud clients can share one file,
+    and concurrent runs merge their entries into it (see JsonFileStore).
+    """
+    def __init__(self, path: str = CACHE_PATH, board_ttl: int = BOARD_TTL_SECONDS,
+                 sprint_ttl: int = SPRINT_TTL_SECONDS) -> None:
+        """Initialize the cache; the file is read lazily on first access."""
+        super().__init__(path)
+        self.board_ttl = board_ttl
+        self.sprint_ttl = sprint_ttl
+
+    def _change(self, change: Callable[[Dict[str, Any]], bool]) -> None:
+        with self._lock:
+            self._update(change, "Jira metadata cache")
+
+    def get_board_id(self, url: str, board_name: str) -> Optional[int]:
+        """
+        Get a cached board ID.
+        Args:
+            url (str): Jira account URL.
+            board_name (str): The name of the Jira board.
+        Returns:
+            The board ID if cached and not expired, else None.
+        """
+        with self._lock:
+            entry = _account(self._load(), url)["boards"].get(board_name.lower())
+            if entry and time.time() - entry.get("ts", 0) < self.board_ttl:
+                return entry.get("id")
+            return None
+
+    def set_board_id(self, url: str, board_name: str, board_id: int) -> None:
+        """Store the board ID for a board name."""
+        def change(data: Dict[str, Any]) -> bool:
+            _account(data, url)["boards"][board_name.lower()] = {"id": board_id, "ts": time.time()}
+            return True
+        self._change(change)
+
+    def invalidate_board(self, url: str, board_name: str) -> None:
+        """Drop the cached board ID for a board name."""
+        self._change(lambda data: _account(data, url)["boards"].pop(board_name.lower(), None) is not None)
+
+    def invalidate_board_id(self, url: str, board_id: int) -> None:
+        """Drop every cached entry pointing at a board ID, including its active sprint."""
+        def change(data: Dict[str, Any]) -> bool:
+            account = _account(data, url)
+            stale = [name for name, entry in account["boards"].items() if entry.get("id") == board_id]
+            for name in stale:
+                del account["boards"][name]
+            sprint = account["sprints"].pop(str(board_id), None)
+            return bool(stale) or sprint is not None
+        self._change(change)
+
+    def get_active_sprint(self, url: str, board_id: int) -> Optional[CachedSprint]:
+        """
+        Get the cached active sprint of a board.
+        Args:
+            url (str): Jira account URL.
+            board_id (int): The ID of the Jira board.
+        Returns:
+            A CachedSprint if cached and not expired, else None.
+        """
+        with self._lock:
+            entry = _account(self._load(), url)["sprints"].get(str(board_id))
+            if entry and time.time() - entry.get("ts", 0) < self.sprint_ttl:
+                return CachedSprint(entry.get("id"), entry.get("name"), entry.get("state"))
+            return None
+
+    def set_active_sprint(self, url: str, board_id: int, sprint: Any) -> None:
+        """Store the active sprint (any object with id/name/state attributes) of a board."""
+        def change(data: Dict[str, Any]) -> bool:
+            _account(data, url)["sprints"][str(board_id)] = {
+                "id": getattr(sprint, 'id', None),
+                "name": getattr(sprint, 'name', None),
+                "state": getattr(sprint, 'state', None),
+                "ts": time.time()
+            }
+            return True
+        self._change(change)
+
+    def invalidate_sprint(self, url: str, board_id: int) -> None:
+        """Drop the cached active sprint of a board."""
+        self._change(lambda data: _account(data, url)["sprints"].pop(str(board_id), None) is not None)
+
+    def clear(self, url: Optional[str] = None) -> None:
+        """
+        Remove cached metadata.
+        Args:
+            url (str, optional): Account URL to clear. Clears every account when omitted.
+        """
+        def change(data: Dict[str, Any]) -> bool:
+            if url is None:
+                data.clear()
+            else:
+                data.pop(url.rstrip('/'), None)
+            return True
+        self._change(change)
@@ -1,83 +1,194 @@
 """
 JiraCloud integration for Digitalworks2020 DevOps CLI.
-Lists current sprint name for a given project using OOP and python-jira.
+Current sprint name, sprint summary, my issues and velocity for Jira Cloud using OOP and python-jira.
+Issue searches use the enhanced JQL search endpoint, paged with nextPageToken.
 """
-from jira import JIRA
-from typing import Optional, Any
+from typing import Optional, Iterable, Iterator
+from devops_cli.jira_boards import BoardLookupMixin
+from devops_cli.jira_cache import JiraMetadataCache
+from devops_cli.jira_async import ENHANCED_SEARCH_PATH, AsyncJiraTransport, get_shared_transport
+from devops_cli.jira_issues import IssueRecord, iter_issue_records, validate_fields
+from devops_cli.jira_session import DEFAULT_POOL_SIZE, get_shared_jira, http_session
+from devops_cli.jira_paging import DEFAULT_MAX_WORKERS, iter_token_pages
+from devops_cli.jira_velocity import VelocityMixin
+from devops_cli.velocity_store import VelocityStore
 
-class JiraCloudClient:
+# Enhanced search pages are chained, so fewer, larger pages mean fewer sequential round trips
+CLOUD_SEARCH_PAGE_SIZE: int = 100
+
+class JiraCloudClient(BoardLookupMixin, VelocityMixin):
     """
     JiraCloudClient provides methods to interact with Jira Cloud boards and sprints.
     Follows PEP8, Codacy, and Copilot workspace instructions for maintainability and reliability.
     """
-    def __init__(self, url: str, username: str, api_token: str) -> None:
-        """Initialize JiraCloudClient with credentials."""
-        self.jira = JIRA(server=url, basic_auth=(username, api_token), validate=True)
+    def __init__(self, url: str, username: str, api_token: str,
+                 cache: Optional[JiraMetadataCache] = None, refresh: bool = False,
+                 max_workers: int = DEFAULT_MAX_WORKERS, validate: bool = False,
+                 async_transport: bool = False,
+                 velocity_store: Optional[VelocityStore] = None) -> None:
+        """
+        Initialize JiraCloudClient with credentials.
+        Args:
+            cache (JiraMetadataCache, optional): Shared board/sprint metadata cache.
+            refresh (bool): Ignore cached metadata and look it up again.
+            max_workers (int): Sizes the connection pool and async concurrency (token-paged searches fetch one page ahead).
+            validate (bool): Check the credentials right away instead of on the first real call.
+            async_transport (bool): Use the asyncio transport for boards, sprints, searches and velocity.
+            velocity_store (VelocityStore, optional): Local closed-sprint velocity history.
+        """
+        self.url = url
+        self.cache = cache if cache is not None else JiraMetadataCache()
+        self.refresh = refresh
+        self.max_workers = max_workers
+        self.velocity_store = velocity_store if velocity_store is not None else VelocityStore()
+        # Shared per account: no request is made until the first real call, and connections are reused
+        self.jira = get_shared_jira(
+            url, basic_auth=(username, api_token), pool_size=max(DEFAULT_POOL_SIZE, max_workers)
+        )
+        # Optional asyncio transport (aiohttp) for bulk work; None means the jira library is used
+        self.transport: Optional[AsyncJiraTransport] = None
+        if async_transport:
+            self.transport = get_shared_transport(url, basic_auth=(username, api_token), concurrency=max(DEFAULT_POOL_SIZE, max_workers * 8))
+        if validate:
+            self.validate()
 
-    def get_active_sprint(self, board_id: int) -> Optional[Any]:
+    def get_current_sprint_summary(self, board_name: str, project_key: Optional[str] = None) -> Optional[dict]:
         """
-        Get the current active sprint for a given board ID.
+        Get current sprint issues grouped by assignee and issue type (ignores story points).
         Args:
-            board_id (int): The ID of the Jira board.
+            board_name (str): The name of the Jira board.
+            project_key (str, optional): The Jira project key (accepted for parity with Jira Server).
         Returns:
-            The active sprint object if found, else None.
-        """
-        start_at = 0
-        max_results = 50
-        while True:
-            try:
-                sprints = self.jira.sprints(board_id, startAt=start_at, maxResults=max_results)
-            except Exception as exc:
-                print(f"Error fetching sprints: {exc}")
-                return None
-            for sprint in sprints:
-                if getattr(sprint, 'state', None) == 'active':
-                    return sprint
-            if len(sprints) < max_results:
-                break
-            start_at += max_results
-        return None
+            Dict mapping assignee to dict of issue type counts, or None if error.
+        """
+        sprint_id = self.get_active_sprint_id(board_name)
+        if sprint_id is None:
+            return None
+        return self.get_sprint_summary(sprint_id, project_key=project_key)
 
-    def get_board_id(self, board_name: str) -> Optional[int]:
+    def get_sprint_summary(self, sprint_id: int, project_key: Optional[str] = None) -> Optional[dict]:
         """
-        Get the board ID for a given board name.
+        Get a sprint's issues grouped by assignee and issue type, for callers that already know the sprint.
         Args:
-            board_name (str): The name of the Jira board.
+            sprint_id (int): The sprint ID.
+            project_key (str, optional): The Jira project key (accepted for parity with Jira Server).
         Returns:
-            The board ID if found, else None.
-        """
-        start_at = 0
-        max_results = 50
-        board_name_lower = board_name.lower()
-        while True:
-            try:
-                boards = self.jira.boards(startAt=start_at, maxResults=max_results)
-            except Exception as exc:
-                print(f"Error fetching boards: {exc}")
-                return None
-            for board in boards:
-                if getattr(board, 'name', '').lower() == board_name_lower:
-                    return getattr(board, 'id', None)
-            if len(boards) < max_results:
-                break
-            start_at += max_results
-        return None
+            Dict mapping assignee to dict of issue type counts, or None if error.
+        """
+        grouped = {}
+        try:
+            for issue in self.iter_issues(f"sprint = {sprint_id}", fields=("assignee", "issuetype")):
+                type_counts = grouped.setdefault(issue.assignee or 'Unassigned', {})
+                issue_type = issue.issuetype or 'Unknown'
+                type_counts[issue_type] = type_counts.get(issue_type, 0) + 1
+        except Exception as exc:
+            print(f"Error fetching issues for sprint: {exc}")
+            return None
+        return grouped
 
-    def get_current_sprint_name(self, project_key: str, board_name: str) -> Optional[str]:
+    def get_my_issues_in_current_sprint(self, board_name: str, max_results: int = CLOUD_SEARCH_PAGE_SIZE,
+                                        project_key: Optional[str] = None) -> Optional[list[IssueRecord]]:
         """
-        Get the current active sprint name for a given project key and board name.
+        Get issues assigned to the current user in the current active sprint for the given board.
         Args:
-            project_key (str): The Jira project key.
             board_name (str): The name of the Jira board.
+            max_results (int): Maximum number of issues per page.
+            project_key (str, optional): The Jira project key (accepted for parity with Jira Server).
         Returns:
-            The name of the current active sprint if found, else None.
+            List of IssueRecords (key, summary, status) assigned to the current user in the current sprint, or None if error.
         """
-        board_id = self.get_board_id(board_name)
-        if board_id is None:
-            print(f"Board '{board_name}' not found.")
+        issues = self.iter_my_issues_in_current_sprint(board_name, max_results=max_results, project_key=project_key)
+        if issues is None:
             return None
-        sprint = self.get_active_sprint(board_id)
-        if sprint is None:
-            print(f"No active sprint found for board '{board_name}'.")
+        try:
+            return list(issues)
+        except Exception as exc:
+            print(f"Error fetching issues for current user in sprint: {exc}")
             return None
-        return getattr(sprint, 'name', None)
+
+    def iter_my_issues_in_current_sprint(self, board_name: str, max_results: int = CLOUD_SEARCH_PAGE_SIZE,
+                                         project_key: Optional[str] = None) -> Optional[Iterator[IssueRecord]]:
+        """
+        Stream the issues of get_my_issues_in_current_sprint as they are fetched.
+        Args:
+            board_name (str): The name of the Jira board.
+            max_results (int): Maximum number of issues per page.
+            project_key (str, optional): The Jira project key (accepted for parity with Jira Server).
+        Returns:
+            Iterator of IssueRecords (key, summary, status), or None if the sprint could not be found.
+            Raises on request errors while iterating.
+        """
+        sprint_id = self.get_active_sprint_id(board_name)
+        if sprint_id is None:
+            return None
+        jql = f"assignee = currentUser() AND sprint = {sprint_id}"
+        return self.iter_issues(jql, fields=("summary", "status"), page_size=max_results)
+
+    def _fetch_search_page(self, jql: str, fields: list[str], page_token: Optional[str], max_results: int):
+        """Fetch one page of the enhanced JQL search; returns (raw issues, next page token)."""
+        params = {"jql": jql, "fields": ",".join(fields), "maxResults": max_results}
+        if page_token:
+            params["nextPageToken"] = page_token
+        # Same authenticated, rate-limited keep-alive session as every other call on this account
+        response = http_session(self.jira).get(
+            f"{self.url.rstrip('/')}{ENHANCED_SEARCH_PATH}", params=params, headers={"Accept": "application/json"}
+        )
+        response.raise_for_status()
+        result = response.json()
+        token = result.get("nextPageToken")
+        return result.get("issues", []), None if result.get("isLast") else token
+
+    def iter_raw_issues(self, jql: str, fields: Iterable[str] = ("*navigable",),
+                        page_size: int = CLOUD_SEARCH_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Stream raw issue JSON for a JQL search from the enhanced search endpoint (/rest/api/3/search/jql).
+        Pages are chained with nextPageToken rather than startAt offsets, which Jira Cloud caps on large
+        result sets; the next page is fetched while the current one is consumed.
+        Args:
+            jql (str): The JQL query.
+            fields (Iterable[str]): Field IDs to return (e.g. "summary", "*navigable").
+            page_size (int): Number of issues requested per page.
+        Returns:
+            Iterator of raw issue dicts in result order. Raises on request errors while iterating.
+        """
+        names = list(fields)
+        for page in iter_token_pages(
+            lambda token, max_results: self._fetch_search_page(jql, names, token, max_results), page_size=page_size
+        ):
+            yield from page
+
+    def search_all_issues(self, jql: str, page_size: int = CLOUD_SEARCH_PAGE_SIZE) -> list[dict]:
+        """
+        Run a JQL search and return every matching issue.
+        Args:
+            jql (str): The JQL query.
+            page_size (int): Number of issues requested per page.
+        Returns:
+            List of raw issue JSON (navigable fields) in result order. Raises on request errors.
+        """
+        return list(self.iter_raw_issues(jql, page_size=page_size))
+
+    def iter_issues(self, jql: str, fields: Iterable[str] = ("summary", "status"),
+                    page_size: int = CLOUD_SEARCH_PAGE_SIZE) -> Iterator[IssueRecord]:
+        """
+        Stream issues matching a JQL search as compact records holding only the requested fields.
+        Only the named fields are requested from Jira and no Resource objects are built.
+        Args:
+            jql (str): The JQL query.
+            fields (Iterable[str]): Field names to fetch (see jira_issues.FIELD_EXTRACTORS).
+            page_size (int): Number of issues requested per page.
+        Returns:
+            Iterator of IssueRecord in result order. Raises on request errors while iterating.
+        """
+        names = validate_fields(fields)
+        if self.transport is not None:
+            return iter_issue_records(self.transport.iter_sync(self.transport.iter_search_jql(jql, names, page_size=page_size)))
+        return iter_issue_records([self.iter_raw_issues(jql, fields=names, page_size=page_size)])
+
+    def validate(self) -> dict:
+        """
+        Check the credentials with one request.
+        Returns:
+            The current user's details. Raises on authentication or connection errors.
+        """
+        return self.jira.myself()
@@ -0,0 +1,84 @@
+"""
+Lean issue records for Digitalworks2020 DevOps CLI.
+Builds compact __slots__ records straight from raw Jira search JSON instead of full jira Resource objects.
+Follows PEP8 and Codacy standards.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+
+def _name_of(value: Optional[Dict[str, Any]], attr: str = "name") -> Optional[str]:
+    return value.get(attr) if isinstance(value, dict) else None
+
+
+# Jira field name -> (record attribute, extractor from the raw field value)
+FIELD_EXTRACTORS: Dict[str, Tuple[str, Callable[[Any], Any]]] = {
+    "summary": ("summary", lambda value: value),
+    "status": ("status", _name_of),
+    "assignee": ("assignee", lambda value: _name_of(value, "displayName")),
+    "issuetype": ("issuetype", _name_of),
+    "updated": ("updated", lambda value: value),
+}
+
+
+class IssueRecord:
+    """Compact, read-only view of one issue holding only the projected fields."""
+    __slots__ = ("key", "summary", "status", "assignee", "issuetype", "updated")
+
+    def __init__(self, key: str, summary: Optional[str] = None, status: Optional[str] = None,
+                 assignee: Optional[str] = None, issuetype: Optional[str] = None,
+                 updated: Optional[str] = None) -> None:
+        self.key = key
+        self.summary = summary
+        self.status = status
+        self.assignee = assignee
+        self.issuetype = issuetype
+        self.updated = updated
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "IssueRecord":
+        """
+        Build a record from one entry of a search response's "issues" list.
+        Args:
+            raw (dict): Raw issue JSON.
+        Returns:
+            IssueRecord
+        """
+        record = cls(raw.get("key"))
+        fields = raw.get("fields") or {}
+        for field_name, value in fields.items():
+            extractor = FIELD_EXTRACTORS.get(field_name)
+            if extractor:
+                setattr(record, extractor[0], extractor[1](value))
+        return record
+
+    def __repr__(self) -> str:
+        return f"IssueRecord({self.key!r})"
+
+
+def iter_issue_records(pages: Iterable[Iterable[Dict[str, Any]]]) -> Iterator[IssueRecord]:
+    """
+    Turn pages of raw issue JSON into IssueRecords one at a time.
+    Args:
+        pages (Iterable): Pages of raw issue dicts, in result order.
+    Returns:
+        Iterator of IssueRecord.
+    """
+    for page in pages:
+        for raw in page:
+            yield IssueRecord.from_raw(raw)
+
+
+def validate_fields(fields: Iterable[str]) -> list[str]:
+    """
+    Check requested fields against the ones IssueRecord can hold.
+    Args:
+        fields (Iterable[str]): Jira field names.
+    Returns:
+        List of field names. Raises ValueError for unsupported fields.
+    """
+    names = list(fields)
+    unknown = [name for name in names if name not in FIELD_EXTRACTORS]
+    if unknown:
+        raise ValueError(f"Unsupported issue fields: {', '.join(unknown)}")
+    return names
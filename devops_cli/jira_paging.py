@@ -0,0 +1,147 @@
+"""
+Paging helpers shared by the Jira clients.
+Fetches the first page of a startAt/maxResults endpoint, reads its total and fetches the remaining pages concurrently,
+or, for lookups that usually stop early and for nextPageToken endpoints, reads ahead a page at a time
+while the current one is scanned.
+Follows PEP8 and Codacy standards.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+
+
+DEFAULT_PAGE_SIZE: int = 50
+DEFAULT_MAX_WORKERS: int = 4
+DEFAULT_READ_AHEAD: int = 1
+
+PageFetcher = Callable[[int, int], Tuple[Sequence[Any], Optional[int]]]
+# Returns (items, is_last); is_last may be None when the endpoint does not say
+ListPageFetcher = Callable[[int, int], Tuple[Sequence[Any], Optional[bool]]]
+# Called with (page_token, max_results); returns (items, next_page_token), the token being None on the last page
+TokenPageFetcher = Callable[[Optional[str], int], Tuple[Sequence[Any], Optional[str]]]
+
+
+def iter_pages_concurrently(fetch_page: PageFetcher, page_size: int = DEFAULT_PAGE_SIZE,
+                            max_workers: int = DEFAULT_MAX_WORKERS) -> Iterator[Sequence[Any]]:
+    """
+    Yield every page of a paginated endpoint in order, fetching pages after the first concurrently.
+    Args:
+        fetch_page (Callable): Called as fetch_page(start_at, max_results); returns (items, total).
+            total may be None when the endpoint does not report it.
+        page_size (int): Number of items requested per page.
+        max_workers (int): Maximum number of pages in flight at once.
+    Returns:
+        Iterator over pages (sequences of items) in startAt order.
+    """
+    first, total = fetch_page(0, page_size)
+    yield first
+    if total is None:
+        # No total to plan with: fall back to sequential paging
+        start_at = len(first)
+        page = first
+        while len(page) >= page_size:
+            page, _ = fetch_page(start_at, page_size)
+            if page:
+                yield page
+            start_at += len(page)
+        return
+    # Servers may cap maxResults below what was asked for; step by what was actually returned
+    step = len(first) if 0 < len(first) < page_size else page_size
+    offsets = iter(range(len(first) or step, total, step))
+    workers = max(1, max_workers)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # Keep a bounded window of pages in flight so memory stays flat on huge result sets
+        window = deque(pool.submit(fetch_page, offset, step) for offset in islice(offsets, workers * 2))
+        while window:
+            page, _ = window.popleft().result()
+            next_offset = next(offsets, None)
+            if next_offset is not None:
+                window.append(pool.submit(fetch_page, next_offset, step))
+            yield page
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def fetch_all_concurrently(fetch_page: PageFetcher, page_size: int = DEFAULT_PAGE_SIZE,
+                           max_workers: int = DEFAULT_MAX_WORKERS) -> list:
+    """
+    Collect every item of a paginated endpoint, preserving order.
+    Args:
+        fetch_page (Callable): See iter_pages_concurrently.
+        page_size (int): Number of items requested per page.
+        max_workers (int): Maximum number of pages in flight at once.
+    Returns:
+        List of all items.
+    """
+    items: list = []
+    for page in iter_pages_concurrently(fetch_page, page_size=page_size, max_workers=max_workers):
+        items.extend(page)
+    return items
+
+
+def iter_pages_read_ahead(fetch_page: ListPageFetcher, page_size: int = DEFAULT_PAGE_SIZE,
+                          read_ahead: int = DEFAULT_READ_AHEAD) -> Iterator[Sequence[Any]]:
+    """
+    Yield the pages of a startAt/maxResults listing in order, requesting the next page(s) in the background
+    while the caller scans the current one. Meant for lookups that stop at the first match: the first page
+    is fetched inline (no thread is started when it is the last one), and closing the iterator early
+    cancels pages that have not been requested yet.
+    Args:
+        fetch_page (Callable): Called as fetch_page(start_at, max_results); returns (items, is_last).
+        page_size (int): Number of items requested per page.
+        read_ahead (int): Number of pages requested ahead of the one being scanned.
+    Returns:
+        Iterator over pages (sequences of items) in startAt order.
+    """
+    first, is_last = fetch_page(0, page_size)
+    yield first
+    # Servers may cap maxResults below what was asked for; step by what was actually returned
+    step = len(first) if 0 < len(first) < page_size else page_size
+    if is_last or (is_last is None and len(first) < page_size) or not first:
+        return
+    offsets = iter(range(len(first), 2 ** 31, step))
+    workers = max(1, read_ahead)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jira-read-ahead")
+    try:
+        window = deque(pool.submit(fetch_page, offset, step) for offset in islice(offsets, workers))
+        while window:
+            page, is_last = window.popleft().result()
+            if is_last or (is_last is None and len(page) < step) or not page:
+                if page:
+                    yield page
+                return
+            window.append(pool.submit(fetch_page, next(offsets), step))
+            yield page
+    finally:
+        # Do not wait for a request still in flight when the caller stopped early
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_token_pages(fetch_page: TokenPageFetcher, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Sequence[Any]]:
+    """
+    Yield the pages of a nextPageToken endpoint in order.
+    Each page can only be requested once the previous one returned its token, so instead of requesting
+    pages in parallel the next page is fetched in the background while the caller processes the current one.
+    Closing the iterator early stops paging.
+    Args:
+        fetch_page (Callable): Called as fetch_page(page_token, max_results); returns (items, next_page_token).
+        page_size (int): Number of items requested per page.
+    Returns:
+        Iterator over pages (sequences of items).
+    """
+    page, token = fetch_page(None, page_size)
+    if token is None:
+        yield page
+        return
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jira-token-pages")
+    try:
+        while token is not None:
+            pending = pool.submit(fetch_page, token, page_size)
+            yield page
+            page, token = pending.result()
+        yield page
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
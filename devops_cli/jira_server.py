@@ -3,219 +3,323 @@ JiraServer integration for Digitalworks2020 DevOps CLI.
 Lists current sprint name for a given project using OOP and python-jira.
 Follows PEP8, Codacy, and Copilot workspace instructions for maintainability and reliability.
 """
-from datetime import datetime
-from jira import JIRA
-from typing import Optional, Any
-import requests
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Any, Iterable, Iterator
+from zoneinfo import ZoneInfo
+from devops_cli.jira_boards import BoardLookupMixin
+from devops_cli.jira_cache import JiraMetadataCache
+from devops_cli.jira_async import AsyncJiraTransport, get_shared_transport
+from devops_cli.issue_store import IssueStore
+from devops_cli.jira_issues import IssueRecord, iter_issue_records, validate_fields
+from devops_cli.jira_session import DEFAULT_POOL_SIZE, get_shared_jira
+from devops_cli.jira_velocity import VelocityMixin
+from devops_cli.velocity_store import VelocityStore
+from devops_cli.jira_paging import (
+    DEFAULT_MAX_WORKERS, DEFAULT_PAGE_SIZE, fetch_all_concurrently, iter_pages_concurrently
+)
 
-class JiraServerClient:
+SPRINT_FIELD_SCHEMA = "com.pyxis.greenhopper.jira:gh-sprint"
+JIRA_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+# JQL dates have minute precision and are read in the user's timezone
+SYNC_OVERLAP = timedelta(minutes=1)
+# Without the user's timezone, step back by the widest possible UTC offset difference
+UNKNOWN_TIMEZONE_OVERLAP = timedelta(hours=26)
+SNAPSHOT_FIELDS = ("summary", "status", "assignee", "issuetype", "updated")
+# Key reconciliation only needs issue keys, so it asks for the largest page Jira Server allows by default
+RECONCILE_PAGE_SIZE = 1000
+
+class JiraServerClient(BoardLookupMixin, VelocityMixin):
     """
     JiraServerClient provides methods to interact with Jira Server boards and sprints.
     """
-    def __init__(self, url: str, api_token: str) -> None:
-        """Initialize JiraServerClient with credentials."""
+    def __init__(self, url: str, api_token: str,
+                 cache: Optional[JiraMetadataCache] = None, refresh: bool = False,
+                 max_workers: int = DEFAULT_MAX_WORKERS, validate: bool = False,
+                 async_transport: bool = False,
+                 velocity_store: Optional[VelocityStore] = None,
+                 issue_store: Optional[IssueStore] = None) -> None:
+        """
+        Initialize JiraServerClient with credentials.
+        Args:
+            cache (JiraMetadataCache, optional): Shared board/sprint metadata cache.
+            refresh (bool): Ignore cached metadata and look it up again.
+            max_workers (int): Maximum number of concurrent page requests for issue searches.
+            validate (bool): Check the credentials right away instead of on the first real call.
+            async_transport (bool): Use the asyncio transport for boards, sprints, searches and velocity.
+            velocity_store (VelocityStore, optional): Local closed-sprint velocity history.
+            issue_store (IssueStore, optional): Local issue snapshot used once a project has been synced.
+        """
         self.url = url
+        self.cache = cache if cache is not None else JiraMetadataCache()
+        self.refresh = refresh
+        self.max_workers = max_workers
+        self.velocity_store = velocity_store if velocity_store is not None else VelocityStore()
+        self.issue_store = issue_store if issue_store is not None else IssueStore()
+        self._myself: Optional[dict] = None
+        self._sprint_field: Optional[str] = None
         self.api_token = api_token
-        self.jira = JIRA(server=url, token_auth = api_token, validate=True)
+        # Shared per account: no request is made until the first real call, and connections are reused
+        self.jira = get_shared_jira(
+            url, token_auth=api_token, pool_size=max(DEFAULT_POOL_SIZE, max_workers)
+        )
+        # Optional asyncio transport (aiohttp) for bulk work; None means the jira library is used
+        self.transport: Optional[AsyncJiraTransport] = None
+        if async_transport:
+            self.transport = get_shared_transport(url, token_auth=api_token, concurrency=max(DEFAULT_POOL_SIZE, max_workers * 8))
+        if validate:
+            self.validate()
+
+    def validate(self) -> dict:
+        """
+        Check the credentials with one request.
+        Returns:
+            The current user's details. Raises on authentication or connection errors.
+        """
+        self._myself = self.jira.myself()
+        return self._myself
+
+    def get_myself(self) -> dict:
+        """Return the current user's details, fetched once per client."""
+        if self._myself is None:
+            return self.validate()
+        return self._myself
+
+    def get_sprint_field_id(self) -> Optional[str]:
+        """
+        Find the ID of the sprint custom field (e.g. customfield_10020), which differs per instance.
+        Returns:
+            The field ID, or None if the instance has no sprint field.
+        """
+        if self._sprint_field is None:
+            for field in self.jira.fields():
+                if (field.get("schema") or {}).get("custom") == SPRINT_FIELD_SCHEMA:
+                    self._sprint_field = field["id"]
+                    break
+        return self._sprint_field
+
+    def _updated_since_clause(self, last_updated: str) -> str:
+        """Build the `updated >=` JQL clause for issues changed since the given Jira timestamp."""
+        since = datetime.strptime(last_updated, JIRA_TIMESTAMP_FORMAT)
+        try:
+            since = since.astimezone(ZoneInfo(self.get_myself()["timeZone"])) - SYNC_OVERLAP
+        except Exception:
+            since = since - UNKNOWN_TIMEZONE_OVERLAP
+        return f'updated >= "{since.strftime("%Y/%m/%d %H:%M")}"'
+
+    def _server_time(self) -> str:
+        """Get Jira's current time as a UTC Jira timestamp, falling back to the local clock."""
+        try:
+            now = datetime.strptime(self.jira.server_info()["serverTime"], JIRA_TIMESTAMP_FORMAT)
+        except Exception:
+            now = datetime.now(timezone.utc)
+        return now.astimezone(timezone.utc).strftime(JIRA_TIMESTAMP_FORMAT)
+
+    def _iter_pages_by_key(self, jql: str, fields: list, page_size: int) -> Iterator[list]:
+        """
+        Page through a search in issue key order, starting each page after the last key of the previous one.
+        Unlike startAt offsets, pages cannot shift when issues are updated, created or deleted during the walk.
+        Returns:
+            Iterator of pages of raw issue JSON. Raises on request errors while iterating.
+        """
+        last_key = None
+        while True:
+            clause = f'{jql} AND key > "{last_key}"' if last_key else jql
+            result = self.jira.search_issues(
+                f"{clause} ORDER BY key ASC", startAt=0, maxResults=page_size, fields=fields, json_result=True
+            )
+            issues = result.get("issues", [])
+            if issues:
+                yield issues
+            if not issues or len(issues) >= (result.get("total") or 0):
+                return
+            last_key = issues[-1]["key"]
+
+    def sync_issue_snapshot(self, project_key: str, full: bool = False,
+                            page_size: int = DEFAULT_PAGE_SIZE) -> Optional[int]:
+        """
+        Bring the local issue snapshot of a project up to date.
+        Only issues updated since the previous sync started are fetched (all of them on the first or a full sync)
+        and upserted. Pages are read one after another in key order, so issues changing mid-sync are not skipped.
+        Issues deleted or moved out of the project are dropped on full syncs, and on incremental syncs once the
+        last key reconciliation is older than the store's reconcile interval.
+        Args:
+            project_key (str): The Jira project key.
+            full (bool): Re-fetch every issue of the project.
+            page_size (int): Number of issues requested per page.
+        Returns:
+            Number of issues written, or None if error.
+        """
+        state = None if full else self.issue_store.get_sync_state(self.url, project_key)
+        try:
+            # Anything updated from now on is picked up by the next sync, whatever this one sees
+            started = self._server_time()
+            sprint_field = self.get_sprint_field_id()
+            project_jql = f'project = "{project_key}"'
+            jql = project_jql
+            if state is not None and state[0]:
+                jql += f" AND {self._updated_since_clause(state[0])}"
+            fields = list(SNAPSHOT_FIELDS) + ([sprint_field] if sprint_field else [])
+            written = 0
+            keys = set()
+            for page in self._iter_pages_by_key(jql, fields, page_size):
+                count, _ = self.issue_store.upsert_issues(self.url, project_key, page, sprint_field)
+                written += count
+                keys.update(issue["key"] for issue in page)
+            if jql != project_jql and self.issue_store.needs_reconcile(self.url, project_key):
+                for page in self._iter_pages_by_key(project_jql, ["key"], RECONCILE_PAGE_SIZE):
+                    keys.update(issue["key"] for issue in page)
+                self.issue_store.remove_missing(self.url, project_key, keys)
+            elif jql == project_jql:
+                # Every issue of the project was just read
+                self.issue_store.remove_missing(self.url, project_key, keys)
+        except Exception as exc:
+            print(f"Error syncing issue snapshot: {exc}")
+            return None
+        self.issue_store.set_sync_state(self.url, project_key, started)
+        return written
+
+    def _use_snapshot(self, project_key: Optional[str]) -> bool:
+        """
+        Tell whether a query on the project can be answered from the local snapshot,
+        syncing it incrementally first when it is stale. Projects never synced are queried live.
+        """
+        if not project_key or self.issue_store.get_sync_state(self.url, project_key) is None:
+            return False
+        if self.refresh or not self.issue_store.is_fresh(self.url, project_key):
+            return self.sync_issue_snapshot(project_key) is not None
+        return True
+
+    def _snapshot_scope(self, project_key: Optional[str]) -> str:
+        """
+        JQL clause limiting a live query to the project when it has a snapshot, so live answers (e.g. when the
+        snapshot cannot be synced) match the snapshot's. Without a snapshot, live queries cover the whole sprint,
+        as on Jira Cloud.
+        """
+        if not project_key or self.issue_store.get_sync_state(self.url, project_key) is None:
+            return ""
+        return f' AND project = "{project_key}"'
 
-    def get_current_sprint_summary(self, board_name: str) -> Optional[dict]:
+    def get_current_sprint_summary(self, board_name: str, project_key: Optional[str] = None) -> Optional[dict]:
         """
         Get current sprint issues grouped by assignee and issue type (ignores story points).
+        Answered from the local issue snapshot when the project has one.
         Args:
             board_name (str): The name of the Jira board.
+            project_key (str, optional): Project whose snapshot answers the query; only its issues count when it has one.
         Returns:
             Dict mapping assignee to dict of issue type counts, or None if error.
         """
-        board_id = self.get_board_id(board_name)
-        if board_id is None:
-            print(f"Board '{board_name}' not found.")
-            return None
-        sprint = self.get_active_sprint(board_id)
-        if sprint is None:
-            print(f"No active sprint found for board '{board_name}'.")
-            return None
-        sprint_id = getattr(sprint, 'id', None)
+        sprint_id = self.get_active_sprint_id(board_name)
         if sprint_id is None:
-            print("Sprint ID not found.")
             return None
-        jql = f"sprint = {sprint_id}"
-        all_issues = []
-        start_at = 0
-        max_results = 50
-        while True:
-            try:
-                issues = self.jira.search_issues(jql, startAt=start_at, maxResults=max_results)
-            except Exception as exc:
-                print(f"Error fetching issues for sprint: {exc}")
-                return None
-            all_issues.extend(issues)
-            if len(issues) < max_results:
-                break
-            start_at += max_results
+        return self.get_sprint_summary(sprint_id, project_key=project_key)
+
+    def get_sprint_summary(self, sprint_id: int, project_key: Optional[str] = None) -> Optional[dict]:
+        """
+        Get a sprint's issues grouped by assignee and issue type, for callers that already know the sprint.
+        Args:
+            sprint_id (int): The sprint ID.
+            project_key (str, optional): Project whose snapshot answers the query; only its issues count when it has one.
+        Returns:
+            Dict mapping assignee to dict of issue type counts, or None if error.
+        """
+        if self._use_snapshot(project_key):
+            return self.issue_store.sprint_summary(self.url, sprint_id, project_key)
+        jql = f"sprint = {sprint_id}{self._snapshot_scope(project_key)}"
         grouped = {}
-        for issue in all_issues:
-            assignee = getattr(issue.fields.assignee, 'displayName', 'Unassigned') if hasattr(issue.fields, 'assignee') and issue.fields.assignee else 'Unassigned'
-            issue_type = getattr(issue.fields.issuetype, 'name', 'Unknown') if hasattr(issue.fields, 'issuetype') else 'Unknown'
-            grouped.setdefault(assignee, {})
-            grouped[assignee].setdefault(issue_type, 0)
-            grouped[assignee][issue_type] += 1
+        try:
+            for issue in self.iter_issues(jql, fields=("assignee", "issuetype")):
+                assignee = issue.assignee or 'Unassigned'
+                issue_type = issue.issuetype or 'Unknown'
+                type_counts = grouped.setdefault(assignee, {})
+                type_counts[issue_type] = type_counts.get(issue_type, 0) + 1
+        except Exception as exc:
+            print(f"Error fetching issues for sprint: {exc}")
+            return None
         return grouped
 
-    def get_sprint_story_points_stats(self, board_name: str, num_sprints: int = 3) -> Optional[list[dict]]:
+    def get_my_issues_in_current_sprint(self, board_name: str, max_results: int = 50,
+                                        project_key: Optional[str] = None) -> Optional[list[IssueRecord]]:
         """
-        Get committed SP, achieved SP, and average SP for the last num_sprints closed sprints on the board using Jira sprint report.
+        Get issues assigned to the current user in the current active sprint for the given board.
+        Answered from the local issue snapshot when the project has one; otherwise pages are fetched concurrently.
         Args:
             board_name (str): The name of the Jira board.
-            num_sprints (int): Number of last closed sprints to analyze.
+            max_results (int): Maximum number of issues per page.
+            project_key (str, optional): Project whose snapshot answers the query; only its issues are included when it has one.
         Returns:
-            List of dicts with sprint name, committed SP, achieved SP, and average SP.
-        """
-        headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Accept": "application/json"
-        }
-        board_id = self.get_board_id(board_name)
-        if board_id is None:
-            print(f"Board '{board_name}' not found.")
+            List of IssueRecords (key, summary, status) assigned to the current user in the current sprint, or None if error.
+        """
+        issues = self.iter_my_issues_in_current_sprint(board_name, max_results=max_results, project_key=project_key)
+        if issues is None:
             return None
-        stats = []
         try:
-            report_json = requests.get(
-                f'{self.url}/rest/greenhopper/1.0/rapid/charts/velocity?rapidViewId={board_id}',
-                headers = headers
-            ).json()
+            return list(issues)
         except Exception as exc:
-            print(f"Error fetching velocity report: {exc}")
+            print(f"Error fetching issues for current user in sprint: {exc}")
             return None
-        # Get closed sprints sorted by completeDate descending
-        sprints = report_json.get("sprints", [])
-        closed_sprints = [s for s in sprints if s.get("state") == "CLOSED" and s.get("completeDate")]
-        def parse_jira_date(date_str):
-            try:
-                return datetime.strptime(date_str.strip(), "%d/%b/%y %I:%M %p")
-            except Exception:
-                return None
-        closed_sprints = [s for s in closed_sprints if parse_jira_date(s["completeDate"])]
-        closed_sprints = sorted(
-            closed_sprints,
-            key=lambda s: parse_jira_date(s["completeDate"]),
-            reverse=True
-        )
-        last_sprints = closed_sprints[:num_sprints]
-        for sprint in last_sprints:
-            name, sprint_id = sprint["name"], sprint["id"]
-            velocity_entry = report_json["velocityStatEntries"].get(str(sprint_id))
-            if velocity_entry:
-                stats.append({
-                    "sprint": name,
-                    "committed_sp": velocity_entry["estimated"]["value"],
-                    "achieved_sp": velocity_entry["completed"]["value"]
-                })
-        avg_velocity = sum(s["achieved_sp"] for s in stats) / len(stats) if stats else 0
-        return stats, avg_velocity
-
-
-    def get_my_issues_in_current_sprint(self, board_name: str, max_results: int = 50) -> Optional[list[Any]]:
+
+    def iter_my_issues_in_current_sprint(self, board_name: str, max_results: int = 50,
+                                         project_key: Optional[str] = None) -> Optional[Iterator[IssueRecord]]:
         """
-        Get issues assigned to the current user in the current active sprint for the given board.
-        Handles pagination.
+        Stream the issues of get_my_issues_in_current_sprint as they are fetched.
         Args:
             board_name (str): The name of the Jira board.
             max_results (int): Maximum number of issues per page.
+            project_key (str, optional): Project whose snapshot answers the query; only its issues are included when it has one.
         Returns:
-            List of issues assigned to the current user in the current sprint, or None if error.
+            Iterator of IssueRecords (key, summary, status), or None if the sprint could not be found or the
+            snapshot could not be read. Raises on request errors while iterating.
         """
-        board_id = self.get_board_id(board_name)
-        if board_id is None:
-            print(f"Board '{board_name}' not found.")
-            return None
-        sprint = self.get_active_sprint(board_id)
-        if sprint is None:
-            print(f"No active sprint found for board '{board_name}'.")
-            return None
-        sprint_id = getattr(sprint, 'id', None)
+        sprint_id = self.get_active_sprint_id(board_name)
         if sprint_id is None:
-            print("Sprint ID not found.")
             return None
-        jql = f"assignee = currentUser() AND sprint = {sprint_id}"
-        all_issues = []
-        start_at = 0
-        while True:
-            try:
-                issues = self.jira.search_issues(jql, startAt=start_at, maxResults=max_results)
-            except Exception as exc:
-                print(f"Error fetching issues for current user in sprint: {exc}")
-                return None
-            all_issues.extend(issues)
-            if len(issues) < max_results:
-                break
-            start_at += max_results
-        return all_issues
-
-    def get_active_sprint(self, board_id: int) -> Optional[Any]:
-        """
-        Get the current active sprint for a given board ID.
-        Args:
-            board_id (int): The ID of the Jira board.
-        Returns:
-            The active sprint object if found, else None.
+        try:
+            if self._use_snapshot(project_key):
+                return iter(self.issue_store.user_issues_in_sprint(
+                    self.url, sprint_id, project_key, self.get_myself()["name"]
+                ))
+        except Exception as exc:
+            print(f"Error reading issue snapshot: {exc}")
+            return None
+        jql = f"assignee = currentUser() AND sprint = {sprint_id}{self._snapshot_scope(project_key)}"
+        return self.iter_issues(jql, fields=("summary", "status"), page_size=max_results)
+
+    def search_all_issues(self, jql: str, page_size: int = DEFAULT_PAGE_SIZE) -> list[Any]:
         """
-        start_at = 0
-        max_results = 50
-        while True:
-            try:
-                sprints = self.jira.sprints(board_id, startAt=start_at, maxResults=max_results)
-            except Exception as exc:
-                print(f"Error fetching sprints: {exc}")
-                return None
-            for sprint in sprints:
-                if getattr(sprint, 'state', None) == 'active':
-                    return sprint
-            if len(sprints) < max_results:
-                break
-            start_at += max_results
-        return None
-
-    def get_board_id(self, board_name: str) -> Optional[int]:
-        """
-        Get the board ID for a given board name.
+        Run a JQL search and return every matching issue, fetching pages concurrently.
         Args:
-            board_name (str): The name of the Jira board.
+            jql (str): The JQL query.
+            page_size (int): Number of issues requested per page.
         Returns:
-            The board ID if found, else None.
+            List of issues in result order. Raises on request errors.
         """
-        start_at = 0
-        max_results = 50
-        board_name_lower = board_name.lower()
-        while True:
-            try:
-                boards = self.jira.boards(startAt=start_at, maxResults=max_results)
-            except Exception as exc:
-                print(f"Error fetching boards: {exc}")
-                return None
-            for board in boards:
-                if getattr(board, 'name', '').lower() == board_name_lower:
-                    return getattr(board, 'id', None)
-            if len(boards) < max_results:
-                break
-            start_at += max_results
-        return None
-
-    def get_current_sprint_name(self, project_key: str, board_name: str) -> Optional[str]:
-        """
-        Get the current active sprint name for a given project key and board name.
+        def fetch_page(start_at: int, max_results: int):
+            issues = self.jira.search_issues(jql, startAt=start_at, maxResults=max_results)
+            return issues, getattr(issues, 'total', None)
+        return fetch_all_concurrently(fetch_page, page_size=page_size, max_workers=self.max_workers)
+
+    def iter_issues(self, jql: str, fields: Iterable[str] = ("summary", "status"),
+                    page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[IssueRecord]:
+        """
+        Stream issues matching a JQL search as compact records holding only the requested fields.
+        Only the named fields are requested from Jira and no Resource objects are built.
         Args:
-            project_key (str): The Jira project key.
-            board_name (str): The name of the Jira board.
+            jql (str): The JQL query.
+            fields (Iterable[str]): Field names to fetch (see jira_issues.FIELD_EXTRACTORS).
+            page_size (int): Number of issues requested per page.
         Returns:
-            The name of the current active sprint if found, else None.
+            Iterator of IssueRecord in result order. Raises on request errors while iterating.
         """
-        board_id = self.get_board_id(board_name)
-        if board_id is None:
-            print(f"Board '{board_name}' not found.")
-            return None
-        sprint = self.get_active_sprint(board_id)
-        if sprint is None:
-            print(f"No active sprint found for board '{board_name}'.")
-            return None
-        return getattr(sprint, 'name', None)
+        names = validate_fields(fields)
+        if self.transport is not None:
+            return iter_issue_records(self.transport.iter_sync(self.transport.iter_search(jql, names, page_size=page_size)))
+
+        def fetch_page(start_at: int, max_results: int):
+            result = self.jira.search_issues(
+                jql, startAt=start_at, maxResults=max_results, fields=list(names), json_result=True
+            )
+            return result.get("issues", []), result.get("total")
+        return iter_issue_records(
+            iter_pages_concurrently(fetch_page, page_size=page_size, max_workers=self.max_workers)
+        )
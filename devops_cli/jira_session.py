@@ -0,0 +1,86 @@
+"""
+Shared, keep-alive Jira connections for Digitalworks2020 DevOps CLI.
+One JIRA instance (and so one pooled requests session) per account, built without any server round trip.
+Follows PEP8 and Codacy standards.
+"""
+
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from jira import JIRA
+
+from devops_cli import tracing
+from devops_cli.rate_limit import RateLimitedAdapter
+
+
+DEFAULT_POOL_SIZE: int = 10
+
+_connections: Dict[Tuple[str, str, str], JIRA] = {}
+_pool_sizes: Dict[Tuple[str, str, str], int] = {}
+_lock = threading.Lock()
+
+
+def account_key(url: str, token_auth: Optional[str], basic_auth: Optional[Tuple[str, str]]) -> Tuple[str, str, str]:
+    """Identify an account without keeping the secret itself in the key."""
+    if basic_auth is not None:
+        kind, secret = "basic", f"{basic_auth[0]}:{basic_auth[1]}"
+    else:
+        kind, secret = "token", token_auth or ""
+    return url.rstrip('/'), kind, hashlib.sha256(secret.encode()).hexdigest()
+
+
+def get_shared_jira(url: str, token_auth: Optional[str] = None, basic_auth: Optional[Tuple[str, str]] = None,
+                    pool_size: int = DEFAULT_POOL_SIZE) -> JIRA:
+    """
+    Get the shared JIRA instance of an account, creating it on first use.
+    The instance is built with validate=False and get_server_info=False, so creating it makes no request,
+    and its session keeps up to pool_size connections alive for reuse across threads.
+    Requests are paced and retried per host by devops_cli.rate_limit.
+    Args:
+        url (str): Jira base URL.
+        token_auth (str, optional): Personal access token (Jira Server).
+        basic_auth (tuple, optional): (username, api_token) (Jira Cloud).
+        pool_size (int): Keep-alive connections kept per host.
+    Returns:
+        JIRA
+    """
+    key = account_key(url, token_auth, basic_auth)
+    with _lock:
+        jira = _connections.get(key)
+        if jira is None:
+            auth: Dict[str, Any] = {"basic_auth": basic_auth} if basic_auth is not None else {"token_auth": token_auth}
+            # Throttled responses are retried by the rate-limited adapter, not by the jira library
+            jira = JIRA(server=url, validate=False, get_server_info=False, max_retries=0, **auth)
+            if tracing.active():
+                tracing.instrument_session(http_session(jira))
+            _connections[key] = jira
+        if pool_size > _pool_sizes.get(key, 0):
+            size_pool(http_session(jira), pool_size)
+            _pool_sizes[key] = pool_size
+        return jira
+
+
+def http_session(jira: JIRA) -> requests.Session:
+    """
+    Return the authenticated requests session behind a JIRA instance.
+    Use it for REST endpoints the jira library does not wrap (e.g. greenhopper) so they reuse the same connections.
+    """
+    return jira._session
+
+
+def size_pool(session: requests.Session, pool_size: int) -> None:
+    """Mount rate-limited keep-alive adapters holding up to pool_size connections per host."""
+    adapter = RateLimitedAdapter(pool_connections=4, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def clear_shared_connections() -> None:
+    """Close and forget every shared Jira connection."""
+    with _lock:
+        for jira in _connections.values():
+            http_session(jira).close()
+        _connections.clear()
+        _pool_sizes.clear()
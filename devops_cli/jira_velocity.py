@@ -0,0 +1,93 @@
+"""
+Velocity history operations shared by the Jira Server and Jira Cloud clients.
+Closed-sprint committed/achieved story points come from the greenhopper velocity report (available on
+both Jira Server and Jira Cloud) and are kept in the local VelocityStore.
+Follows PEP8 and Codacy standards.
+"""
+
+from typing import Optional
+
+from devops_cli.jira_session import http_session
+from devops_cli.velocity_store import summarize_velocity
+
+
+class VelocityMixin:
+    """
+    VelocityMixin adds story point and velocity history operations to a Jira client.
+    The client provides url, refresh, jira, transport and velocity_store (VelocityStore),
+    plus get_board_id() and get_active_sprint() (see BoardLookupMixin).
+    """
+    def get_sprint_story_points_stats(self, board_name: str, num_sprints: int = 3) -> Optional[tuple[list[dict], float]]:
+        """
+        Get committed SP, achieved SP, and average SP for the last num_sprints closed sprints on the board.
+        Served from the local velocity history; the Jira velocity report is only downloaded when a sprint closed since the last sync.
+        Args:
+            board_name (str): The name of the Jira board.
+            num_sprints (int): Number of last closed sprints to analyze.
+        Returns:
+            Tuple of (list of dicts with sprint name, committed SP and achieved SP, average achieved SP), or None if error.
+        """
+        board_id = self.get_board_id(board_name)
+        if board_id is None:
+            print(f"Board '{board_name}' not found.")
+            return None
+        if not self.sync_velocity_history(board_id):
+            return None
+        stats = self.velocity_store.last_sprints(self.url, board_id, num_sprints)
+        avg_velocity = sum(s["achieved_sp"] for s in stats) / len(stats) if stats else 0
+        return stats, avg_velocity
+
+    def get_velocity_history(self, board_name: str, num_sprints: int = 12, window: int = 3) -> Optional[dict]:
+        """
+        Get velocity statistics over many closed sprints from the local velocity history.
+        Args:
+            board_name (str): The name of the Jira board.
+            num_sprints (int): Number of last closed sprints to include.
+            window (int): Rolling average window in sprints.
+        Returns:
+            Dict with "sprints" (oldest first) plus average, median, rolling_average and trend of achieved SP, or None if error.
+        """
+        board_id = self.get_board_id(board_name)
+        if board_id is None:
+            print(f"Board '{board_name}' not found.")
+            return None
+        if not self.sync_velocity_history(board_id):
+            return None
+        sprints = list(reversed(self.velocity_store.last_sprints(self.url, board_id, num_sprints)))
+        history = {"sprints": sprints}
+        history.update(summarize_velocity((s["achieved_sp"] for s in sprints), window=window))
+        return history
+
+    def sync_velocity_history(self, board_id: int) -> bool:
+        """
+        Bring the local velocity history of a board up to date.
+        The velocity report is downloaded only when the board's active sprint changed since the last sync
+        (or --refresh is used), and only sprints not stored yet are added.
+        Args:
+            board_id (int): The ID of the Jira board.
+        Returns:
+            True if the history is usable, False if the report could not be fetched.
+        """
+        active_sprint = self.get_active_sprint(board_id)
+        active_sprint_id = getattr(active_sprint, 'id', None)
+        if not self.refresh and not self.velocity_store.needs_sync(self.url, board_id, active_sprint_id):
+            return True
+        try:
+            if self.transport is not None:
+                report_json = self.transport.run(self.transport.velocity_report(board_id))
+            else:
+                # Same authenticated keep-alive session as every other call on this account
+                response = http_session(self.jira).get(
+                    f'{self.url}/rest/greenhopper/1.0/rapid/charts/velocity',
+                    params={"rapidViewId": board_id},
+                    headers={"Accept": "application/json"}
+                )
+                response.raise_for_status()
+                report_json = response.json()
+        except Exception as exc:
+            print(f"Error fetching velocity report: {exc}")
+            return False
+        if self.velocity_store.merge_report(self.url, board_id, report_json, active_sprint_id) is None:
+            print("Error fetching velocity report: unexpected response from Jira.")
+            return False
+        return True
@@ -1,13 +1,30 @@
 """
 Main entry point for Digitalworks2020 DevOps CLI.
+Runs the interactive menus, or a single operation when a subcommand is given
+(e.g. `devops-cli jira_server current_sprint_summary --account enterprise`).
 Follows PEP8 and Codacy standards.
 """
 
+import os
 import sys
-from devops_cli.config import create_or_load_config
-from devops_cli.aws_client import AWSClient
-from devops_cli.jira_server import JiraServerClient
-from devops_cli.jira_cloud import JiraCloudClient
+import json
+import argparse
+import contextlib
+from datetime import datetime
+from typing import Any, Callable, Dict
+from devops_cli import tracing
+from devops_cli.agent import DEFAULT_IDLE_TIMEOUT_SECONDS, agent_command, forward_to_agent
+from devops_cli.aws_profiles import get_profile_index
+from devops_cli.config import TOOL_CONFIGS, create_or_load_config, load_config
+from devops_cli.jira_cache import JiraMetadataCache
+from devops_cli.output import OUTPUT_FORMATS, TABLE_FORMAT, open_writer
+# Tool clients (and their SDKs) are imported lazily through the registry
+from devops_cli.registry import build_jira_client, load_client_class, registered_tools
+
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
 
 
 def prompt_input(prompt):
@@ -17,7 +34,752 @@ def prompt_input(prompt):
         sys.exit(0)
     return value
 
-def main():
+# Operations. Each prints its result and returns True on success, False when no data or an error occurred.
+# With options["output"] (a RecordWriter, see output.py) results are written as records instead,
+# streamed straight from issue searches and EC2 pagination where the operation lists items.
+
+def emit_records(output, records, columns, error_label: str) -> bool:
+    """
+    Write records through a structured output writer.
+    Args:
+        output (RecordWriter): The writer.
+        records (Iterable[dict]): Records; errors raised while producing them are reported with error_label.
+        columns (Sequence[str]): Record columns.
+        error_label (str): Message prefix for errors.
+    Returns:
+        True when at least one record was written. BrokenPipeError (reader gone) is re-raised.
+    """
+    try:
+        return output.write_records(records, columns) > 0
+    except BrokenPipeError:
+        raise
+    except Exception as exc:
+        print(f"{error_label}: {exc}")
+        return False
+
+def jira_current_sprint_name(client, project_key: str, board_name: str, **options) -> bool:
+    sprint_name = client.get_current_sprint_name(project_key, board_name)
+    output = options.get("output")
+    if output is not None:
+        records = [{"project": project_key, "board": board_name, "sprint": sprint_name}] if sprint_name else []
+        return emit_records(output, records, ("project", "board", "sprint"), "Error writing sprint name")
+    if sprint_name:
+        print(f"Current sprint for project '{project_key}': {sprint_name}")
+        return True
+    print(f"No active sprint found for project '{project_key}'.")
+    return False
+
+def jira_my_issues_in_sprint(client, project_key: str, board_name: str, **options) -> bool:
+    output = options.get("output")
+    if output is not None:
+        issues = client.iter_my_issues_in_current_sprint(board_name, project_key=project_key)
+        if issues is None:
+            return False
+        records = ({"key": issue.key, "summary": issue.summary, "status": issue.status} for issue in issues)
+        return emit_records(output, records, ("key", "summary", "status"), "Error fetching issues for current user in sprint")
+    issues = client.get_my_issues_in_current_sprint(board_name, project_key=project_key)
+    if not issues:
+        print("No issues assigned to you in current sprint or error occurred.")
+        return False
+    # Segregate issues by status (for a synced Jira Server project, the issues come from the local snapshot)
+    status_map = {}
+    for issue in issues:
+        status_name = issue.status or "Unknown"
+        status_map.setdefault(status_name, []).append(issue)
+    print(f"\nYour issues in current sprint (segregated by status):")
+    for status_name, status_issues in status_map.items():
+        print(f"\nStatus: {status_name}")
+        for issue in status_issues:
+            print(f"- {issue.key}: {issue.summary}")
+    return True
+
+def jira_sprint_sp_stats(client, project_key: str, board_name: str, **options) -> bool:
+    num_sprints = options.get("sprints") or DEFAULT_SP_SPRINTS
+    result = client.get_sprint_story_points_stats(board_name, num_sprints=num_sprints)
+    stats, avg_velocity = result if result else (None, 0)
+    if not stats:
+        print("No sprint stats available or error occurred.")
+        return False
+    if options.get("output") is not None:
+        return emit_records(options["output"], stats, ("sprint", "committed_sp", "achieved_sp"), "Error writing sprint stats")
+    print(f"\nStory Points for Last {len(stats)} Closed Sprints:")
+    for sprint_stat in stats:
+        print(f"Sprint: {sprint_stat['sprint']}")
+        print(f"  Committed SP: {sprint_stat['committed_sp']:.2f}")
+        print(f"  Achieved SP: {sprint_stat['achieved_sp']:.2f}")
+    print(f"Avg Achieved SP (last {len(stats)}): {avg_velocity:.2f}")
+    return True
+
+def jira_velocity_trend(client, project_key: str, board_name: str, **options) -> bool:
+    num_sprints = options.get("sprints") or DEFAULT_TREND_SPRINTS
+    history = client.get_velocity_history(board_name, num_sprints=num_sprints)
+    if not history or not history["sprints"]:
+        print("No velocity history available or error occurred.")
+        return False
+    sprints = history["sprints"]
+    window = len(sprints) - len(history["rolling_average"]) + 1
+    if options.get("output") is not None:
+        records = (
+            {**sprint_stat, "rolling_average": history["rolling_average"][idx - window + 1] if idx >= window - 1 else None}
+            for idx, sprint_stat in enumerate(sprints)
+        )
+        return emit_records(
+            options["output"], records, ("sprint", "committed_sp", "achieved_sp", "rolling_average"), "Error writing velocity history"
+        )
+    print(f"\nVelocity over the last {len(sprints)} closed sprints (oldest first):")
+    for idx, sprint_stat in enumerate(sprints):
+        rolling_idx = idx - window + 1
+        rolling = f"  rolling avg {history['rolling_average'][rolling_idx]:.2f}" if rolling_idx >= 0 else ""
+        print(f"{sprint_stat['sprint']}: committed {sprint_stat['committed_sp']:.2f}, achieved {sprint_stat['achieved_sp']:.2f}{rolling}")
+    print(f"Average achieved SP: {history['average']:.2f}")
+    print(f"Median achieved SP: {history['median']:.2f}")
+    print(f"Trend: {history['trend']:+.2f} SP per sprint")
+    return True
+
+def jira_current_sprint_summary(client, project_key: str, board_name: str, **options) -> bool:
+    summary = client.get_current_sprint_summary(board_name, project_key=project_key)
+    if not summary:
+        print("No data available or error occurred.")
+        return False
+    if options.get("output") is not None:
+        records = (
+            {"assignee": assignee, "issue_type": issue_type, "count": count}
+            for assignee, type_counts in summary.items() for issue_type, count in type_counts.items()
+        )
+        return emit_records(options["output"], records, ("assignee", "issue_type", "count"), "Error writing sprint summary")
+    print("\nCurrent Sprint - Issues Grouped by Assignee & Issue Type:")
+    for assignee, type_counts in summary.items():
+        print(f"\nAssignee: {assignee}")
+        for issue_type, count in type_counts.items():
+            print(f"  {issue_type}: {count}")
+    return True
+
+def jira_sync_issue_snapshot(client, project_key: str, board_name: str, **options) -> bool:
+    if not project_key:
+        print("A project key is required to sync the issue snapshot.")
+        return False
+    written = client.sync_issue_snapshot(project_key, full=bool(options.get("full")))
+    if written is None:
+        print("Could not sync the issue snapshot.")
+        return False
+    if options.get("output") is not None:
+        return emit_records(
+            options["output"], [{"project": project_key, "fetched": written}], ("project", "fetched"), "Error writing sync result"
+        )
+    print(f"Issue snapshot for project '{project_key}' is up to date ({written} issues fetched).")
+    return True
+
+def jira_sprint_dashboard(client, project_key: str, board_name: str, **options) -> bool:
+    # Works across every configured Jira account, so the selected client is not used
+    from devops_cli.jira_dashboard import build_dashboard
+    rows = build_dashboard(options.get("config") or load_config(), cache=options.get("cache"), refresh=bool(options.get("refresh")))
+    if not rows:
+        print("No Jira accounts with a default board configured.")
+        return False
+    if options.get("output") is not None:
+        return emit_records(
+            options["output"], _dashboard_records(rows), DASHBOARD_COLUMNS, "Error writing sprint dashboard"
+        ) and any(not row["error"] for row in rows)
+    totals = {}
+    print("\nSprint dashboard:")
+    for row in rows:
+        print(f"\n[{row['tool']}] {row['account']} - {row['board']}: {row['sprint'] or '-'}")
+        if row["error"]:
+            print(f"  Error: {row['error']}")
+            continue
+        for assignee, type_counts in row["summary"].items():
+            counts = ", ".join(f"{issue_type}: {count}" for issue_type, count in type_counts.items())
+            print(f"  {assignee}: {counts}")
+            for issue_type, count in type_counts.items():
+                totals[issue_type] = totals.get(issue_type, 0) + count
+    ok = sum(1 for row in rows if not row["error"])
+    print(f"\nAll teams ({ok}/{len(rows)} reporting):")
+    for issue_type, count in sorted(totals.items()):
+        print(f"  {issue_type}: {count}")
+    return ok > 0
+
+DASHBOARD_COLUMNS = ("tool", "account", "board", "sprint", "assignee", "issue_type", "count", "error")
+
+def _dashboard_records(rows):
+    """One record per team, assignee and issue type; teams without data get a single record carrying their error."""
+    for row in rows:
+        team = {"tool": row["tool"], "account": row["account"], "board": row["board"], "sprint": row["sprint"]}
+        if row["error"] or not row["summary"]:
+            yield {**team, "assignee": None, "issue_type": None, "count": None, "error": row["error"]}
+            continue
+        for assignee, type_counts in row["summary"].items():
+            for issue_type, count in type_counts.items():
+                yield {**team, "assignee": assignee, "issue_type": issue_type, "count": count, "error": None}
+
+COST_COLUMNS = ("month", "cost")
+
+def aws_current_month_cost(client, **options) -> bool:
+    now = datetime.utcnow()
+    cost = client.get_month_cost(now.year, now.month)
+    if cost is None:
+        print("Could not fetch current month cost.")
+        return False
+    if options.get("output") is not None:
+        return emit_records(options["output"], [{"month": f"{now.year}-{now.month:02d}", "cost": cost}], COST_COLUMNS, "Error writing cost")
+    print(f"Current month ({now.year}-{now.month:02d}) AWS cost: ${cost:.2f}")
+    return True
+
+def aws_prev_month_cost(client, **options) -> bool:
+    now = datetime.utcnow()
+    prev_month = now.month - 1 if now.month > 1 else 12
+    prev_year = now.year if now.month > 1 else now.year - 1
+    cost = client.get_month_cost(prev_year, prev_month)
+    if cost is None:
+        print("Could not fetch previous month cost.")
+        return False
+    if options.get("output") is not None:
+        return emit_records(options["output"], [{"month": f"{prev_year}-{prev_month:02d}", "cost": cost}], COST_COLUMNS, "Error writing cost")
+    print(f"Previous month ({prev_year}-{prev_month:02d}) AWS cost: ${cost:.2f}")
+    return True
+
+def aws_list_instances_by_state(client, **options) -> bool:
+    region = options.get("region")
+    if not region:
+        print("Region is required.")
+        return False
+    # Only counts are shown, so use the counts-only path with filters applied by EC2
+    filters = {"states": options.get("states"), "tag_filters": options.get("tag_filters")}
+    multi_region = region.lower() == "all" or "," in region
+    regions = None if region.lower() == "all" else [r.strip() for r in region.split(",") if r.strip()]
+    if options.get("output") is not None:
+        # Structured output lists every instance, streamed page by page
+        instances = client.iter_instances_by_region(regions, **filters) if multi_region else client.iter_instances(region, **filters)
+        records = (
+            {"region": instance.region, "instance_id": instance.instance_id, "state": instance.state, "name": instance.name}
+            for instance in instances
+        )
+        return emit_records(options["output"], records, ("region", "instance_id", "state", "name"), "Error listing EC2 instances")
+    if multi_region:
+        inventory = client.count_instances_by_region(regions, **filters)
+        if not any(inventory.values()):
+            print("No EC2 instances found or error occurred.")
+            return False
+        totals = {}
+        print("\nEC2 Instance counts by region and state:")
+        for region_name, state_counts in sorted(inventory.items()):
+            if not state_counts:
+                continue
+            print(f"\n{region_name}:")
+            for state, count in state_counts.items():
+                print(f"  {state}: {count}")
+                totals[state] = totals.get(state, 0) + count
+        print(f"\nAll regions ({len(inventory)} queried):")
+        for state, count in totals.items():
+            print(f"  {state}: {count}")
+        return True
+    state_counts = client.count_instances_by_state(region, **filters)
+    if not state_counts:
+        print("No EC2 instances found or error occurred.")
+        return False
+    print("\nEC2 Instance counts by state:")
+    for state, count in state_counts.items():
+        print(f"{state}: {count}")
+    return True
+
+def aws_monthly_cost_trend(client, **options) -> bool:
+    months = options.get("months") or DEFAULT_TREND_MONTHS
+    now = datetime.utcnow()
+    start_year, start_month = divmod(now.year * 12 + now.month - 1 - (months - 1), 12)
+    costs = client.get_monthly_costs(start_year, start_month + 1, months)
+    if not costs:
+        print("Could not fetch monthly costs.")
+        return False
+    if options.get("output") is not None:
+        months_list = list(costs.items())
+        records = (
+            {"month": month_key, "cost": cost, "change": cost - months_list[idx - 1][1] if idx else None}
+            for idx, (month_key, cost) in enumerate(months_list)
+        )
+        return emit_records(options["output"], records, ("month", "cost", "change"), "Error writing monthly costs")
+    print(f"\nAWS cost for the last {months} months:")
+    previous = None
+    for month_key, cost in costs.items():
+        change = f"  ({cost - previous:+,.2f})" if previous is not None else ""
+        print(f"{month_key}: ${cost:,.2f}{change}")
+        previous = cost
+    print(f"Total: ${sum(costs.values()):,.2f}")
+    return True
+
+def _cost_label(row) -> str:
+    return f"{row['service']} [{row['linked_account']}]" if row["linked_account"] else row["service"]
+
+def aws_daily_cost_by_service(client, **options) -> bool:
+    by_account = bool(options.get("by_account"))
+    if options.get("output") is not None:
+        sync = client.sync_daily_costs(by_account=by_account, refresh=bool(options.get("refresh")))
+        if sync is None:
+            return False
+        today = datetime.utcnow().date()
+        records = client.iter_daily_costs(today.replace(day=1).isoformat(), today.isoformat(), by_account=by_account)
+        return emit_records(
+            options["output"], records, ("day", "service", "linked_account", "cost", "change", "estimated"), "Error reading cost ledger"
+        )
+    report = client.get_daily_cost_report(
+        by_account=by_account, days=options.get("days") or DEFAULT_DAILY_COST_DAYS,
+        top=options.get("top") or DEFAULT_TOP_MOVERS, refresh=bool(options.get("refresh"))
+    )
+    if report is None:
+        print("Could not fetch daily AWS cost.")
+        return False
+    sync = report["sync"]
+    if sync["requests"]:
+        print(f"\nCost ledger updated: {sync['days']} day(s) from {sync['first_day']} ({sync['requests']} Cost Explorer call(s)).")
+    else:
+        print("\nCost ledger is up to date (no Cost Explorer call).")
+    if not report["services"]:
+        print("No daily cost recorded for this month yet.")
+        return False
+    print(f"\nMonth to date ({report['month_start']} to {report['today']}, today is partial): ${report['month_to_date']:,.2f}")
+    for row in report["services"]:
+        print(f"  {_cost_label(row):<50} ${row['cost']:>12,.2f}")
+    print("\nDaily cost:")
+    for row in report["daily"]:
+        change = f"  ({row['change']:+,.2f})" if row["change"] is not None else ""
+        print(f"{row['day']}: ${row['cost']:,.2f}{change}")
+    if report["movers"]:
+        print(f"\nTop movers ({report['movers_day']} vs {report['movers_previous_day']}):")
+        for row in report["movers"]:
+            print(f"  {_cost_label(row):<50} {row['change']:>+12,.2f}  (${row['previous']:,.2f} -> ${row['cost']:,.2f})")
+    return True
+
+def aws_all_profiles_month_cost(client, **options) -> bool:
+    now = datetime.utcnow()
+    AWSClient = load_client_class("aws_sso")
+    profiles = None
+    if options.get("account_id") or options.get("role"):
+        profiles = [entry.name for entry in get_profile_index().find(account_id=options.get("account_id"), role=options.get("role"))]
+        if not profiles:
+            print("No AWS profiles match the given account ID/role.")
+            return False
+    result = AWSClient.get_month_cost_all_profiles(now.year, now.month, profiles=profiles)
+    if options.get("output") is not None:
+        for profile, reason in result["skipped"].items():
+            print(f"Skipped profile {profile}: {reason}")
+        records = (
+            {"month": f"{now.year}-{now.month:02d}", "account_id": row["account_id"], "cost": row["cost"], "profiles": row["profiles"]}
+            for row in result["accounts"]
+        )
+        return emit_records(options["output"], records, ("month", "account_id", "cost", "profiles"), "Error writing costs")
+    if result["accounts"]:
+        print(f"\nCurrent month ({now.year}-{now.month:02d}) AWS cost by account:")
+        print(f"{'Account':<14} {'Cost':>14}  Profiles")
+        for row in result["accounts"]:
+            print(f"{row['account_id']:<14} {'$' + format(row['cost'], ',.2f'):>14}  {', '.join(row['profiles'])}")
+        print(f"{'Total':<14} {'$' + format(result['total'], ',.2f'):>14}")
+    else:
+        print("Could not fetch cost for any profile.")
+    if result["skipped"]:
+        print("\nSkipped profiles:")
+        for profile, reason in result["skipped"].items():
+            print(f"- {profile}: {reason}")
+    return bool(result["accounts"])
+
+# Operation key (see TOOL_CONFIGS) -> handler, per tool
+OPERATION_HANDLERS: Dict[str, Dict[str, Callable[..., bool]]] = {
+    "jira_cloud": {
+        "current_sprint_name": jira_current_sprint_name,
+        "my_issues_in_sprint": jira_my_issues_in_sprint,
+        "sprint_sp_stats": jira_sprint_sp_stats,
+        "current_sprint_summary": jira_current_sprint_summary,
+        "velocity_trend": jira_velocity_trend,
+        "sprint_dashboard": jira_sprint_dashboard,
+    },
+    "jira_server": {
+        "current_sprint_name": jira_current_sprint_name,
+        "my_issues_in_sprint": jira_my_issues_in_sprint,
+        "sprint_sp_stats": jira_sprint_sp_stats,
+        "current_sprint_summary": jira_current_sprint_summary,
+        "velocity_trend": jira_velocity_trend,
+        "sync_issue_snapshot": jira_sync_issue_snapshot,
+        "sprint_dashboard": jira_sprint_dashboard,
+    },
+    "aws_sso": {
+        "current_month_cost": aws_current_month_cost,
+        "prev_month_cost": aws_prev_month_cost,
+        "list_instances_by_state": aws_list_instances_by_state,
+        "all_profiles_month_cost": aws_all_profiles_month_cost,
+        "monthly_cost_trend": aws_monthly_cost_trend,
+        "daily_cost_by_service": aws_daily_cost_by_service,
+    },
+}
+
+# Operations that need an EC2 region
+REGION_OPERATIONS = {"list_instances_by_state"}
+# Operations that take a number of closed sprints
+SPRINTS_OPERATIONS = {"sprint_sp_stats", "velocity_trend"}
+DEFAULT_SP_SPRINTS = 3
+DEFAULT_TREND_SPRINTS = 12
+# Operations that can re-fetch everything instead of syncing incrementally
+FULL_SYNC_OPERATIONS = {"sync_issue_snapshot"}
+# Operations that accept EC2 state/tag filters
+EC2_FILTER_OPERATIONS = {"list_instances_by_state"}
+# Operations that take a number of months
+MONTHS_OPERATIONS = {"monthly_cost_trend"}
+DEFAULT_TREND_MONTHS = 12
+# Operations reading the daily cost ledger
+DAILY_COST_OPERATIONS = {"daily_cost_by_service"}
+DEFAULT_DAILY_COST_DAYS = 7
+DEFAULT_TOP_MOVERS = 5
+# AWS operations that work across profiles rather than on the selected one
+PROFILE_FREE_OPERATIONS = {"all_profiles_month_cost"}
+# Cross-profile operations that can be narrowed to profiles of one account and/or role
+PROFILE_FILTER_OPERATIONS = {"all_profiles_month_cost"}
+# Jira operations that work across every configured account rather than on the selected one
+ACCOUNT_FREE_OPERATIONS = {"sprint_dashboard"}
+
+
+def _client(args, key: tuple, factory: Callable[[], Any]) -> Any:
+    """Build a client, or reuse the one the background agent keeps under key."""
+    clients = getattr(args, "clients", None)
+    return factory() if clients is None else clients.get(key, factory)
+
+
+def _aws_files_key(args) -> tuple:
+    """
+    Version of the AWS CLI config and credentials files, for keying AWS clients. Inside the agent, the first
+    request after the files change also drops every pooled boto3 session, since profiles may have been edited.
+    """
+    stamps = get_profile_index().stamps()
+    clients = getattr(args, "clients", None)
+    if clients is not None:
+        clients.get(("aws_files", stamps), _reset_aws_pool)
+    return stamps
+
+
+def _reset_aws_pool() -> bool:
+    from devops_cli.aws_pool import get_default_pool
+    get_default_pool().invalidate()
+    return True
+
+
+def _credentials_ok(args, key: tuple, client) -> bool:
+    """Check AWS credentials; inside the agent, a recent successful check is reused."""
+    clients = getattr(args, "clients", None)
+    if clients is None:
+        return client.check_credentials()
+    if clients.verified(key, client.check_credentials):
+        return True
+    # Credentials may be renewed (aws sso login) before the next request, so drop the cached session
+    from devops_cli.aws_pool import get_default_pool
+    get_default_pool().invalidate(args.profile)
+    return False
+
+
+def aws_sso_main(args):
+    print("\nAWS SSO integration. No credentials required; uses default AWS CLI profile.")
+    operations = TOOL_CONFIGS["aws_sso"].get('operations', [])
+    AWSClient = load_client_class("aws_sso")
+    while True:
+        entries = get_profile_index().entries()
+        profiles = [entry.name for entry in entries]
+        if not profiles:
+            print("No AWS CLI profiles found. Please configure AWS CLI first.")
+            return
+        print("Available AWS profiles:")
+        for idx, entry in enumerate(entries, 1):
+            details = " / ".join(value for value in (entry.account_id, entry.role) if value)
+            print(f"{idx}. {entry.name}" + (f" ({details})" if details else ""))
+        while True:
+            prof_choice = prompt_input(f"Select a profile (1-{len(profiles)}): ").strip()
+            if prof_choice.isdigit() and 1 <= int(prof_choice) <= len(profiles):
+                profile = profiles[int(prof_choice) - 1]
+                break
+            print("Invalid choice. Please try again.")
+        client = AWSClient(profile)
+        if not client.check_credentials():
+            AWSClient.sso_login(profile)
+            client = AWSClient(profile)
+        while True:
+            print(f"\nSelected AWS profile: {profile}")
+            print("Supported AWS SSO Operations:")
+            for idx, op in enumerate(operations, 1):
+                print(f"{idx}. {op['label']}")
+            op_choice = prompt_input(f"Choose an operation (1-{len(operations)}): ").strip()
+            if op_choice.isdigit() and 1 <= int(op_choice) <= len(operations):
+                op_key = operations[int(op_choice) - 1]['key']
+                options = {}
+                if op_key in REGION_OPERATIONS:
+                    options["region"] = prompt_input("Enter AWS region(s) for EC2 (e.g., us-east-1, comma-separated, or 'all'): ").strip()
+                    if not options["region"]:
+                        print("Region is required.")
+                        continue
+                if op_key in MONTHS_OPERATIONS:
+                    months = prompt_input(f"Enter number of months (default {DEFAULT_TREND_MONTHS}): ").strip()
+                    options["months"] = int(months) if months.isdigit() and int(months) > 0 else DEFAULT_TREND_MONTHS
+                if op_key in DAILY_COST_OPERATIONS:
+                    options["by_account"] = prompt_input("Group by linked account as well? (y/n): ").strip().lower() == "y"
+                    options["refresh"] = args.refresh
+                OPERATION_HANDLERS["aws_sso"][op_key](client, **options)
+            else:
+                print("Invalid operation choice.")
+            next_action = prompt_input("\nPress Enter to perform another operation, type 'profile' to switch AWS profile, 'back' to select another tool, or 'exit' to quit: ").strip().lower()
+            if next_action == "profile":
+                break  # break inner loop to select another profile
+            if next_action == "back":
+                return  # break out to select another tool
+            if next_action == "exit":
+                print("Exiting Digitalworks2020 DevOps CLI. Goodbye!")
+                sys.exit(0)
+
+def jira_cloud_main(config, tool, account, args, jira_cache):
+    creds = config[tool]['accounts'][account]
+    project_key = creds.get('default_project')
+    board_name = creds.get('default_board')
+    use_default = False
+    if project_key:
+        use_default = prompt_input(f"Use default project '{project_key}'? (y/n): ").strip().lower() == "y"
+    if not use_default:
+        project_key = prompt_input("Enter Jira project key: ").strip()
+    if not board_name:
+        board_name = prompt_input("Enter Jira board name: ").strip()
+    client = build_jira_client(tool, creds, jira_cache, args.refresh)
+    jira_operations_menu(config, tool, client, project_key, board_name, args, jira_cache)
+
+def jira_server_main(config, tool, account, args, jira_cache):
+    creds = config[tool]['accounts'][account]
+    project_key = creds.get('default_project')
+    board_name = creds.get('default_board')
+    use_default_project = False
+    use_default_board = False
+    if project_key:
+        use_default_project = prompt_input(f"Use default project '{project_key}'? (y/n): ").strip().lower() == "y"
+    if not use_default_project:
+        project_key = prompt_input("Enter Jira project key: ").strip()
+    if board_name:
+        use_default_board = prompt_input(f"Use default board '{board_name}'? (y/n): ").strip().lower() == "y"
+    if not use_default_board:
+        board_name = prompt_input("Enter Jira board name: ").strip()
+    client = build_jira_client(tool, creds, jira_cache, args.refresh)
+    jira_operations_menu(config, tool, client, project_key, board_name, args, jira_cache)
+
+def jira_operations_menu(config, tool, client, project_key, board_name, args, jira_cache):
+    """Offer the tool's operations on one Jira account until the user goes back or exits."""
+    operations = TOOL_CONFIGS[tool].get('operations', [])
+    title = "Jira Cloud" if tool == "jira_cloud" else "Jira Server"
+    while True:
+        print(f"\nSupported {title} Operations:")
+        for idx, op in enumerate(operations, 1):
+            print(f"{idx}. {op['label']}")
+        op_choice = prompt_input(f"Choose an operation (1-{len(operations)}): ").strip()
+        if op_choice.isdigit() and 1 <= int(op_choice) <= len(operations):
+            op_key = operations[int(op_choice) - 1]['key']
+            options = {}
+            if op_key in SPRINTS_OPERATIONS:
+                default = DEFAULT_SP_SPRINTS if op_key == "sprint_sp_stats" else DEFAULT_TREND_SPRINTS
+                sprints = prompt_input(f"Enter number of closed sprints (default {default}): ").strip()
+                options["sprints"] = int(sprints) if sprints.isdigit() and int(sprints) > 0 else default
+            if op_key in FULL_SYNC_OPERATIONS:
+                options["full"] = prompt_input("Re-fetch every issue instead of only changed ones? (y/n): ").strip().lower() == "y"
+            if op_key in ACCOUNT_FREE_OPERATIONS:
+                options.update(config=config, cache=jira_cache, refresh=args.refresh)
+            OPERATION_HANDLERS[tool][op_key](client, project_key, board_name, **options)
+        else:
+            print("Invalid operation choice.")
+        next_action = prompt_input("\nPress Enter to perform another operation, type 'back' to select another tool, or 'exit' to quit: ").strip().lower()
+        if next_action == "back":
+            break
+        if next_action == "exit":
+            print("Exiting Digitalworks2020 DevOps CLI. Goodbye!")
+            sys.exit(0)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser. Subcommands map one to one onto TOOL_CONFIGS operation keys.
+    Returns:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="devops-cli", description="Digitalworks2020 DevOps CLI")
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="Ignore cached Jira board/sprint metadata and look it up again."
+    )
+    parser.add_argument(
+        "--trace", action="store_true",
+        help="Time every client method and API call and print a summary table to stderr at exit."
+    )
+    parser.add_argument(
+        "--trace-file", metavar="PATH",
+        help="Like --trace, and also write a Chrome trace (chrome://tracing, Perfetto) to PATH."
+    )
+    parser.add_argument(
+        "--format", choices=OUTPUT_FORMATS, default=TABLE_FORMAT,
+        help="Output of non-interactive operations: table (text, default), or jsonl/csv records streamed to stdout."
+    )
+    tools = parser.add_subparsers(dest="tool", metavar="tool", help="Run one operation non-interactively.")
+    for tool in registered_tools():
+        tool_parser = tools.add_parser(tool, help=f"{tool} operations")
+        operations = tool_parser.add_subparsers(dest="operation", metavar="operation", required=True)
+        for op in TOOL_CONFIGS[tool].get("operations", []):
+            op_parser = operations.add_parser(op["key"], help=op["label"], description=op["label"])
+            if tool == "aws_sso":
+                if op["key"] not in PROFILE_FREE_OPERATIONS:
+                    op_parser.add_argument("--profile", required=True, help="AWS CLI profile name.")
+                if op["key"] in REGION_OPERATIONS:
+                    op_parser.add_argument("--region", required=True, help="AWS region (e.g., us-east-1), comma-separated regions, or 'all' for every enabled region.")
+                if op["key"] in EC2_FILTER_OPERATIONS:
+                    op_parser.add_argument("--state", help="Comma-separated instance states to include (e.g., running,stopped).")
+                    op_parser.add_argument("--tag", action="append", metavar="KEY=VALUE", help="Only instances with this tag (repeatable).")
+                if op["key"] in PROFILE_FILTER_OPERATIONS:
+                    op_parser.add_argument("--account-id", help="Only profiles of this AWS account ID (as named in ~/.aws/config).")
+                    op_parser.add_argument("--role", help="Only profiles using this role (SSO role name or role_arn role).")
+                if op["key"] in MONTHS_OPERATIONS:
+                    op_parser.add_argument("--months", type=int, default=DEFAULT_TREND_MONTHS, help="Number of months, including the current one.")
+                if op["key"] in DAILY_COST_OPERATIONS:
+                    op_parser.add_argument("--by-account", action="store_true", help="Group by linked account as well as service.")
+                    op_parser.add_argument("--days", type=int, default=DEFAULT_DAILY_COST_DAYS, help="Number of complete days with day-over-day changes.")
+                    op_parser.add_argument("--top", type=int, default=DEFAULT_TOP_MOVERS, help="Number of top movers.")
+                    op_parser.add_argument(
+                        "--refresh", action="store_true", default=argparse.SUPPRESS,
+                        help="Query Cost Explorer even if the cost ledger was synced in the last few hours."
+                    )
+            else:
+                if op["key"] not in ACCOUNT_FREE_OPERATIONS:
+                    op_parser.add_argument("--account", help="Configured account name (optional when only one exists).")
+                    op_parser.add_argument("--project", help="Jira project key (defaults to the account's default_project).")
+                    op_parser.add_argument("--board", help="Jira board name (defaults to the account's default_board).")
+                if op["key"] in SPRINTS_OPERATIONS:
+                    op_parser.add_argument("--sprints", type=int, help="Number of last closed sprints to include.")
+                if op["key"] in FULL_SYNC_OPERATIONS:
+                    op_parser.add_argument("--full", action="store_true", help="Re-fetch every issue instead of only changed ones.")
+                op_parser.add_argument(
+                    "--refresh", action="store_true", default=argparse.SUPPRESS,
+                    help="Ignore cached Jira board/sprint metadata and look it up again."
+                )
+            op_parser.add_argument(
+                "--format", choices=OUTPUT_FORMATS, default=argparse.SUPPRESS,
+                help="table (text, default), or jsonl/csv records streamed to stdout."
+            )
+    agent_parser = tools.add_parser("agent", help="Background agent that keeps clients warm between runs")
+    agent_ops = agent_parser.add_subparsers(dest="operation", metavar="operation", required=True)
+    start_parser = agent_ops.add_parser("start", help="Start the agent in the background")
+    start_parser.add_argument(
+        "--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT_SECONDS,
+        help="Exit after this many seconds without requests (0: never)."
+    )
+    start_parser.add_argument("--foreground", action="store_true", help="Run the agent in this terminal.")
+    agent_ops.add_parser("stop", help="Stop the agent")
+    agent_ops.add_parser("status", help="Show whether the agent is running")
+    return parser
+
+def _parse_tag_filters(tags):
+    """Turn repeated KEY=VALUE options into {key: [values]}; returns False on malformed input."""
+    if not tags:
+        return None
+    tag_filters = {}
+    for tag in tags:
+        key, sep, value = tag.partition("=")
+        if not sep or not key:
+            return False
+        tag_filters.setdefault(key, []).append(value)
+    return tag_filters
+
+def run_command(args) -> int:
+    """
+    Run a single operation without prompting.
+    With --format jsonl/csv, stdout carries only records; messages and errors go to stderr.
+    Args:
+        args (argparse.Namespace): Parsed arguments with tool and operation set.
+    Returns:
+        int: Process exit status (0 success, 1 operation failed, 2 usage or config error).
+    """
+    output = open_writer(args.format, sys.stdout)
+    if output is None:
+        return _run_operation(args, None)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            status = _run_operation(args, output)
+        output.close()
+        return status
+    except BrokenPipeError:
+        # The reader (e.g. head) stopped early: not an error, but keep Python from failing to flush stdout at exit
+        # (inside the agent, stdout is a socket stream without a file descriptor)
+        with contextlib.suppress(OSError, ValueError):
+            stdout_fd = sys.stdout.fileno()
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, stdout_fd)
+            os.close(devnull)
+        return EXIT_OK
+
+def _run_operation(args, output) -> int:
+    handler = OPERATION_HANDLERS[args.tool][args.operation]
+    if args.tool == "aws_sso":
+        options = {
+            "output": output,
+            "region": getattr(args, "region", None),
+            "months": getattr(args, "months", None),
+            "states": [state.strip() for state in args.state.split(",")] if getattr(args, "state", None) else None,
+            "tag_filters": _parse_tag_filters(getattr(args, "tag", None)),
+            "account_id": getattr(args, "account_id", None),
+            "role": getattr(args, "role", None),
+            "by_account": getattr(args, "by_account", False),
+            "days": getattr(args, "days", None),
+            "top": getattr(args, "top", None),
+            "refresh": args.refresh,
+        }
+        if options["tag_filters"] is False:
+            print("--tag must be KEY=VALUE.", file=sys.stderr)
+            return EXIT_USAGE
+        # Keyed by the AWS files too, so the agent rebuilds the client after ~/.aws/config is edited
+        files_key = _aws_files_key(args)
+        if args.operation in PROFILE_FREE_OPERATIONS:
+            return EXIT_OK if handler(None, **options) else EXIT_FAILURE
+        key = ("aws_sso", args.profile, files_key)
+        try:
+            client = _client(args, key, lambda: load_client_class("aws_sso")(args.profile))
+        except Exception as exc:
+            print(f"Error loading AWS profile '{args.profile}': {exc}", file=sys.stderr)
+            return EXIT_USAGE
+        if not _credentials_ok(args, key, client):
+            print(f"AWS credentials for profile '{args.profile}' are expired or missing.", file=sys.stderr)
+            print(f"Please run: aws sso login --profile {args.profile}", file=sys.stderr)
+            return EXIT_FAILURE
+        return EXIT_OK if handler(client, **options) else EXIT_FAILURE
+
+    try:
+        config = load_config()
+    except (OSError, ValueError) as exc:
+        print(f"Error loading config: {exc}", file=sys.stderr)
+        return EXIT_USAGE
+    jira_cache = _client(args, ("jira_cache",), JiraMetadataCache)
+    if args.operation in ACCOUNT_FREE_OPERATIONS:
+        return EXIT_OK if handler(
+            None, "", "", config=config, cache=jira_cache, refresh=args.refresh, output=output
+        ) else EXIT_FAILURE
+    accounts = config.get(args.tool, {}).get("accounts", {})
+    account = args.account
+    if account is None:
+        if len(accounts) != 1:
+            print(f"--account is required; configured {args.tool} accounts: {', '.join(accounts) or 'none'}", file=sys.stderr)
+            return EXIT_USAGE
+        account = next(iter(accounts))
+    if account not in accounts:
+        print(f"Account '{account}' not found for {args.tool}.", file=sys.stderr)
+        return EXIT_USAGE
+    creds = accounts[account]
+    project_key = args.project or creds.get('default_project', '')
+    board_name = args.board or creds.get('default_board')
+    if not board_name:
+        print("--board is required (no default_board configured for this account).", file=sys.stderr)
+        return EXIT_USAGE
+    # Keyed by the credentials too, so the agent rebuilds the client after the account is edited
+    key = (args.tool, account, json.dumps(creds, sort_keys=True), args.refresh)
+    try:
+        client = _client(args, key, lambda: build_jira_client(args.tool, creds, jira_cache, args.refresh))
+    except Exception as exc:
+        print(f"Error connecting to {args.tool}: {exc}", file=sys.stderr)
+        return EXIT_FAILURE
+    options = {"sprints": getattr(args, "sprints", None), "full": getattr(args, "full", False), "output": output}
+    return EXIT_OK if handler(client, project_key, board_name, **options) else EXIT_FAILURE
+
+def interactive_main(args) -> int:
+    # One metadata cache shared by every Jira client built in this run
+    jira_cache = JiraMetadataCache()
     print("\nWelcome to Digitalworks2020 DevOps CLI!")
     while True:
         config, tool, account = create_or_load_config(prompt_input=prompt_input)
@@ -26,182 +788,38 @@ def main():
             print(f"Selected account: {account}")
             # Hide secure fields when printing account details
             account_details = config[tool]['accounts'][account].copy()
-            secure_fields = [f['name'] for f in __import__('devops_cli.config').config.TOOL_CONFIGS[tool]['fields'] if f['secure']]
+            secure_fields = [f['name'] for f in TOOL_CONFIGS[tool]['fields'] if f['secure']]
             for field in account_details:
                 if field in secure_fields:
                     account_details[field] = "<hidden>"
             print(f"Account details: {account_details}")
 
-        def aws_sso_main():            
-            print("\nAWS SSO integration. No credentials required; uses default AWS CLI profile.")
-            while True:
-                profiles = AWSClient.list_profiles()
-                if not profiles:
-                    print("No AWS CLI profiles found. Please configure AWS CLI first.")
-                    return
-                print("Available AWS profiles:")
-                for idx, prof in enumerate(profiles, 1):
-                    print(f"{idx}. {prof}")
-                while True:
-                    prof_choice = prompt_input(f"Select a profile (1-{len(profiles)}): ").strip()
-                    if prof_choice.isdigit() and 1 <= int(prof_choice) <= len(profiles):
-                        profile = profiles[int(prof_choice) - 1]
-                        break
-                    print("Invalid choice. Please try again.")
-                client = AWSClient(profile)
-                if not client.check_credentials():
-                    AWSClient.sso_login(profile)
-                    client = AWSClient(profile)
-                operations = __import__('devops_cli.config').config.TOOL_CONFIGS["aws_sso"].get('operations', [])
-                while True:
-                    print(f"\nSelected AWS profile: {profile}")
-                    print("Supported AWS SSO Operations:")
-                    for idx, op in enumerate(operations, 1):
-                        print(f"{idx}. {op['label']}")
-                    op_choice = prompt_input(f"Choose an operation (1-{len(operations)}): ").strip()
-                    from datetime import datetime
-                    now = datetime.utcnow()
-                    if op_choice == "1":
-                        cost = client.get_month_cost(now.year, now.month)
-                        if cost is not None:
-                            print(f"Current month ({now.year}-{now.month:02d}) AWS cost: ${cost:.2f}")
-                        else:
-                            print("Could not fetch current month cost.")
-                    elif op_choice == "2":
-                        prev_month = now.month - 1 if now.month > 1 else 12
-                        prev_year = now.year if now.month > 1 else now.year - 1
-                        cost = client.get_month_cost(prev_year, prev_month)
-                        if cost is not None:
-                            print(f"Previous month ({prev_year}-{prev_month:02d}) AWS cost: ${cost:.2f}")
-                        else:
-                            print("Could not fetch previous month cost.")
-                    elif op_choice == "3":
-                        region = prompt_input("Enter AWS region for EC2 (e.g., us-east-1): ").strip()
-                        if not region:
-                            print("Region is required.")
-                            continue
-                        state_map = client.list_instances_by_state(region_name=region)
-                        if not state_map:
-                            print("No EC2 instances found or error occurred.")
-                        else:
-                            print("\nEC2 Instance counts by state:")
-                            for state, instances in state_map.items():
-                                print(f"{state}: {len(instances)}")
-                    else:
-                        print("Invalid operation choice.")
-                    next_action = prompt_input("\nPress Enter to perform another operation, type 'profile' to switch AWS profile, 'back' to select another tool, or 'exit' to quit: ").strip().lower()
-                    if next_action == "profile":
-                        break  # break inner loop to select another profile
-                    if next_action == "back":
-                        return  # break out to select another tool
-                    if next_action == "exit":
-                        print("Exiting Digitalworks2020 DevOps CLI. Goodbye!")
-                        sys.exit(0)
-
-        def jira_cloud_main(config, tool, account):
-            creds = config[tool]['accounts'][account]
-            project_key = creds.get('default_project')
-            board_name = creds.get('default_board')
-            use_default = False
-            if project_key:
-                use_default = prompt_input(f"Use default project '{project_key}'? (y/n): ").strip().lower() == "y"
-            if not use_default:
-                project_key = prompt_input("Enter Jira project key: ").strip()
-            if not board_name:
-                board_name = prompt_input("Enter Jira board name: ").strip()
-            client = JiraCloudClient(
-                creds['url'], creds['username'], creds['api_token']
-            )
-            sprint_name = client.get_current_sprint_name(project_key, board_name)
-            if sprint_name:
-                print(f"Current sprint for project '{project_key}': {sprint_name}")
-            else:
-                print(f"No active sprint found for project '{project_key}'.")
-
-        def jira_server_main(config, tool, account):
-            creds = config[tool]['accounts'][account]
-            project_key = creds.get('default_project')
-            board_name = creds.get('default_board')
-            use_default_project = False
-            use_default_board = False
-            if project_key:
-                use_default_project = prompt_input(f"Use default project '{project_key}'? (y/n): ").strip().lower() == "y"
-            if not use_default_project:
-                project_key = prompt_input("Enter Jira project key: ").strip()
-            if board_name:
-                use_default_board = prompt_input(f"Use default board '{board_name}'? (y/n): ").strip().lower() == "y"
-            if not use_default_board:
-                board_name = prompt_input("Enter Jira board name: ").strip()
-            client = JiraServerClient(
-                creds['url'], creds['api_token']
-            )
-            operations = __import__('devops_cli.config').config.TOOL_CONFIGS["jira_server"].get('operations', [])
-            while True:
-                print(f"\nSupported Jira Server Operations:")
-                for idx, op in enumerate(operations, 1):
-                    print(f"{idx}. {op['label']}")
-                op_choice = prompt_input(f"Choose an operation (1-{len(operations)}): ").strip()
-                if op_choice == "1":
-                    sprint_name = client.get_current_sprint_name(project_key, board_name)
-                    if sprint_name:
-                        print(f"Current sprint for project '{project_key}': {sprint_name}")
-                    else:
-                        print(f"No active sprint found for project '{project_key}'.")
-                elif op_choice == "2":
-                    issues = client.get_my_issues_in_current_sprint(board_name)
-                    if issues:
-                        # Segregate issues by status
-                        status_map = {}
-                        for issue in issues:
-                            status = getattr(issue.fields, 'status', None)
-                            status_name = status.name if status else "Unknown"
-                            status_map.setdefault(status_name, []).append(issue)
-                        print(f"\nYour issues in current sprint (segregated by status):")
-                        for status_name, status_issues in status_map.items():
-                            print(f"\nStatus: {status_name}")
-                            for issue in status_issues:
-                                print(f"- {issue.key}: {issue.fields.summary}")
-                    else:
-                        print("No issues assigned to you in current sprint or error occurred.")
-                elif op_choice == "3":
-                    stats, avg_velocity = client.get_sprint_story_points_stats(board_name)
-                    if stats:
-                        print("\nStory Points for Last 3 Closed Sprints:")
-                        for sprint_stat in stats:
-                            print(f"Sprint: {sprint_stat['sprint']}")
-                            print(f"  Committed SP: {sprint_stat['committed_sp']:.2f}")
-                            print(f"  Achieved SP: {sprint_stat['achieved_sp']:.2f}")
-                        print(f"Avg Achieved SP (last 3): {avg_velocity:.2f}")
-                    else:
-                        print("No sprint stats available or error occurred.")
-                elif op_choice == "4":
-                    summary = client.get_current_sprint_summary(board_name)
-                    if summary:
-                        print("\nCurrent Sprint - Issues Grouped by Assignee & Issue Type:")
-                        for assignee, type_counts in summary.items():
-                            print(f"\nAssignee: {assignee}")
-                            for issue_type, count in type_counts.items():
-                                print(f"  {issue_type}: {count}")
-                    else:
-                        print("No data available or error occurred.")
-                else:
-                    print("Invalid operation choice.")
-                next_action = prompt_input("\nPress Enter to perform another operation, type 'back' to select another tool, or 'exit' to quit: ").strip().lower()
-                if next_action == "back":
-                    break
-                if next_action == "exit":
-                    print("Exiting Digitalworks2020 DevOps CLI. Goodbye!")
-                    sys.exit(0)
-
         # Modular tool dispatch
         if tool == "aws_sso":
-            aws_sso_main()
+            aws_sso_main(args)
         elif tool == "jira_cloud":
-            jira_cloud_main(config, tool, account)
+            jira_cloud_main(config, tool, account, args, jira_cache)
         elif tool == "jira_server":
-            jira_server_main(config, tool, account)
+            jira_server_main(config, tool, account, args, jira_cache)
         else:
             prompt_input("\nPress Enter to continue or type 'exit' to quit: ")
 
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.tool == "agent":
+        return agent_command(args)
+    if args.trace or args.trace_file:
+        # Must happen before any client class is loaded, so the classes get instrumented
+        tracing.enable(args.trace_file)
+    elif args.tool:
+        # A running agent has the SDKs imported and clients connected; traced runs stay in-process
+        status = forward_to_agent(sys.argv[1:] if argv is None else argv)
+        if status is not None:
+            return status
+    if args.tool:
+        with tracing.span(f"{args.tool} {args.operation}", "command"):
+            return run_command(args)
+    return interactive_main(args)
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Structured output for Digitalworks2020 DevOps CLI.
+Writes operation results as JSON Lines or CSV, one record at a time as they are produced. Records are
+buffered and written in batches, with the first record flushed at once so a reader such as jq starts
+right away; nothing is kept after a batch is written, so memory stays flat on large exports.
+Follows PEP8 and Codacy standards.
+"""
+
+import io
+import csv
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional, Sequence, TextIO
+
+
+TABLE_FORMAT = "table"
+JSONL_FORMAT = "jsonl"
+CSV_FORMAT = "csv"
+# "table" is the human-readable text each operation prints
+OUTPUT_FORMATS = (TABLE_FORMAT, JSONL_FORMAT, CSV_FORMAT)
+FLUSH_RECORDS = 500
+FLUSH_INTERVAL_SECONDS = 0.5
+# CSV cells cannot hold lists, so list values are joined with this separator
+CSV_LIST_SEPARATOR = ";"
+
+
+class RecordWriter(ABC):
+    """
+    RecordWriter formats records (flat dicts) into an in-memory buffer and writes the buffer to a text stream
+    after the first record, every FLUSH_RECORDS records, and at the next record once FLUSH_INTERVAL_SECONDS
+    have passed since the last write. Subclasses format a single record.
+    """
+    def __init__(self, stream: TextIO, flush_records: int = FLUSH_RECORDS,
+                 flush_interval: float = FLUSH_INTERVAL_SECONDS) -> None:
+        """
+        Initialize the writer.
+        Args:
+            stream (TextIO): Where records are written (usually sys.stdout).
+            flush_records (int): Number of buffered records that triggers a write.
+            flush_interval (float): Seconds after which the next record triggers a write.
+        """
+        self.stream = stream
+        self.flush_records = max(1, flush_records)
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self.columns: Optional[list[str]] = None
+        self._buffer = io.StringIO()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def start(self, columns: Sequence[str]) -> None:
+        """Set the record columns; later calls are ignored. Called with the first record's keys if never called."""
+        if self.columns is None:
+            self.columns = list(columns)
+            self._start()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Buffer one record, writing the buffer out when a flush is due."""
+        if self.columns is None:
+            self.start(record)
+        self._format(record)
+        self._pending += 1
+        self.records_written += 1
+        if (self.records_written == 1 or self._pending >= self.flush_records
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def write_records(self, records: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> int:
+        """
+        Write records as the iterable produces them.
+        Args:
+            records (Iterable[dict]): Records, typically a generator over paged API results.
+            columns (Sequence[str], optional): Column order (and CSV header, written even when there are no records).
+        Returns:
+            Number of records written. Raises whatever iterating the records raises, and BrokenPipeError
+            when the reader has gone away.
+        """
+        if columns is not None:
+            self.start(columns)
+        written = 0
+        for record in records:
+            self.write(record)
+            written += 1
+        return written
+
+    def flush(self) -> None:
+        """Write out buffered records and flush the stream."""
+        data = self._buffer.getvalue()
+        if data:
+            self.stream.write(data)
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        self.stream.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Write out whatever is still buffered."""
+        self.flush()
+
+    def _start(self) -> None:
+        pass
+
+    @abstractmethod
+    def _format(self, record: Dict[str, Any]) -> None:
+        """Format one record into self._buffer."""
+
+
+class JsonLinesWriter(RecordWriter):
+    """JsonLinesWriter writes one compact JSON object per line (JSON Lines)."""
+    def _format(self, record: Dict[str, Any]) -> None:
+        self._buffer.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str))
+        self._buffer.write("\n")
+
+
+class CsvWriter(RecordWriter):
+    """CsvWriter writes a header row and one CSV row per record; keys outside the columns are ignored."""
+    _writer: Any = None
+
+    def _start(self) -> None:
+        self._writer = csv.DictWriter(self._buffer, fieldnames=self.columns, extrasaction="ignore", lineterminator="\n")
+        self._writer.writeheader()
+
+    def _format(self, record: Dict[str, Any]) -> None:
+        self._writer.writerow({key: _csv_value(value) for key, value in record.items()})
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return CSV_LIST_SEPARATOR.join(str(item) for item in value)
+    return value
+
+
+WRITERS = {
+    JSONL_FORMAT: JsonLinesWriter,
+    CSV_FORMAT: CsvWriter,
+}
+
+
+def open_writer(output_format: Optional[str], stream: TextIO) -> Optional[RecordWriter]:
+    """
+    Get the record writer of an output format.
+    Args:
+        output_format (str, optional): One of OUTPUT_FORMATS; None means "table".
+        stream (TextIO): Where records are written.
+    Returns:
+        RecordWriter, or None for "table" (operations print their usual text). Raises ValueError for unknown formats.
+    """
+    if output_format in (None, TABLE_FORMAT):
+        return None
+    writer_class = WRITERS.get(output_format)
+    if writer_class is None:
+        raise ValueError(f"Unknown output format '{output_format}' (choose from {', '.join(OUTPUT_FORMATS)}).")
+    return writer_class(stream)
@@ -0,0 +1,284 @@
+"""
+Rate-limit-aware request scheduling for Digitalworks2020 DevOps CLI.
+Every Jira host gets one scheduler: a token bucket paces requests, an AIMD limiter adapts how many
+run at once, and throttled responses (429/503) are retried after Retry-After or a jittered backoff.
+A Retry-After longer than the backoff cap fails the request instead of stalling the CLI.
+The rate and concurrency shrink when the server pushes back and grow again while it keeps up.
+Follows PEP8 and Codacy standards.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+from devops_cli import tracing
+
+
+# Responses meaning "slow down": Jira Cloud sends 429, overloaded Jira Server nodes send 503
+THROTTLE_STATUSES = frozenset({429, 503})
+DEFAULT_RATE: float = 50.0
+DEFAULT_MIN_RATE: float = 1.0
+DEFAULT_BURST: int = 5
+DEFAULT_MAX_CONCURRENCY: int = 32
+DEFAULT_MAX_RETRIES: int = 6
+DEFAULT_BACKOFF_BASE: float = 0.25
+DEFAULT_BACKOFF_CAP: float = 30.0
+# Requests per second added back per second of successful responses
+RATE_INCREASE: float = 1.0
+# Throttled responses to requests that were already in flight count as one decrease
+DECREASE_COOLDOWN_SECONDS: float = 1.0
+ASYNC_POLL_SECONDS: float = 0.005
+
+
+class TokenBucket:
+    """
+    TokenBucket paces requests to a rate with a bounded burst.
+    Reservations may drive the balance negative; callers then wait until their token is due.
+    """
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take one token; returns the seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - self._updated)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for at least the given number of seconds (e.g. Retry-After)."""
+        with self._lock:
+            # Pauses overlap rather than add up when several requests are told to wait at once
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate, keeping tokens earned at the old rate."""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+
+class AIMDLimiter:
+    """
+    AIMDLimiter caps requests in flight: the limit grows by about one per round of successes
+    and halves on every throttled response.
+    """
+    def __init__(self, maximum: int, minimum: int = 1) -> None:
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free."""
+        with self._cond:
+            if self._active < int(self.limit):
+                self._active += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        """Wait for a free slot and take it."""
+        with self._cond:
+            while self._active >= int(self.limit):
+                self._cond.wait()
+            self._active += 1
+
+    def release(self, throttled: Optional[bool]) -> None:
+        """
+        Give a slot back and adapt the limit.
+        Args:
+            throttled (bool, optional): True for a throttled response, False for any other response,
+                None when no response was received (limit unchanged).
+        """
+        with self._cond:
+            self._active -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif throttled is False:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds; None when absent or invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """
+    RequestScheduler paces, limits and retries requests to one host.
+    Shared by every thread (and the async transport) talking to that host.
+    """
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_retries: int = DEFAULT_MAX_RETRIES,
+                 min_rate: float = DEFAULT_MIN_RATE, backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_cap: float = DEFAULT_BACKOFF_CAP) -> None:
+        """
+        Initialize a scheduler.
+        Args:
+            rate (float): Highest request rate per second; also the starting rate.
+            burst (int): Requests allowed back to back before pacing starts.
+            max_concurrency (int): Highest number of requests in flight; also the starting limit.
+            max_retries (int): Retries of a throttled request before its response is returned.
+            min_rate (float): The rate never drops below this.
+            backoff_base (float): First backoff ceiling in seconds when no Retry-After is sent.
+            backoff_cap (float): Largest backoff ceiling in seconds, and the longest Retry-After that is waited for.
+        """
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AIMDLimiter(max_concurrency)
+        self.stats = {"requests": 0, "throttled": 0, "retries": 0}
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        self.limiter.acquire()
+        delay = self.bucket.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be sent."""
+        while not self.limiter.try_acquire():
+            await asyncio.sleep(ASYNC_POLL_SECONDS)
+        delay = self.bucket.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def release(self, status: Optional[int]) -> None:
+        """
+        Report the outcome of a request.
+        Args:
+            status (int, optional): HTTP status, or None when the request failed without a response.
+        """
+        throttled = None if status is None else status in THROTTLE_STATUSES
+        with self._lock:
+            self.stats["requests"] += 1
+            if throttled:
+                self.stats["throttled"] += 1
+                now = time.monotonic()
+                if now - self._last_decrease < DECREASE_COOLDOWN_SECONDS:
+                    # Already backed off for this burst; just free the slot
+                    self.limiter.release(None)
+                    return
+                self._last_decrease = now
+        self.limiter.release(throttled)
+        with self._lock:
+            if throttled:
+                rate = max(self.min_rate, self.bucket.rate / 2)
+            elif throttled is False and self.bucket.rate < self.max_rate:
+                # About `rate` responses arrive per second, so this adds RATE_INCREASE per second
+                rate = min(self.max_rate, self.bucket.rate + RATE_INCREASE / self.bucket.rate)
+            else:
+                return
+        self.bucket.set_rate(rate)
+
+    def should_retry(self, status: int, attempt: int) -> bool:
+        """Tell whether a response with this status should be retried after the given number of retries."""
+        return status in THROTTLE_STATUSES and attempt < self.max_retries
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying a throttled request.
+        Retry-After is honored and holds back the whole host; otherwise full-jitter exponential backoff is used.
+        Args:
+            attempt (int): Number of retries already made for this request.
+            retry_after (str, optional): The response's Retry-After header.
+        Returns:
+            Seconds to wait, or None when Retry-After asks for more than backoff_cap seconds: the throttled
+            response should then be returned as a failure rather than waited out.
+        """
+        seconds = parse_retry_after(retry_after)
+        if seconds is not None and seconds > self.backoff_cap:
+            return None
+        with self._lock:
+            self.stats["retries"] += 1
+        if seconds is not None:
+            self.bucket.pause(seconds)
+            return seconds
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(url: str) -> RequestScheduler:
+    """
+    Get the shared scheduler of the host a URL points at, creating it on first use.
+    Args:
+        url (str): Any URL on the host.
+    Returns:
+        RequestScheduler
+    """
+    host = urlparse(url).netloc.lower()
+    with _schedulers_lock:
+        scheduler = _schedulers.get(host)
+        if scheduler is None:
+            scheduler = RequestScheduler()
+            _schedulers[host] = scheduler
+        return scheduler
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that sends every request through the host's RequestScheduler and retries throttled responses.
+    Mount it on a requests session in place of the default adapter.
+    """
+    def send(self, request: Any, **kwargs: Any) -> Any:
+        scheduler = get_scheduler(request.url)
+        attempt = 0
+        while True:
+            scheduler.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                scheduler.release(None)
+                raise
+            scheduler.release(response.status_code)
+            if not scheduler.should_retry(response.status_code, attempt):
+                return response
+            delay = scheduler.retry_delay(attempt, response.headers.get("Retry-After"))
+            if delay is None:
+                # Waiting longer than the backoff cap would look like a hang (e.g. a proxy sending Retry-After: 86400)
+                return response
+            tracing.record_retry(request.method, request.url)
+            # Read the short error body so the connection goes back to the pool
+            _ = response.content
+            response.close()
+            time.sleep(delay)
+            attempt += 1
@@ -0,0 +1,82 @@
+"""
+Lazy tool registry for Digitalworks2020 DevOps CLI.
+Each tool in SUPPORTED_TOOLS names its client as "module:Class" in TOOL_CONFIGS; the module
+(and its SDK: jira, boto3, requests) is imported only when that tool is first used.
+Follows PEP8 and Codacy standards.
+"""
+
+import importlib
+import threading
+from typing import Any, Dict
+
+from devops_cli import tracing
+from devops_cli.config import SUPPORTED_TOOLS, TOOL_CONFIGS
+from devops_cli.jira_paging import DEFAULT_MAX_WORKERS
+
+
+_loaded: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def registered_tools() -> list[str]:
+    """
+    List tools that declare a client.
+    Returns:
+        list: Tool names in SUPPORTED_TOOLS order.
+    """
+    return [tool for tool in SUPPORTED_TOOLS if TOOL_CONFIGS.get(tool, {}).get("client")]
+
+
+def load_client_class(tool: str) -> Any:
+    """
+    Import and return the client class of a tool.
+    Args:
+        tool (str): Tool name from SUPPORTED_TOOLS.
+    Returns:
+        The client class. Raises KeyError for unknown tools and ImportError when the SDK is missing.
+    """
+    with _lock:
+        if tool not in _loaded:
+            if tool not in SUPPORTED_TOOLS:
+                raise KeyError(f"Unsupported tool: {tool}")
+            module_name, _, class_name = TOOL_CONFIGS[tool]["client"].partition(":")
+            module = importlib.import_module(module_name)
+            _loaded[tool] = getattr(module, class_name)
+            if tracing.active():
+                tracing.instrument_class(_loaded[tool])
+        return _loaded[tool]
+
+
+def build_client(tool: str, creds: Dict[str, Any], **kwargs: Any) -> Any:
+    """
+    Build a tool client from stored credentials.
+    Credentials are passed positionally in the order the tool's "fields" are declared in TOOL_CONFIGS.
+    Args:
+        tool (str): Tool name from SUPPORTED_TOOLS.
+        creds (dict): Account credentials.
+        **kwargs: Extra keyword arguments for the client constructor.
+    Returns:
+        The client instance.
+    """
+    client_cls = load_client_class(tool)
+    field_values = [creds[field["name"]] for field in TOOL_CONFIGS[tool]["fields"]]
+    return client_cls(*field_values, **kwargs)
+
+
+def build_jira_client(tool: str, creds: Dict[str, Any], cache: Any, refresh: bool = False) -> Any:
+    """
+    Build a Jira Cloud or Jira Server client from stored credentials and the account's tuning settings.
+    Args:
+        tool (str): "jira_cloud" or "jira_server".
+        creds (dict): Account credentials, optionally with max_workers and transport.
+        cache (JiraMetadataCache): Metadata cache shared by the clients.
+        refresh (bool): Ignore cached metadata.
+    Returns:
+        The client instance.
+    """
+    return build_client(
+        tool, creds,
+        cache=cache, refresh=refresh,
+        max_workers=int(creds.get("max_workers", DEFAULT_MAX_WORKERS)),
+        async_transport=creds.get("transport") == "async"
+    )
@@ -0,0 +1,366 @@
+"""
+Operation tracing for Digitalworks2020 DevOps CLI (--trace).
+Records a timed span for each client method call and each outbound Jira HTTP / botocore call, with
+request counts, bytes, retries and page numbers, prints a summary table at exit and can write a
+Chrome trace (chrome://tracing, Perfetto). Nothing is wrapped or hooked until tracing is enabled,
+so the cost when it is off is a single None check at a few call sites.
+Standard library only, so importing it never pulls in an SDK.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import types
+import atexit
+import functools
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+_ID_SEGMENT = re.compile(r"/([^/]+)/\d+(?=/|$)")
+# Numeric segments after these are API versions (/rest/api/2, /rest/auth/1), not IDs
+_VERSION_PARENTS = {"api", "auth"}
+
+
+class Span:
+    """One timed call."""
+    __slots__ = ("name", "category", "start", "duration", "thread", "depth", "args")
+
+    def __init__(self, name: str, category: str, start: float, thread: int, depth: int,
+                 args: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.category = category
+        self.start = start
+        self.duration = 0.0
+        self.thread = thread
+        self.depth = depth
+        self.args = args or {}
+
+
+class Tracer:
+    """
+    Tracer collects spans and retry counts for the whole process.
+    """
+    def __init__(self, trace_file: Optional[str] = None) -> None:
+        self.trace_file = trace_file
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+        self.retries: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str, category: str, args: Optional[Dict[str, Any]] = None) -> Span:
+        """Open a span on the current thread."""
+        stack = self._stack()
+        span = Span(name, category, time.perf_counter(), threading.get_ident(), len(stack), args)
+        stack.append(span)
+        return span
+
+    def end(self, span: Span) -> None:
+        """Close a span opened with begin()."""
+        span.duration = time.perf_counter() - span.start
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        with self._lock:
+            self.spans.append(span)
+
+    def add(self, name: str, category: str, start: float, duration: float, args: Optional[Dict[str, Any]] = None) -> None:
+        """Record a span that has already finished (e.g. from an HTTP response hook)."""
+        span = Span(name, category, start, threading.get_ident(), len(self._stack()), args)
+        span.duration = duration
+        with self._lock:
+            self.spans.append(span)
+
+    def retry(self, name: str) -> None:
+        """Count a retried request."""
+        with self._lock:
+            self.retries[name] = self.retries.get(name, 0) + 1
+
+    def summary(self) -> list[Dict[str, Any]]:
+        """
+        Aggregate spans by name.
+        Returns:
+            Rows with name, category, calls, total_ms, mean_ms, max_ms, bytes, retries and pages, slowest first.
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+            retries = dict(self.retries)
+        for span in spans:
+            row = rows.setdefault(span.name, {
+                "name": span.name, "category": span.category, "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "bytes": 0, "retries": 0, "pages": set()
+            })
+            duration_ms = span.duration * 1000
+            row["calls"] += 1
+            row["total_ms"] += duration_ms
+            row["max_ms"] = max(row["max_ms"], duration_ms)
+            row["bytes"] += span.args.get("bytes") or 0
+            row["retries"] += span.args.get("retries") or 0
+            if span.args.get("page") is not None:
+                row["pages"].add(span.args["page"])
+        for name, count in retries.items():
+            rows.setdefault(name, {
+                "name": name, "category": "http", "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "bytes": 0, "retries": 0, "pages": set()
+            })["retries"] += count
+        for row in rows.values():
+            row["mean_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+            row["pages"] = len(row["pages"])
+        return sorted(rows.values(), key=lambda r: r["total_ms"], reverse=True)
+
+    def print_summary(self, file: Any = None) -> None:
+        """Print the summary table (to stderr by default, so command output stays clean)."""
+        file = file or sys.stderr
+        rows = self.summary()
+        wall_ms = (time.perf_counter() - self.origin) * 1000
+        requests = sum(r["calls"] for r in rows if r["category"] in ("http", "aws"))
+        print(f"\nTrace summary: {wall_ms:.0f} ms wall, {requests} API calls", file=file)
+        print(f"{'Span':<58} {'Calls':>6} {'Total ms':>10} {'Mean ms':>9} {'Max ms':>9} {'Bytes':>11} {'Retries':>8} {'Pages':>6}", file=file)
+        for r in rows:
+            print(
+                f"{r['name'][:58]:<58} {r['calls']:>6} {r['total_ms']:>10.1f} {r['mean_ms']:>9.1f} {r['max_ms']:>9.1f}"
+                f" {r['bytes']:>11,} {r['retries']:>8} {r['pages'] or '':>6}",
+                file=file
+            )
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write spans in Chrome trace event format."""
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {
+                    "name": span.name, "cat": span.category, "ph": "X", "pid": pid, "tid": span.thread,
+                    "ts": (span.start - self.origin) * 1_000_000, "dur": span.duration * 1_000_000,
+                    "args": span.args
+                }
+                for span in self.spans
+            ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def finish(self) -> None:
+        """Print the summary and write the trace file, if one was requested."""
+        self.print_summary()
+        if self.trace_file:
+            try:
+                self.write_chrome_trace(self.trace_file)
+                print(f"Trace written to {self.trace_file}", file=sys.stderr)
+            except OSError as exc:
+                print(f"Error writing trace file: {exc}", file=sys.stderr)
+
+
+_tracer: Optional[Tracer] = None
+
+
+class _NullSpan:
+    """Shared do-nothing context manager returned by span() while tracing is off."""
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _SpanContext:
+    def __init__(self, tracer: Tracer, name: str, category: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.span: Optional[Span] = None
+
+    def __enter__(self) -> "_SpanContext":
+        self.span = self.tracer.begin(self.name, self.category, self.args)
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> bool:
+        if exc_type is not None:
+            self.span.args["error"] = exc_type.__name__
+        self.tracer.end(self.span)
+        return False
+
+
+def enable(trace_file: Optional[str] = None) -> Tracer:
+    """
+    Turn tracing on for the rest of the process; the summary is printed at exit.
+    Args:
+        trace_file (str, optional): Also write a Chrome trace JSON file here.
+    Returns:
+        Tracer
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(trace_file)
+        atexit.register(_tracer.finish)
+    return _tracer
+
+
+def active() -> bool:
+    """Tell whether tracing is on."""
+    return _tracer is not None
+
+
+def span(name: str, category: str = "op", **args: Any) -> Any:
+    """Context manager timing a block; does nothing while tracing is off."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _SpanContext(_tracer, name, category, args)
+
+
+def _finish_when_exhausted(generator: Any, tracer: Tracer, name: str, start: float) -> Any:
+    try:
+        return (yield from generator)
+    finally:
+        tracer.add(name, "op", start, time.perf_counter() - start)
+
+
+def _traced(func: Any, name: str) -> Any:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        tracer = _tracer
+        if tracer is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as exc:
+            tracer.add(name, "op", start, time.perf_counter() - start, {"error": type(exc).__name__})
+            raise
+        if isinstance(result, types.GeneratorType):
+            # Streaming methods do their work while iterated, so time the span until the stream ends
+            return _finish_when_exhausted(result, tracer, name, start)
+        tracer.add(name, "op", start, time.perf_counter() - start)
+        return result
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def instrument_class(cls: type) -> type:
+    """
+    Wrap the constructor and public methods (own and inherited) of a client class in spans named "Class.method".
+    Called for each client class as it is loaded while tracing is on; safe to call more than once.
+    """
+    if vars(cls).get("__traced__", False):
+        return cls
+    # Include methods inherited from mixins; wrappers are set on cls, so the bases stay untouched
+    members = {}
+    for base in reversed(cls.__mro__[:-1]):
+        members.update(vars(base))
+    for name, attr in members.items():
+        if name != "__init__" and name.startswith("_"):
+            continue
+        label = f"{cls.__name__}.{name}"
+        if isinstance(attr, staticmethod):
+            setattr(cls, name, staticmethod(_traced(attr.__func__, label)))
+        elif isinstance(attr, classmethod):
+            setattr(cls, name, classmethod(_traced(attr.__func__, label)))
+        elif callable(attr):
+            setattr(cls, name, _traced(attr, label))
+    cls.__traced__ = True
+    return cls
+
+
+def http_span_name(method: str, url: str) -> str:
+    """Span name of an HTTP call: method plus path with numeric IDs folded (e.g. GET /rest/agile/1.0/board/{id}/sprint)."""
+    def fold(match: Any) -> str:
+        return match.group(0) if match.group(1) in _VERSION_PARENTS else f"/{match.group(1)}/{{id}}"
+    return f"{method} {_ID_SEGMENT.sub(fold, urlparse(url).path)}"
+
+
+def _page_number(url: str) -> Optional[int]:
+    query = parse_qs(urlparse(url).query)
+    try:
+        start_at = int(query["startAt"][0])
+        max_results = int(query.get("maxResults", ["50"])[0]) or 50
+    except (KeyError, ValueError):
+        return None
+    return start_at // max_results + 1
+
+
+def record_http(method: str, url: str, start: float, status: Optional[int], size: int) -> None:
+    """
+    Record a finished HTTP call.
+    Args:
+        method (str): HTTP method.
+        url (str): Full request URL (page numbers are read from startAt/maxResults).
+        start (float): time.perf_counter() when the request was sent.
+        status (int, optional): HTTP status.
+        size (int): Response body size in bytes.
+    """
+    tracer = _tracer
+    if tracer is not None:
+        tracer.add(
+            http_span_name(method, url), "http", start, time.perf_counter() - start,
+            {"status": status, "bytes": size, "page": _page_number(url)}
+        )
+
+
+def _record_response(response: Any, *args: Any, **kwargs: Any) -> Any:
+    if _tracer is None:
+        return response
+    length = response.headers.get("Content-Length")
+    if length is None and not kwargs.get("stream"):
+        length = len(response.content)
+    start = time.perf_counter() - response.elapsed.total_seconds()
+    record_http(response.request.method, response.url, start, response.status_code, int(length or 0))
+    return response
+
+
+def instrument_session(session: Any) -> None:
+    """Record every response of a requests session as an HTTP span."""
+    hooks = session.hooks.setdefault("response", [])
+    if _record_response not in hooks:
+        hooks.append(_record_response)
+
+
+def _botocore_start(context: Dict[str, Any], params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    context["trace_start"] = time.perf_counter()
+    context["trace_paged"] = bool(params and (params.get("NextToken") or params.get("NextPageToken")))
+
+
+def _botocore_end(model: Any, context: Dict[str, Any], http_response: Any = None,
+                  parsed: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    tracer = _tracer
+    start = context.get("trace_start")
+    if tracer is None or start is None:
+        return
+    metadata = (parsed or {}).get("ResponseMetadata", {})
+    content = getattr(http_response, "content", None) if http_response is not None else None
+    tracer.add(
+        f"{model.service_model.service_name}.{model.name}", "aws", start, time.perf_counter() - start,
+        {
+            "status": metadata.get("HTTPStatusCode", getattr(http_response, "status_code", None)),
+            "bytes": len(content) if content else 0,
+            "retries": metadata.get("RetryAttempts", 0),
+            "continued": context.get("trace_paged", False)
+        }
+    )
+
+
+def instrument_botocore(client: Any) -> None:
+    """Record every API call of a botocore client as a span (stubbed calls included)."""
+    events = client.meta.events
+    events.register("before-parameter-build.*.*", _botocore_start, unique_id="devops-cli-trace-start")
+    events.register("after-call.*.*", _botocore_end, unique_id="devops-cli-trace-end")
+
+
+def record_retry(method: str, url: str) -> None:
+    """Count a retried HTTP request against its span name."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.retry(http_span_name(method, url))
@@ -0,0 +1,175 @@
+"""
+Local sprint velocity history for Digitalworks2020 DevOps CLI.
+Keeps committed/achieved story points of closed sprints per board so velocity stats need no network call
+until another sprint closes.
+Follows PEP8 and Codacy standards.
+"""
+
+import os
+import time
+from datetime import datetime
+from statistics import median
+from typing import Any, Dict, Iterable, Optional
+
+from devops_cli.config import JsonFileStore
+
+
+VELOCITY_STORE_PATH: str = os.path.expanduser("~/.digitalworks_devops_cli_velocity.json")
+# Re-check boards without an active sprint at most this often
+VELOCITY_SYNC_TTL_SECONDS: int = 12 * 60 * 60
+JIRA_SPRINT_DATE_FORMAT: str = "%d/%b/%y %I:%M %p"
+
+
+def parse_jira_date(date_str: Optional[str]) -> Optional[datetime]:
+    """Parse a greenhopper completeDate (e.g. '05/Mar/24 4:30 PM'); returns None when it cannot be parsed."""
+    try:
+        return datetime.strptime(date_str.strip(), JIRA_SPRINT_DATE_FORMAT)
+    except Exception:
+        return None
+
+
+def _story_points(entry: Any, name: str) -> Optional[float]:
+    """Read entry[name]["value"] of a velocity stat entry; None when it is missing or not a number."""
+    stat = entry.get(name) if isinstance(entry, dict) else None
+    value = stat.get("value") if isinstance(stat, dict) else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _board(data: Dict[str, Any], url: str, board_id: int) -> Dict[str, Any]:
+    board = data.setdefault(url.rstrip('/'), {}).setdefault(str(board_id), {})
+    board.setdefault("sprints", {})
+    return board
+
+
+class VelocityStore(JsonFileStore):
+    """
+    VelocityStore persists closed-sprint story points per account URL and board ID.
+    Closed sprints never change, so stored entries are never re-downloaded.
+    """
+    def __init__(self, path: str = VELOCITY_STORE_PATH, sync_ttl: int = VELOCITY_SYNC_TTL_SECONDS) -> None:
+        """Initialize the store; the file is read lazily on first access."""
+        super().__init__(path)
+        self.sync_ttl = sync_ttl
+
+    def needs_sync(self, url: str, board_id: int, active_sprint_id: Optional[int]) -> bool:
+        """
+        Tell whether a sprint may have closed since the last sync.
+        Args:
+            url (str): Jira account URL.
+            board_id (int): The ID of the Jira board.
+            active_sprint_id (int, optional): The board's current active sprint, if any.
+        Returns:
+            True when the velocity report should be downloaded again.
+        """
+        with self._lock:
+            board = _board(self._load(), url, board_id)
+            if "synced_at" not in board:
+                return True
+            if active_sprint_id is None:
+                return time.time() - board["synced_at"] >= self.sync_ttl
+            # The active sprint only changes when the previous one closed
+            return board.get("active_sprint_id") != active_sprint_id
+
+    def merge_report(self, url: str, board_id: int, report: Dict[str, Any],
+                     active_sprint_id: Optional[int] = None) -> Optional[int]:
+        """
+        Add closed sprints from a greenhopper velocity report that are not stored yet.
+        Args:
+            url (str): Jira account URL.
+            board_id (int): The ID of the Jira board.
+            report (dict): Velocity report JSON.
+            active_sprint_id (int, optional): The board's current active sprint, if any.
+        Returns:
+            Number of newly stored sprints, or None if the report is not a velocity report (e.g. an error body),
+            in which case the board is not marked as synced.
+        """
+        if (not isinstance(report, dict) or not isinstance(report.get("sprints"), list)
+                or not isinstance(report.get("velocityStatEntries"), dict)):
+            return None
+        entries = report["velocityStatEntries"]
+        added = 0
+
+        def change(data: Dict[str, Any]) -> bool:
+            nonlocal added
+            board = _board(data, url, board_id)
+            stored = board["sprints"]
+            for sprint in report["sprints"]:
+                if not isinstance(sprint, dict):
+                    continue
+                sprint_id = str(sprint.get("id"))
+                if sprint_id in stored or sprint.get("state") != "CLOSED":
+                    continue
+                completed_at = parse_jira_date(sprint.get("completeDate") or "")
+                entry = entries.get(sprint_id)
+                committed, achieved = _story_points(entry, "estimated"), _story_points(entry, "completed")
+                # Sprints without a completion date or numeric estimated/completed values are skipped
+                if completed_at is None or committed is None or achieved is None:
+                    continue
+                stored[sprint_id] = {
+                    "name": sprint.get("name"),
+                    "completed_at": completed_at.isoformat(),
+                    "committed_sp": committed,
+                    "achieved_sp": achieved
+                }
+                added += 1
+            board["synced_at"] = time.time()
+            board["active_sprint_id"] = active_sprint_id
+            return True
+        with self._lock:
+            self._update(change, "velocity history")
+        return added
+
+    def last_sprints(self, url: str, board_id: int, num_sprints: Optional[int] = None) -> list[dict]:
+        """
+        Get stored closed sprints, most recently completed first.
+        Args:
+            url (str): Jira account URL.
+            board_id (int): The ID of the Jira board.
+            num_sprints (int, optional): Maximum number of sprints. All stored sprints when omitted.
+        Returns:
+            List of dicts with sprint, completed_at, committed_sp and achieved_sp.
+        """
+        with self._lock:
+            stored = _board(self._load(), url, board_id)["sprints"]
+            sprints = sorted(stored.values(), key=lambda s: s["completed_at"], reverse=True)
+        if num_sprints is not None:
+            sprints = sprints[:num_sprints]
+        return [
+            {
+                "sprint": s["name"],
+                "completed_at": s["completed_at"],
+                "committed_sp": s["committed_sp"],
+                "achieved_sp": s["achieved_sp"]
+            }
+            for s in sprints
+        ]
+
+
+def summarize_velocity(values: Iterable[float], window: int = 3) -> Dict[str, Any]:
+    """
+    Summarize achieved story points in chronological order (oldest first).
+    Args:
+        values (Iterable[float]): Achieved SP per sprint, oldest first.
+        window (int): Rolling average window in sprints.
+    Returns:
+        Dict with average, median, rolling_average (one value per sprint from the window-th on)
+        and trend (least-squares change in SP per sprint).
+    """
+    points = list(values)
+    if not points:
+        return {"average": 0, "median": 0, "rolling_average": [], "trend": 0}
+    window = max(1, min(window, len(points)))
+    rolling = [sum(points[i - window:i]) / window for i in range(window, len(points) + 1)]
+    n = len(points)
+    mean_x = (n - 1) / 2
+    mean_y = sum(points) / n
+    denominator = sum((x - mean_x) ** 2 for x in range(n))
+    trend = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(points)) / denominator if denominator else 0
+    return {
+        "average": mean_y,
+        "median": median(points),
+        "rolling_average": rolling,
+        "trend": trend
+    }
@@ -5,7 +5,7 @@ setup(
     version="0.1.0",
     description="Unified DevOps CLI for Jira, AWS, and more.",
     author="Digitalworks2020",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=[],
     entry_points={
         'console_scripts': [